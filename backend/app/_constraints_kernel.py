@@ -0,0 +1,74 @@
+"""
+Numba kernel for the numeric hard constraints.
+
+Kept separate from constraints.py so the JIT import cost is paid once and the
+kernel only ever sees NumPy arrays (times as minutes since midnight, days as
+integer codes), never ORM objects.
+"""
+
+import numpy as np
+from numba import njit, prange
+
+
+@njit(cache=True, parallel=True)
+def feasible_kernel(
+    ts_start, ts_end, ts_day, slot_ok,
+    room_ids, room_ok,
+    max_end,
+    lunch_threshold, early_lunch_start, early_lunch_end, late_lunch_start, late_lunch_end,
+    maint_room_id, maint_start, maint_end,
+    existing_day, existing_start, existing_end, existing_teacher, teacher_id
+):
+    """
+    Build the (timeslot x room) feasibility grid for one teacher.
+
+    Covers the time limit, lunch break, maintenance block and teacher overlap
+    constraints; slot_ok and room_ok carry the per-timeslot and per-room
+    verdicts of the remaining checks.
+    """
+    n_slots = ts_start.shape[0]
+    n_rooms = room_ids.shape[0]
+    valid = np.zeros((n_slots, n_rooms), dtype=np.bool_)
+
+    for t in prange(n_slots):
+        if not slot_ok[t]:
+            continue
+
+        start = ts_start[t]
+        end = ts_end[t]
+
+        # Time limit
+        if end > max_end:
+            continue
+
+        # Lunch break
+        if start < lunch_threshold:
+            lunch_start, lunch_end = early_lunch_start, early_lunch_end
+        else:
+            lunch_start, lunch_end = late_lunch_start, late_lunch_end
+        if start < lunch_end and lunch_start < end:
+            continue
+
+        # Teacher overlap
+        clash = False
+        for s in range(existing_start.shape[0]):
+            if (existing_teacher[s] == teacher_id and existing_day[s] == ts_day[t] and
+                    start < existing_end[s] and existing_start[s] < end):
+                clash = True
+                break
+        if clash:
+            continue
+
+        # Maintenance blocks
+        for r in range(n_rooms):
+            if not room_ok[r]:
+                continue
+            blocked = False
+            for b in range(maint_room_id.shape[0]):
+                if (maint_room_id[b] == room_ids[r] and
+                        start < maint_end[b] and maint_start[b] < end):
+                    blocked = True
+                    break
+            valid[t, r] = not blocked
+
+    return valid
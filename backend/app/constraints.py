@@ -6,17 +6,65 @@ This module implements hard and soft constraint checking based on Master Rules D
 - Soft Constraints: Preferences and priorities that optimize the schedule
 """
 
-from datetime import datetime, timedelta
-from typing import List, Dict, Tuple, Optional
+from datetime import date
+from typing import List, Dict, Tuple, Optional, Set, FrozenSet, Iterable, Iterator
+import numpy as np
 from sqlalchemy.orm import Session
 from enum import Enum
 
 from . import models
+from ._constraints_kernel import feasible_kernel
+
+
+# Integer day codes used by the NumPy/Numba search
+_DAY_CODES = {day.value: code for code, day in enumerate(models.DayOfWeek)}
+
+# existing_schedule is keyed by day value; this is the Saturday key
+_SAT = models.DayOfWeek.SAT.value
+
+# max_end passed to the kernel when a teacher has no end-of-day limit
+_NO_TIME_LIMIT = 1 << 30
+
+
+def _overlaps(a_start: int, a_end: int, b_start: int, b_end: int) -> bool:
+    """Check if two half-open minute ranges [start, end) overlap."""
+    return a_start < b_end and b_start < a_end
+
+
+def _format_minutes(minutes: int) -> str:
+    """Format minutes since midnight as "HH:MM"."""
+    return f"{minutes // 60:02d}:{minutes % 60:02d}"
+
+
+ScheduleArrays = Dict[Tuple[str, int], Tuple[np.ndarray, np.ndarray]]
+
+
+def schedule_to_soa(existing_schedule: Dict) -> ScheduleArrays:
+    """
+    Convert an existing_schedule dict into parallel arrays per day and teacher.
+    
+    {day: [(teacher_id, start_time, end_time), ...]} becomes
+    {(day, teacher_id): (start_mins, end_mins)}, so a conflict check only
+    looks at the few sessions that teacher has that day instead of scanning
+    the whole day. Sessions keep their order within each key.
+    """
+    grouped: Dict[Tuple[str, int], Tuple[List[int], List[int]]] = {}
+    for day, sessions in existing_schedule.items():
+        for teacher_id, start_time, end_time in sessions:
+            starts, ends = grouped.setdefault((day, teacher_id), ([], []))
+            starts.append(models.hhmm_to_minutes(start_time))
+            ends.append(models.hhmm_to_minutes(end_time))
+    return {
+        key: (np.array(starts, dtype=np.int64), np.array(ends, dtype=np.int64))
+        for key, (starts, ends) in grouped.items()
+    }
 
 
 class ConstraintViolation:
     """Represents a constraint violation with details."""
     
+    __slots__ = ("constraint_type", "severity", "message")
+    
     def __init__(self, constraint_type: str, severity: str, message: str):
         self.constraint_type = constraint_type  # "HARD" or "SOFT"
         self.severity = severity  # "CRITICAL", "HIGH", "MEDIUM", "LOW"
@@ -29,6 +77,8 @@ class ConstraintViolation:
 class TimePeriod:
     """Represents a time period within a day."""
     
+    __slots__ = ("start_min", "end_min")
+    
     def __init__(self, start_time: str, end_time: str):
         """
         Initialize a time period.
@@ -37,19 +87,82 @@ class TimePeriod:
             start_time: Time in "HH:MM" format (e.g., "07:30")
             end_time: Time in "HH:MM" format (e.g., "10:30")
         """
-        self.start_time = datetime.strptime(start_time, "%H:%M").time()
-        self.end_time = datetime.strptime(end_time, "%H:%M").time()
-        self.duration_minutes = int(
-            (datetime.combine(datetime.today(), self.end_time) - 
-             datetime.combine(datetime.today(), self.start_time)).total_seconds() / 60
-        )
+        self.start_min = models.hhmm_to_minutes(start_time)
+        self.end_min = models.hhmm_to_minutes(end_time)
+    
+    @classmethod
+    def from_minutes(cls, start_min: int, end_min: int) -> 'TimePeriod':
+        """Build a period from minutes since midnight without parsing strings."""
+        period = cls.__new__(cls)
+        period.start_min = int(start_min)
+        period.end_min = int(end_min)
+        return period
+    
+    @property
+    def duration_minutes(self) -> int:
+        """Length of the period in minutes."""
+        return self.end_min - self.start_min
     
     def overlaps_with(self, other: 'TimePeriod') -> bool:
         """Check if this period overlaps with another."""
-        return not (self.end_time <= other.start_time or self.start_time >= other.end_time)
+        return _overlaps(self.start_min, self.end_min, other.start_min, other.end_min)
     
     def __repr__(self):
-        return f"{self.start_time.strftime('%H:%M')}-{self.end_time.strftime('%H:%M')}"
+        return f"{_format_minutes(self.start_min)}-{_format_minutes(self.end_min)}"
+
+
+def _lunch_period(lunch_start: str, duration_minutes: int) -> TimePeriod:
+    """Build the lunch TimePeriod starting at lunch_start."""
+    start_min = models.hhmm_to_minutes(lunch_start)
+    return TimePeriod.from_minutes(start_min, start_min + duration_minutes)
+
+
+class TimeslotArrays:
+    """
+    Timeslot columns as parallel NumPy arrays, in the order of the given list.
+    
+    Times are minutes since midnight and days integer codes, so the grid
+    search compares integers instead of re-reading and parsing "HH:MM"
+    strings off every Timeslot for every teaching unit.
+    """
+    
+    __slots__ = ("ids", "row_by_id", "start", "end", "day", "day_code", "is_cwats", "is_sat")
+    
+    def __init__(self, timeslots: List[models.Timeslot]):
+        self.ids = np.array([t.id for t in timeslots], dtype=np.int64)
+        self.row_by_id = {timeslot_id: row for row, timeslot_id in enumerate(self.ids.tolist())}
+        self.start = np.array([t.start_min for t in timeslots], dtype=np.int64)
+        self.end = np.array([t.end_min for t in timeslots], dtype=np.int64)
+        self.day = np.array([t.day_of_week.value for t in timeslots])
+        self.day_code = np.array([_DAY_CODES[day] for day in self.day.tolist()], dtype=np.int64)
+        self.is_cwats = np.array([bool(t.is_cwats_slot) for t in timeslots], dtype=bool)
+        self.is_sat = self.day == _SAT
+
+
+class ConstraintPrefetch:
+    """
+    Database lookups needed by the hard constraints, loaded once for a batch.
+    
+    Only the teachers and rooms passed to ConstraintEngine.prefetch are
+    covered; checks fall back to querying for anything else.
+    """
+    
+    def __init__(
+        self,
+        comp_off_by_teacher: Dict[int, bool],
+        maintenance_by_room: Dict[int, List[models.RoomMaintenanceBlock]],
+        occupied_room_timeslots: Set[Tuple[int, int]]
+    ):
+        self.comp_off_by_teacher = comp_off_by_teacher  # teacher_id -> has AUTO_SATURDAY_COMP_OFF block
+        self.maintenance_by_room = maintenance_by_room  # room_id -> maintenance blocks
+        self.occupied_room_timeslots = occupied_room_timeslots  # {(room_id, timeslot_id), ...}
+    
+    def covers(self, teacher_ids: Iterable[int], room_ids: Iterable[int]) -> bool:
+        """Check whether lookups for all given teachers and rooms were loaded."""
+        return (
+            all(t_id in self.comp_off_by_teacher for t_id in teacher_ids) and
+            all(r_id in self.maintenance_by_room for r_id in room_ids)
+        )
 
 
 class ConstraintEngine:
@@ -65,19 +178,132 @@ class ConstraintEngine:
     LATE_START_LUNCH = "14:30"       # Lunch start for 10:30 AM or later
     LUNCH_DURATION_MINUTES = 90      # 1.5 hours
     
+    # Parsed once at class load; the lunch checks only reference these
+    _EARLY_THRESHOLD_MIN = models.hhmm_to_minutes(EARLY_START_THRESHOLD)
+    _EARLY_LUNCH_PERIOD = _lunch_period(EARLY_START_LUNCH, LUNCH_DURATION_MINUTES)
+    _LATE_LUNCH_PERIOD = _lunch_period(LATE_START_LUNCH, LUNCH_DURATION_MINUTES)
+    
     # Time limits based on employment classification
     TIME_LIMITS = {
-        ("CONTRACT_OF_SERVICE", "FULL_TIME"): "17:30",  # 5:30 PM
-        ("PERMANENT", "FULL_TIME"): "15:30",             # 3:30 PM
-        ("PART_TIME",): "20:00",                         # No specific limit, use 8 PM
-        ("VISITING",): "20:00",                          # No specific limit, use 8 PM
+        (models.TeacherStatus.CONTRACT_OF_SERVICE, models.Workload.FULL_TIME): "17:30",  # 5:30 PM
+        (models.TeacherStatus.PERMANENT, models.Workload.FULL_TIME): "15:30",            # 3:30 PM
+        (models.Workload.PART_TIME,): "20:00",                                           # No specific limit, use 8 PM
+        (models.Workload.VISITING,): "20:00",                                            # No specific limit, use 8 PM
     }
     
+    # TIME_LIMITS as minutes since midnight, parsed once at class load
+    TIME_LIMITS_MIN = {key: models.hhmm_to_minutes(limit) for key, limit in TIME_LIMITS.items()}
+    
     # Senior teacher room codes
     SENIOR_ROOMS = ["A103", "A104", "A203"]
     
     def __init__(self, db: Session):
         self.db = db
+        self._teacher_limit_cache: Dict[int, Optional[Tuple[int, str]]] = {}
+        self._timeslots_cache: Optional[List[models.Timeslot]] = None
+        self._active_rooms_cache: Optional[List[models.Room]] = None
+        self._schedule_version = 0
+        self._soa_source: Optional[Dict] = None
+        self._soa_version = -1
+        self._soa: ScheduleArrays = {}
+        self._teaching_days_by_teacher: Dict[int, FrozenSet[str]] = {}
+        self._timeslot_arrays_source: Optional[List[models.Timeslot]] = None
+        self._timeslot_arrays_cache: Optional[TimeslotArrays] = None
+    
+    def schedule_changed(self) -> None:
+        """Signal that an existing_schedule dict was mutated in place."""
+        self._schedule_version += 1
+    
+    def _schedule_arrays(self, existing_schedule: Dict) -> ScheduleArrays:
+        """
+        SoA view of existing_schedule (see schedule_to_soa).
+        
+        Rebuilt, together with each teacher's set of teaching days, only when
+        a different dict is passed or schedule_changed() was called since the
+        last conversion.
+        """
+        if self._soa_source is not existing_schedule or self._soa_version != self._schedule_version:
+            self._soa = schedule_to_soa(existing_schedule)
+            self._soa_source = existing_schedule
+            self._soa_version = self._schedule_version
+            days_by_teacher: Dict[int, Set[str]] = {}
+            for day, teacher_id in self._soa:
+                days_by_teacher.setdefault(teacher_id, set()).add(day)
+            self._teaching_days_by_teacher = {
+                teacher_id: frozenset(days) for teacher_id, days in days_by_teacher.items()
+            }
+        return self._soa
+    
+    def invalidate(self) -> None:
+        """Drop cached master data; call after committing changes to it."""
+        self._teacher_limit_cache.clear()
+        self._timeslots_cache = None
+        self._active_rooms_cache = None
+        self._timeslot_arrays_source = None
+        self._timeslot_arrays_cache = None
+    
+    def _timeslot_arrays(self, timeslots: List[models.Timeslot]) -> TimeslotArrays:
+        """
+        TimeslotArrays for a timeslot list, converted once per list.
+        
+        Callers pass the same loaded list for every unit of a run, so the
+        conversion is reused until a different list is passed or invalidate().
+        """
+        if self._timeslot_arrays_source is not timeslots:
+            self._timeslot_arrays_cache = TimeslotArrays(timeslots)
+            self._timeslot_arrays_source = timeslots
+        return self._timeslot_arrays_cache
+    
+    def _all_timeslots(self) -> List[models.Timeslot]:
+        """All timeslots, loaded once per engine until invalidate()."""
+        if self._timeslots_cache is None:
+            self._timeslots_cache = self.db.query(models.Timeslot).all()
+        return self._timeslots_cache
+    
+    def _active_rooms(self) -> List[models.Room]:
+        """Active rooms, loaded once per engine until invalidate()."""
+        if self._active_rooms_cache is None:
+            self._active_rooms_cache = self.db.query(models.Room).filter(
+                models.Room.active == True
+            ).all()
+        return self._active_rooms_cache
+    
+    def prefetch(self, teacher_ids: Iterable[int], room_ids: Iterable[int]) -> ConstraintPrefetch:
+        """
+        Load comp-off blocks, maintenance blocks and room occupancy in bulk.
+        
+        Pass the result to validate_timeslot_for_assignment or
+        find_valid_timeslots to avoid one query per (timeslot, room) pair.
+        """
+        teacher_ids = list(set(teacher_ids))
+        room_ids = list(set(room_ids))
+        
+        comp_off_by_teacher = {teacher_id: False for teacher_id in teacher_ids}
+        comp_off_rows = self.db.query(models.TeacherDayBlock.teacher_id).filter(
+            models.TeacherDayBlock.teacher_id.in_(teacher_ids),
+            models.TeacherDayBlock.source == models.BlockSource.AUTO_SATURDAY_COMP_OFF,
+            models.TeacherDayBlock.is_blocked == True
+        ).distinct().all()
+        for (teacher_id,) in comp_off_rows:
+            comp_off_by_teacher[teacher_id] = True
+        
+        maintenance_by_room: Dict[int, List[models.RoomMaintenanceBlock]] = {
+            room_id: [] for room_id in room_ids
+        }
+        maintenance_blocks = self.db.query(models.RoomMaintenanceBlock).filter(
+            models.RoomMaintenanceBlock.room_id.in_(room_ids)
+        ).all()
+        for block in maintenance_blocks:
+            maintenance_by_room[block.room_id].append(block)
+        
+        occupied_rows = self.db.query(
+            models.ScheduleEntry.room_id, models.ScheduleEntry.timeslot_id
+        ).filter(
+            models.ScheduleEntry.room_id.in_(room_ids)
+        ).distinct().all()
+        occupied_room_timeslots = {(room_id, timeslot_id) for room_id, timeslot_id in occupied_rows}
+        
+        return ConstraintPrefetch(comp_off_by_teacher, maintenance_by_room, occupied_room_timeslots)
     
     def validate_timeslot_for_assignment(
         self,
@@ -86,7 +312,9 @@ class ConstraintEngine:
         section: models.Section,
         timeslot: models.Timeslot,
         room: models.Room,
-        existing_schedule: Optional[Dict] = None
+        existing_schedule: Optional[Dict] = None,
+        prefetched: Optional[ConstraintPrefetch] = None,
+        on_date: Optional[date] = None
     ) -> Tuple[bool, List[ConstraintViolation]]:
         """
         Validate if a teacher-course-section-timeslot-room combination is valid.
@@ -99,22 +327,21 @@ class ConstraintEngine:
             room: Room object
             existing_schedule: Dict of existing schedule entries for conflict checking
                               Format: {day: [(teacher_id, start_time, end_time), ...]}
+            prefetched: Optional bulk lookups from prefetch(); queried per call if omitted
+            on_date: Calendar date maintenance blocks are checked against; defaults to today
         
         Returns:
             Tuple[bool, List[ConstraintViolation]]: (is_valid, violations)
             - is_valid: True if all hard constraints pass, False otherwise
             - violations: List of all violations (hard and soft)
         """
-        violations: List[ConstraintViolation] = []
-        
         # HARD CONSTRAINTS
-        hard_violations = self._check_hard_constraints(
-            teacher, course, section, timeslot, room, existing_schedule
+        violations = self._check_hard_constraints(
+            teacher, course, section, timeslot, room, existing_schedule, prefetched, on_date
         )
-        violations.extend(hard_violations)
         
         # If hard constraints fail, return immediately
-        if hard_violations:
+        if violations:
             return False, violations
         
         # SOFT CONSTRAINTS (only checked if hard constraints pass)
@@ -132,34 +359,36 @@ class ConstraintEngine:
         section: models.Section,
         timeslot: models.Timeslot,
         room: models.Room,
-        existing_schedule: Optional[Dict]
+        existing_schedule: Optional[Dict],
+        prefetched: Optional[ConstraintPrefetch] = None,
+        on_date: Optional[date] = None
     ) -> List[ConstraintViolation]:
-        """Check all hard constraints."""
+        """Check all hard constraints; each check appends to the shared list."""
         violations: List[ConstraintViolation] = []
         
         # 1. Room Type Matching
-        violations.extend(self._check_room_type_matching(course, room))
+        self._check_room_type_matching(course, room, violations)
         
         # 2. Time Limit Constraint
-        violations.extend(self._check_time_limit(teacher, timeslot))
+        self._check_time_limit(teacher, timeslot, violations)
         
         # 3. Teacher Lunch Break Constraint
-        violations.extend(self._check_teacher_lunch_break(timeslot))
+        self._check_teacher_lunch_break(timeslot, violations)
         
         # 4. Max 5 Days Per Week Constraint
-        violations.extend(self._check_max_teaching_days(teacher, timeslot, existing_schedule))
+        self._check_max_teaching_days(teacher, timeslot, existing_schedule, violations)
         
         # 5. Saturday Compensation Constraint
-        violations.extend(self._check_saturday_compensation(teacher, timeslot, existing_schedule))
+        self._check_saturday_compensation(teacher, timeslot, existing_schedule, violations, prefetched)
         
         # 6. 1st Year CWATS Saturday Vacancy Constraint
-        violations.extend(self._check_first_year_cwats_vacancy(section, timeslot))
+        self._check_first_year_cwats_vacancy(section, timeslot, violations)
         
         # 7. Room Availability (No Maintenance Block)
-        violations.extend(self._check_room_maintenance_blocks(room, timeslot))
+        self._check_room_maintenance_blocks(room, timeslot, violations, prefetched, on_date)
         
         # 8. No Teacher/Section/Room Overlap
-        violations.extend(self._check_no_overlap(teacher, section, room, timeslot, existing_schedule))
+        self._check_no_overlap(teacher, section, room, timeslot, existing_schedule, violations, prefetched)
         
         return violations
     
@@ -187,35 +416,33 @@ class ConstraintEngine:
     def _check_room_type_matching(
         self,
         course: models.Course,
-        room: models.Room
-    ) -> List[ConstraintViolation]:
+        room: models.Room,
+        out: List[ConstraintViolation]
+    ) -> None:
         """
         Constraint: Course room type must match room type.
         
         Example: Lab course must be in a Lab room.
         """
-        violations = []
-        
         # STANDARD courses can be in any room
         if course.course_type == models.CourseType.STANDARD:
-            return violations
+            return
         
         # Specific course types must match room types
         if room.room_type != course.course_type:
-            violations.append(ConstraintViolation(
+            out.append(ConstraintViolation(
                 "HARD",
                 "CRITICAL",
                 f"Course type {course.course_type.value} requires {course.course_type.value} room, "
                 f"but {room.room_code} is {room.room_type.value}"
             ))
-        
-        return violations
     
     def _check_time_limit(
         self,
         teacher: models.Teacher,
-        timeslot: models.Timeslot
-    ) -> List[ConstraintViolation]:
+        timeslot: models.Timeslot,
+        out: List[ConstraintViolation]
+    ) -> None:
         """
         Constraint: End of day time limits based on employment status.
         
@@ -224,44 +451,57 @@ class ConstraintEngine:
         - Permanent + Full-Time: max 3:30 PM
         - Part-Time/Visiting: no strict limit
         """
-        violations = []
+        limit = self._teacher_time_limit(teacher)
+        if limit is None:
+            return  # No time limit
+        
+        max_end_min, limit_str = limit
+        if timeslot.end_min > max_end_min:
+            out.append(ConstraintViolation(
+                "HARD",
+                "CRITICAL",
+                f"{teacher.full_name} ({teacher.status.value}/{teacher.workload.value}) "
+                f"cannot work past {limit_str}, but timeslot ends at {timeslot.end_time}"
+            ))
+    
+    def _teacher_time_limit(self, teacher: models.Teacher) -> Optional[Tuple[int, str]]:
+        """
+        Get a teacher's end-of-day limit as (minutes, display string), if any.
         
-        end_time = datetime.strptime(timeslot.end_time, "%H:%M").time()
+        Depends only on the teacher's classification, so it is resolved once
+        per teacher and cached on the engine.
+        """
+        if teacher.id in self._teacher_limit_cache:
+            return self._teacher_limit_cache[teacher.id]
         
-        # Get the applicable time limit
-        key = (teacher.status.value, teacher.workload.value)
+        status, workload = teacher.status, teacher.workload
+        key = (status, workload)
         if key not in self.TIME_LIMITS:
             # Fall back for Part-Time/Visiting without specific time status
-            if teacher.workload.value in self.TIME_LIMITS:
-                key = (teacher.workload.value,)
+            if workload in self.TIME_LIMITS:
+                key = (workload,)
             else:
-                return violations  # No time limit
-        
-        max_time_str = self.TIME_LIMITS[key]
-        max_time = datetime.strptime(max_time_str, "%H:%M").time()
+                key = None
         
-        if end_time > max_time:
-            limit_str = max_time_str
-            if teacher.status == models.TeacherStatus.PERMANENT and \
-               teacher.workload == models.Workload.FULL_TIME:
+        limit = None
+        if key is not None:
+            limit_str = self.TIME_LIMITS[key]
+            if status == models.TeacherStatus.PERMANENT and \
+               workload == models.Workload.FULL_TIME:
                 limit_str = "3:30 PM"
-            elif teacher.status == models.TeacherStatus.CONTRACT_OF_SERVICE and \
-                 teacher.workload == models.Workload.FULL_TIME:
+            elif status == models.TeacherStatus.CONTRACT_OF_SERVICE and \
+                 workload == models.Workload.FULL_TIME:
                 limit_str = "5:30 PM"
-            
-            violations.append(ConstraintViolation(
-                "HARD",
-                "CRITICAL",
-                f"{teacher.full_name} ({teacher.status.value}/{teacher.workload.value}) "
-                f"cannot work past {limit_str}, but timeslot ends at {timeslot.end_time}"
-            ))
+            limit = (self.TIME_LIMITS_MIN[key], limit_str)
         
-        return violations
+        self._teacher_limit_cache[teacher.id] = limit
+        return limit
     
     def _check_teacher_lunch_break(
         self,
-        timeslot: models.Timeslot
-    ) -> List[ConstraintViolation]:
+        timeslot: models.Timeslot,
+        out: List[ConstraintViolation]
+    ) -> None:
         """
         Constraint: Mandatory 1.5-hour teacher lunch break.
         
@@ -271,68 +511,41 @@ class ConstraintEngine:
         
         This validates that the timeslot doesn't conflict with lunch.
         """
-        violations = []
-        
-        start_time = datetime.strptime(timeslot.start_time, "%H:%M").time()
-        end_time = datetime.strptime(timeslot.end_time, "%H:%M").time()
-        
-        early_threshold = datetime.strptime(self.EARLY_START_THRESHOLD, "%H:%M").time()
-        
         # Determine lunch period
-        if start_time < early_threshold:
-            lunch_start = datetime.strptime(self.EARLY_START_LUNCH, "%H:%M").time()
+        if timeslot.start_min < self._EARLY_THRESHOLD_MIN:
+            lunch_period = self._EARLY_LUNCH_PERIOD
         else:
-            lunch_start = datetime.strptime(self.LATE_START_LUNCH, "%H:%M").time()
-        
-        lunch_end_minutes = self.LUNCH_DURATION_MINUTES
-        lunch_end = datetime.combine(datetime.today(), lunch_start)
-        lunch_end = (lunch_end + timedelta(minutes=lunch_end_minutes)).time()
-        
-        lunch_period = TimePeriod(
-            lunch_start.strftime("%H:%M"),
-            lunch_end.strftime("%H:%M")
-        )
-        
-        timeslot_period = TimePeriod(timeslot.start_time, timeslot.end_time)
+            lunch_period = self._LATE_LUNCH_PERIOD
         
-        if timeslot_period.overlaps_with(lunch_period):
-            violations.append(ConstraintViolation(
+        if _overlaps(timeslot.start_min, timeslot.end_min, lunch_period.start_min, lunch_period.end_min):
+            timeslot_period = TimePeriod.from_minutes(timeslot.start_min, timeslot.end_min)
+            out.append(ConstraintViolation(
                 "HARD",
                 "CRITICAL",
                 f"Timeslot {timeslot_period} conflicts with mandatory lunch break {lunch_period}"
             ))
-        
-        return violations
     
     def _check_max_teaching_days(
         self,
         teacher: models.Teacher,
         timeslot: models.Timeslot,
-        existing_schedule: Optional[Dict]
-    ) -> List[ConstraintViolation]:
+        existing_schedule: Optional[Dict],
+        out: List[ConstraintViolation]
+    ) -> None:
         """
         Constraint: Teachers can teach maximum 5 days per week.
         
         If scheduled on Saturday, they must be given a full vacant weekday.
         """
-        violations = []
-        
         if not existing_schedule:
-            return violations
+            return
         
-        # Count unique teaching days for this teacher
-        teaching_days = set()
-        for day, sessions in existing_schedule.items():
-            for teacher_id, _, _ in sessions:
-                if teacher_id == teacher.id:
-                    teaching_days.add(day)
-        
-        # Add the current timeslot's day
-        teaching_days.add(timeslot.day_of_week.value)
+        # Unique teaching days for this teacher, plus the current timeslot's day
+        teaching_days = self._teaching_days(teacher, existing_schedule) | {timeslot.day_of_week.value}
         
         # Check if exceeds 5 days
         if len(teaching_days) > 5:
-            violations.append(ConstraintViolation(
+            out.append(ConstraintViolation(
                 "HARD",
                 "CRITICAL",
                 f"{teacher.full_name} would teach {len(teaching_days)} days/week, exceeding maximum of 5 days"
@@ -341,31 +554,54 @@ class ConstraintEngine:
         # If Saturday is involved, check for compensation day
         if timeslot.day_of_week == models.DayOfWeek.SAT and len(teaching_days) == 5:
             # Saturday + 4 weekdays = 5 days. Need to verify at least 1 weekday is blocked
-            weekdays = {d for d in teaching_days if d != "SAT"}
+            weekdays = {d for d in teaching_days if d != _SAT}
             if len(weekdays) != 4:
-                violations.append(ConstraintViolation(
+                out.append(ConstraintViolation(
                     "HARD",
                     "HIGH",
                     f"{teacher.full_name} scheduled on Saturday but doesn't have exactly 4 weekdays"
                 ))
+    
+    def _teaching_days(self, teacher: models.Teacher, existing_schedule: Dict) -> FrozenSet[str]:
+        """
+        Collect the days on which a teacher already has sessions.
         
-        return violations
+        Read from the index built with the schedule arrays.
+        """
+        self._schedule_arrays(existing_schedule)
+        return self._teaching_days_by_teacher.get(teacher.id, frozenset())
     
     def _check_saturday_compensation(
         self,
         teacher: models.Teacher,
         timeslot: models.Timeslot,
-        existing_schedule: Optional[Dict]
-    ) -> List[ConstraintViolation]:
+        existing_schedule: Optional[Dict],
+        out: List[ConstraintViolation],
+        prefetched: Optional[ConstraintPrefetch] = None
+    ) -> None:
         """
         Constraint: If scheduled on Saturday, must have one full vacant weekday.
         
         This is enforced via TeacherDayBlock with AUTO_SATURDAY_COMP_OFF source.
         """
-        violations = []
-        
         if timeslot.day_of_week != models.DayOfWeek.SAT:
-            return violations
+            return
+        
+        if not self._has_comp_off(teacher, prefetched):
+            out.append(ConstraintViolation(
+                "HARD",
+                "HIGH",
+                f"{teacher.full_name} scheduled on Saturday but has no blocked compensation day"
+            ))
+    
+    def _has_comp_off(
+        self,
+        teacher: models.Teacher,
+        prefetched: Optional[ConstraintPrefetch] = None
+    ) -> bool:
+        """Check whether a teacher has an AUTO_SATURDAY_COMP_OFF blocked day."""
+        if prefetched is not None and teacher.id in prefetched.comp_off_by_teacher:
+            return prefetched.comp_off_by_teacher[teacher.id]
         
         # Query for blocked days from AUTO_SATURDAY_COMP_OFF
         blocked_days = self.db.query(models.TeacherDayBlock).filter(
@@ -373,76 +609,77 @@ class ConstraintEngine:
             models.TeacherDayBlock.source == models.BlockSource.AUTO_SATURDAY_COMP_OFF,
             models.TeacherDayBlock.is_blocked == True
         ).all()
-        
-        if not blocked_days:
-            violations.append(ConstraintViolation(
-                "HARD",
-                "HIGH",
-                f"{teacher.full_name} scheduled on Saturday but has no blocked compensation day"
-            ))
-        
-        return violations
+        return bool(blocked_days)
     
     def _check_first_year_cwats_vacancy(
         self,
         section: models.Section,
-        timeslot: models.Timeslot
-    ) -> List[ConstraintViolation]:
+        timeslot: models.Timeslot,
+        out: List[ConstraintViolation]
+    ) -> None:
         """
         Constraint: 1st-year sections must have Saturday CWATS vacancy.
         
         Specific times: 7:30-10:30 AM or 10:30-1:30 PM
         """
-        violations = []
-        
         if not section.is_first_year:
-            return violations
+            return
         
         if timeslot.day_of_week != models.DayOfWeek.SAT:
-            return violations
+            return
         
         # Check if timeslot is a valid CWATS slot
         if not timeslot.is_cwats_slot:
-            violations.append(ConstraintViolation(
+            out.append(ConstraintViolation(
                 "HARD",
                 "CRITICAL",
                 f"1st-year section {section.code} scheduled on Saturday, "
                 f"but timeslot {timeslot.start_time}-{timeslot.end_time} is not a CWATS slot. "
                 f"Valid CWATS times: 7:30-10:30 AM or 10:30-1:30 PM"
             ))
-        
-        return violations
     
     def _check_room_maintenance_blocks(
         self,
         room: models.Room,
-        timeslot: models.Timeslot
-    ) -> List[ConstraintViolation]:
+        timeslot: models.Timeslot,
+        out: List[ConstraintViolation],
+        prefetched: Optional[ConstraintPrefetch] = None,
+        on_date: Optional[date] = None
+    ) -> None:
         """
         Constraint: Room cannot be scheduled during maintenance.
         """
-        violations = []
-        
+        for block in self._conflicting_maintenance_blocks(room, timeslot, prefetched, on_date):
+            out.append(ConstraintViolation(
+                "HARD",
+                "CRITICAL",
+                f"Room {room.room_code} has maintenance scheduled during timeslot "
+                f"{timeslot.start_time}-{timeslot.end_time}: {block.reason}"
+            ))
+    
+    def _conflicting_maintenance_blocks(
+        self,
+        room: models.Room,
+        timeslot: models.Timeslot,
+        prefetched: Optional[ConstraintPrefetch] = None,
+        on_date: Optional[date] = None
+    ) -> Iterator[models.RoomMaintenanceBlock]:
+        """Yield the room's maintenance blocks that overlap the timeslot on on_date (default today)."""
         # Get maintenance blocks for this room
-        maintenance_blocks = self.db.query(models.RoomMaintenanceBlock).filter(
-            models.RoomMaintenanceBlock.room_id == room.id
-        ).all()
+        if prefetched is not None and room.id in prefetched.maintenance_by_room:
+            maintenance_blocks = prefetched.maintenance_by_room[room.id]
+        else:
+            maintenance_blocks = self.db.query(models.RoomMaintenanceBlock).filter(
+                models.RoomMaintenanceBlock.room_id == room.id
+            ).all()
         
-        # Create datetime objects for comparison (assuming current date for simplicity)
-        today = datetime.today()
-        timeslot_start = datetime.combine(today, datetime.strptime(timeslot.start_time, "%H:%M").time())
-        timeslot_end = datetime.combine(today, datetime.strptime(timeslot.end_time, "%H:%M").time())
+        if on_date is None:
+            on_date = date.today()
         
         for block in maintenance_blocks:
-            if not (timeslot_end <= block.start_datetime or timeslot_start >= block.end_datetime):
-                violations.append(ConstraintViolation(
-                    "HARD",
-                    "CRITICAL",
-                    f"Room {room.room_code} has maintenance scheduled during timeslot "
-                    f"{timeslot.start_time}-{timeslot.end_time}: {block.reason}"
-                ))
-        
-        return violations
+            span = block.minutes_on(on_date)
+            if span is not None and _overlaps(timeslot.start_min, timeslot.end_min, *span):
+                yield block
     
     def _check_no_overlap(
         self,
@@ -450,47 +687,168 @@ class ConstraintEngine:
         section: models.Section,
         room: models.Room,
         timeslot: models.Timeslot,
-        existing_schedule: Optional[Dict]
-    ) -> List[ConstraintViolation]:
+        existing_schedule: Optional[Dict],
+        out: List[ConstraintViolation],
+        prefetched: Optional[ConstraintPrefetch] = None
+    ) -> None:
         """
         Constraint: No overlapping assignments for teacher, section, or room.
         """
-        violations = []
-        
         if not existing_schedule:
-            return violations
+            return
         
         day_key = timeslot.day_of_week.value
-        timeslot_period = TimePeriod(timeslot.start_time, timeslot.end_time)
         
         if day_key not in existing_schedule:
-            return violations
-        
-        for scheduled_teacher_id, scheduled_start, scheduled_end in existing_schedule[day_key]:
-            scheduled_period = TimePeriod(scheduled_start, scheduled_end)
-            
-            if timeslot_period.overlaps_with(scheduled_period):
-                if scheduled_teacher_id == teacher.id:
-                    violations.append(ConstraintViolation(
-                        "HARD",
-                        "CRITICAL",
-                        f"{teacher.full_name} already scheduled at {scheduled_period} on {day_key}"
-                    ))
+            return
+        
+        teacher_sessions = self._schedule_arrays(existing_schedule).get((day_key, teacher.id))
+        if teacher_sessions is not None:
+            starts, ends = teacher_sessions
+            clashes = (starts < timeslot.end_min) & (ends > timeslot.start_min)
+            for idx in np.flatnonzero(clashes):
+                scheduled_period = TimePeriod.from_minutes(starts[idx], ends[idx])
+                out.append(ConstraintViolation(
+                    "HARD",
+                    "CRITICAL",
+                    f"{teacher.full_name} already scheduled at {scheduled_period} on {day_key}"
+                ))
         
         # Check room overlap (simplified - would need more detailed schedule lookup)
-        room_entries = self.db.query(models.ScheduleEntry).filter(
-            models.ScheduleEntry.room_id == room.id,
-            models.ScheduleEntry.timeslot_id == timeslot.id
-        ).all()
-        
-        if room_entries:
-            violations.append(ConstraintViolation(
+        if self._is_room_occupied(room, timeslot, prefetched):
+            timeslot_period = TimePeriod.from_minutes(timeslot.start_min, timeslot.end_min)
+            out.append(ConstraintViolation(
                 "HARD",
                 "CRITICAL",
                 f"Room {room.room_code} already occupied at {timeslot_period} on {day_key}"
             ))
+    
+    def _is_room_occupied(
+        self,
+        room: models.Room,
+        timeslot: models.Timeslot,
+        prefetched: Optional[ConstraintPrefetch] = None
+    ) -> bool:
+        """Check whether any schedule entry already uses the room at the timeslot."""
+        if prefetched is not None and room.id in prefetched.maintenance_by_room:
+            return (room.id, timeslot.id) in prefetched.occupied_room_timeslots
+        
+        # Without a prefetched set, ask only whether a row exists
+        room_entry = self.db.query(models.ScheduleEntry.id).filter(
+            models.ScheduleEntry.room_id == room.id,
+            models.ScheduleEntry.timeslot_id == timeslot.id
+        ).first()
+        return room_entry is not None
+    
+    # ==================== FAST-PATH HARD CONSTRAINTS ====================
+    # Boolean twins of the checks above: same verdict, no violation objects.
+    
+    def is_valid_assignment(
+        self,
+        teacher: models.Teacher,
+        course: models.Course,
+        section: models.Section,
+        timeslot: models.Timeslot,
+        room: models.Room,
+        existing_schedule: Optional[Dict] = None,
+        prefetched: Optional[ConstraintPrefetch] = None,
+        on_date: Optional[date] = None
+    ) -> bool:
+        """
+        Check whether a combination passes all hard constraints.
         
-        return violations
+        Gives the same verdict as validate_timeslot_for_assignment but stops
+        at the first failure and never builds violations or messages.
+        """
+        return (
+            self._check_room_type_matching_fast(course, room) and
+            self._check_time_limit_fast(teacher, timeslot) and
+            self._check_teacher_lunch_break_fast(timeslot) and
+            self._check_max_teaching_days_fast(teacher, timeslot, existing_schedule) and
+            self._check_saturday_compensation_fast(teacher, timeslot, prefetched) and
+            self._check_first_year_cwats_vacancy_fast(section, timeslot) and
+            self._check_room_maintenance_blocks_fast(room, timeslot, prefetched, on_date) and
+            self._check_no_overlap_fast(teacher, room, timeslot, existing_schedule, prefetched)
+        )
+    
+    def _check_room_type_matching_fast(self, course: models.Course, room: models.Room) -> bool:
+        return course.course_type == models.CourseType.STANDARD or room.room_type == course.course_type
+    
+    def _check_time_limit_fast(self, teacher: models.Teacher, timeslot: models.Timeslot) -> bool:
+        limit = self._teacher_time_limit(teacher)
+        return limit is None or timeslot.end_min <= limit[0]
+    
+    def _check_teacher_lunch_break_fast(self, timeslot: models.Timeslot) -> bool:
+        if timeslot.start_min < self._EARLY_THRESHOLD_MIN:
+            lunch_period = self._EARLY_LUNCH_PERIOD
+        else:
+            lunch_period = self._LATE_LUNCH_PERIOD
+        return not _overlaps(timeslot.start_min, timeslot.end_min, lunch_period.start_min, lunch_period.end_min)
+    
+    def _check_max_teaching_days_fast(
+        self,
+        teacher: models.Teacher,
+        timeslot: models.Timeslot,
+        existing_schedule: Optional[Dict]
+    ) -> bool:
+        if not existing_schedule:
+            return True
+        
+        teaching_days = self._teaching_days(teacher, existing_schedule) | {timeslot.day_of_week.value}
+        if len(teaching_days) > 5:
+            return False
+        
+        if timeslot.day_of_week == models.DayOfWeek.SAT and len(teaching_days) == 5:
+            return len({d for d in teaching_days if d != _SAT}) == 4
+        
+        return True
+    
+    def _check_saturday_compensation_fast(
+        self,
+        teacher: models.Teacher,
+        timeslot: models.Timeslot,
+        prefetched: Optional[ConstraintPrefetch] = None
+    ) -> bool:
+        return timeslot.day_of_week != models.DayOfWeek.SAT or self._has_comp_off(teacher, prefetched)
+    
+    def _check_first_year_cwats_vacancy_fast(self, section: models.Section, timeslot: models.Timeslot) -> bool:
+        return (
+            not section.is_first_year or
+            timeslot.day_of_week != models.DayOfWeek.SAT or
+            bool(timeslot.is_cwats_slot)
+        )
+    
+    def _check_room_maintenance_blocks_fast(
+        self,
+        room: models.Room,
+        timeslot: models.Timeslot,
+        prefetched: Optional[ConstraintPrefetch] = None,
+        on_date: Optional[date] = None
+    ) -> bool:
+        return next(self._conflicting_maintenance_blocks(room, timeslot, prefetched, on_date), None) is None
+    
+    def _check_no_overlap_fast(
+        self,
+        teacher: models.Teacher,
+        room: models.Room,
+        timeslot: models.Timeslot,
+        existing_schedule: Optional[Dict],
+        prefetched: Optional[ConstraintPrefetch] = None
+    ) -> bool:
+        if not existing_schedule:
+            return True
+        
+        day_key = timeslot.day_of_week.value
+        if day_key not in existing_schedule:
+            return True
+        
+        teacher_sessions = self._schedule_arrays(existing_schedule).get((day_key, teacher.id))
+        if teacher_sessions is not None:
+            starts, ends = teacher_sessions
+            if ((starts < timeslot.end_min) & (ends > timeslot.start_min)).any():
+                return False
+        
+        return not self._is_room_occupied(room, timeslot, prefetched)
     
     # ==================== SOFT CONSTRAINTS ====================
     
@@ -554,38 +912,157 @@ class ConstraintEngine:
         course: models.Course,
         section: models.Section,
         available_rooms: Optional[List[models.Room]] = None,
-        existing_schedule: Optional[Dict] = None
+        existing_schedule: Optional[Dict] = None,
+        prefetched: Optional[ConstraintPrefetch] = None,
+        on_date: Optional[date] = None,
+        timeslots: Optional[List[models.Timeslot]] = None
     ) -> Dict[models.Timeslot, List[models.Room]]:
         """
         Find all valid timeslot-room combinations for a teacher-course-section.
         
+        Hard constraints are evaluated as NumPy masks over the whole
+        (timeslot x room) grid instead of validating every pair one by one.
+        Timeslots default to all timeslots; the result keeps the order of
+        timeslots and of available_rooms.
+        
         Returns: {timeslot: [rooms], ...} of valid combinations
         """
         if available_rooms is None:
-            available_rooms = self.db.query(models.Room).filter(
-                models.Room.active == True
-            ).all()
+            available_rooms = self._active_rooms()
         
         valid_combinations: Dict[models.Timeslot, List[models.Room]] = {}
         
-        timeslots = self.db.query(models.Timeslot).all()
-        
-        for timeslot in timeslots:
-            valid_rooms_for_slot = []
-            
-            for room in available_rooms:
-                is_valid, _ = self.validate_timeslot_for_assignment(
-                    teacher, course, section, timeslot, room, existing_schedule
-                )
-                
-                if is_valid:
-                    valid_rooms_for_slot.append(room)
-            
-            if valid_rooms_for_slot:
-                valid_combinations[timeslot] = valid_rooms_for_slot
+        if timeslots is None:
+            timeslots = self._all_timeslots()
+        if not timeslots or not available_rooms:
+            return valid_combinations
+        
+        room_ids = [room.id for room in available_rooms]
+        if prefetched is None or not prefetched.covers([teacher.id], room_ids):
+            prefetched = self.prefetch([teacher.id], room_ids)
+        
+        valid = self._hard_constraint_mask(
+            teacher, course, section, timeslots, available_rooms, existing_schedule, prefetched, on_date
+        )
+        
+        for t_idx, timeslot in enumerate(timeslots):
+            room_indexes = np.flatnonzero(valid[t_idx])
+            if room_indexes.size:
+                valid_combinations[timeslot] = [available_rooms[r_idx] for r_idx in room_indexes]
         
         return valid_combinations
     
+    def _hard_constraint_mask(
+        self,
+        teacher: models.Teacher,
+        course: models.Course,
+        section: models.Section,
+        timeslots: List[models.Timeslot],
+        rooms: List[models.Room],
+        existing_schedule: Optional[Dict],
+        prefetched: ConstraintPrefetch,
+        on_date: Optional[date] = None
+    ) -> np.ndarray:
+        """
+        Evaluate the hard constraints over a (timeslot x room) grid.
+        
+        Mirrors _check_hard_constraints: entry [t, r] is True when
+        timeslots[t] in rooms[r] passes every hard constraint.
+        """
+        ts = self._timeslot_arrays(timeslots)
+        ts_start, ts_end, ts_day = ts.start, ts.end, ts.day
+        ts_day_code, ts_is_cwats, ts_is_sat = ts.day_code, ts.is_cwats, ts.is_sat
+        room_ids = np.array([r.id for r in rooms], dtype=np.int64)
+        
+        # 1. Room Type Matching (per room)
+        room_ok = np.array([
+            course.course_type == models.CourseType.STANDARD or room.room_type == course.course_type
+            for room in rooms
+        ], dtype=bool)
+        
+        slot_ok = np.ones(len(timeslots), dtype=bool)
+        
+        # 4. Max 5 Days Per Week Constraint
+        if existing_schedule:
+            teaching_days = self._teaching_days(teacher, existing_schedule)
+            for day in set(ts_day.tolist()):
+                days = teaching_days | {day}
+                weekdays = {d for d in days if d != _SAT}
+                if len(days) > 5 or (day == _SAT and len(days) == 5 and len(weekdays) != 4):
+                    slot_ok &= ts_day != day
+        
+        # 5. Saturday Compensation Constraint
+        if not prefetched.comp_off_by_teacher[teacher.id]:
+            slot_ok &= ~ts_is_sat
+        
+        # 6. 1st Year CWATS Saturday Vacancy Constraint
+        if section.is_first_year:
+            slot_ok &= ~(ts_is_sat & ~ts_is_cwats)
+        
+        # 2. Time Limit, 3. Lunch Break, 7. Maintenance and 8. teacher overlap
+        # are numeric and run in the JIT kernel
+        limit = self._teacher_time_limit(teacher)
+        max_end = _NO_TIME_LIMIT if limit is None else limit[0]
+        
+        if on_date is None:
+            on_date = date.today()
+        maintenance_spans = [
+            (room_id, span) for room_id in set(room_ids.tolist())
+            for span in (block.minutes_on(on_date) for block in prefetched.maintenance_by_room[room_id])
+            if span is not None
+        ]
+        maint_room_id = np.array([room_id for room_id, _ in maintenance_spans], dtype=np.int64)
+        maint_start = np.array([span[0] for _, span in maintenance_spans], dtype=np.int64)
+        maint_end = np.array([span[1] for _, span in maintenance_spans], dtype=np.int64)
+        
+        # Only this teacher's sessions can clash with the teacher
+        soa = self._schedule_arrays(existing_schedule or {})
+        schedule_arrays = []
+        for day, day_code in _DAY_CODES.items():
+            teacher_sessions = soa.get((day, teacher.id))
+            if teacher_sessions is not None:
+                starts, ends = teacher_sessions
+                schedule_arrays.append((
+                    np.full(starts.shape, day_code, dtype=np.int64), starts, ends,
+                    np.full(starts.shape, teacher.id, dtype=np.int64)
+                ))
+        if schedule_arrays:
+            existing_day, existing_start, existing_end, existing_teacher = (
+                np.concatenate(column) for column in zip(*schedule_arrays)
+            )
+        else:
+            existing_day = existing_start = existing_end = existing_teacher = np.empty(0, dtype=np.int64)
+        
+        valid = feasible_kernel(
+            ts_start, ts_end, ts_day_code, slot_ok,
+            room_ids, room_ok,
+            max_end,
+            self._EARLY_THRESHOLD_MIN,
+            self._EARLY_LUNCH_PERIOD.start_min, self._EARLY_LUNCH_PERIOD.end_min,
+            self._LATE_LUNCH_PERIOD.start_min, self._LATE_LUNCH_PERIOD.end_min,
+            maint_room_id, maint_start, maint_end,
+            existing_day, existing_start, existing_end, existing_teacher,
+            teacher.id
+        )
+        
+        # 8. Room occupancy, only checked on days that already have sessions:
+        # map the occupied (room, timeslot) pairs in this grid to cells and
+        # clear them with one fancy-indexed assignment
+        if existing_schedule and prefetched.occupied_room_timeslots:
+            row_by_id = ts.row_by_id
+            col_by_id = {room_id: col for col, room_id in enumerate(room_ids.tolist())}
+            cells = [
+                (row_by_id[timeslot_id], col_by_id[room_id])
+                for room_id, timeslot_id in prefetched.occupied_room_timeslots
+                if timeslot_id in row_by_id and room_id in col_by_id
+            ]
+            if cells:
+                rows, cols = np.array(cells, dtype=np.intp).T
+                on_scheduled_day = np.isin(ts_day[rows], list(existing_schedule))
+                valid[rows[on_scheduled_day], cols[on_scheduled_day]] = False
+        
+        return valid
+    
     def find_constraint_violations_for_assignment(
         self,
         teacher: models.Teacher,
@@ -603,7 +1080,9 @@ class ConstraintEngine:
             teacher, course, section, timeslot, room
         )
         
-        return {
-            "HARD": [v for v in violations if v.constraint_type == "HARD"],
-            "SOFT": [v for v in violations if v.constraint_type == "SOFT"]
-        }
+        report: Dict[str, List[ConstraintViolation]] = {"HARD": [], "SOFT": []}
+        for violation in violations:
+            bucket = report.get(violation.constraint_type)
+            if bucket is not None:
+                bucket.append(violation)
+        return report
@@ -1,18 +1,70 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from functools import lru_cache
 import os
 
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./scheduling.db")
 
-engine = create_engine(DATABASE_URL)
+# Pool sizing for server databases: room for concurrent request threads (the
+# scheduler worker processes each build their own engine and pool on import);
+# pre-ping and recycle drop connections the server closed (restarts, idle
+# timeouts) instead of failing a request.
+# SQLite keeps SQLAlchemy's default pool for its dialect.
+POOL_OPTIONS = {} if DATABASE_URL.startswith("sqlite") else {
+    "pool_size": int(os.getenv("DB_POOL_SIZE", "10")),
+    "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "20")),
+    "pool_timeout": 30,
+    "pool_pre_ping": True,
+    "pool_recycle": 1800,
+}
+# In-memory SQLite (DATABASE_URL=sqlite://) is for the demo scripts, which
+# call the scheduler directly: each new connection would be a separate, empty
+# database, so every thread of the process shares the one connection. Other
+# processes, such as the scheduler workers, cannot see it at all, so the API
+# refuses schedule generation on it.
+IN_MEMORY_DATABASE = DATABASE_URL.startswith("sqlite") and make_url(DATABASE_URL).database in (None, "", ":memory:")
+if IN_MEMORY_DATABASE:
+    POOL_OPTIONS = {"poolclass": StaticPool, "connect_args": {"check_same_thread": False}}
+
+engine = create_engine(DATABASE_URL, **POOL_OPTIONS)
+
+# Throwaway SQLite databases (the demo scripts, test runs) can skip journaling
+# to disk and fsyncs with SQLITE_NO_FSYNC=1; a crash can then corrupt the file,
+# so never set it for a database whose contents matter
+if DATABASE_URL.startswith("sqlite") and os.getenv("SQLITE_NO_FSYNC") == "1":
+    @event.listens_for(engine, "connect")
+    def _disable_sqlite_fsync(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=MEMORY")
+        cursor.execute("PRAGMA synchronous=OFF")
+        cursor.close()
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# For endpoints that only read: nothing is ever pending, and loaded objects
+# are never expired, so serializing them after the query costs no reloads
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 Base = declarative_base()
 
+@lru_cache(maxsize=None)
+def ensure_schema(bind=engine) -> None:
+    """Create any missing tables on bind; only the first call per engine does work."""
+    from . import models  # registers every table on Base.metadata
+    Base.metadata.create_all(bind=bind)
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def get_readonly_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
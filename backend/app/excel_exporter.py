@@ -3,26 +3,64 @@ Excel Export Service for Campus Scheduling System
 
 Generates Excel workbooks with three views:
 1. Teacher View: Schedule per teacher with gaps
-2. Section View: Schedule per course/section  
+2. Section View: Schedule per course/section
 3. Room/Building View: Schedule by room and building
 Plus: Validation checklist of all input data
 """
 
+import csv
+import enum
 import io
-from datetime import datetime, time as time_type
-from typing import List, Dict, Optional, Tuple
-from sqlalchemy.orm import Session
-import pandas as pd
-from openpyxl import Workbook
-from openpyxl.styles import Font, PatternFill, Alignment, Border, Side
-from openpyxl.utils import get_column_letter
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, BinaryIO, Iterator, List, Dict, Optional, Sequence, Tuple
+from sqlalchemy import case, distinct, func, select
+from sqlalchemy.orm import Session, contains_eager, load_only, raiseload, selectinload
+import xlsxwriter
+from xlsxwriter.format import Format
+from xlsxwriter.worksheet import Worksheet
 
 from . import models
 
 
+class _RowWriter:
+    """
+    Appends rows to an xlsxwriter worksheet top to bottom.
+
+    constant_memory mode flushes each row once a later one is started, so
+    rows must be written strictly in order; this keeps the row counter.
+    """
+
+    def __init__(self, ws: Worksheet):
+        self.ws = ws
+        self.row = 0
+        # Bound once: these run per row, and the attribute lookups add up
+        self._write_row = ws.write_row
+        self._write_string = ws.write_string
+        self._write = ws.write
+
+    def append(self, values: Sequence[Any] = (), cell_format: Optional[Format] = None):
+        """Write a row of values sharing one format (or an empty separator row)."""
+        if values:
+            self._write_row(self.row, 0, values, cell_format)
+        self.row += 1
+
+    def label(self, text: str, cell_format: Optional[Format] = None):
+        """Write a single-cell label row (titles, entity and section headers)."""
+        self._write_string(self.row, 0, text, cell_format)
+        self.row += 1
+
+    def append_cells(self, cells: Sequence[Tuple[Any, Optional[Format]]]):
+        """Write a row of (value, format) pairs."""
+        write = self._write
+        for col, (value, cell_format) in enumerate(cells):
+            write(self.row, col, value, cell_format)
+        self.row += 1
+
+
 class ExcelExporter:
     """Generates Excel workbooks with scheduling data in multiple views."""
-    
+
     # Color scheme for courses (hex values without #)
     COLOR_PALETTE = [
         "FFE699",  # Yellow
@@ -36,28 +74,58 @@ class ExcelExporter:
         "EDEDED",  # Light Gray
         "E7E6E6",  # Gray
     ]
-    
+    DEFAULT_COLOR = "FFFFFF"
+
     DAYS_OF_WEEK = ["MON", "TUE", "WED", "THU", "FRI", "SAT"]
-    HEADER_FONT = Font(bold=True, size=12, color="FFFFFF")
-    HEADER_FILL = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-    BORDER = Border(
-        left=Side(style='thin'),
-        right=Side(style='thin'),
-        top=Side(style='thin'),
-        bottom=Side(style='thin')
-    )
-    
+    DAY_INDEX: Dict[str, int] = {day: idx for idx, day in enumerate(DAYS_OF_WEEK)}
+    # Display strings of the enum members the views print (a dict hit instead of .value)
+    ENUM_VALUES: Dict[enum.Enum, str] = {
+        member: member.value
+        for enum_type in (models.DayOfWeek, models.TeacherTitle, models.TeacherStatus, models.Workload, models.RoomType)
+        for member in enum_type
+    }
+
+    # Table headers per view
+    TEACHER_HEADERS = ("Day", "Start", "End", "Course", "Section", "Room", "Building")
+    SECTION_HEADERS = ("Day", "Start", "End", "Course", "Teacher", "Room", "Building")
+    ROOM_HEADERS = ("Day", "Start", "End", "Course", "Section", "Teacher")
+    CSV_HEADERS = ("Day", "Start", "End", "Course", "Section", "Teacher", "Room", "Building")
+
+    # xlsxwriter format properties, added to each workbook once as it is created
+    HEADER_FORMAT = {
+        "bold": True, "font_size": 12, "font_color": "#FFFFFF",
+        "bg_color": "#366092", "pattern": 1,
+        "border": 1, "align": "center", "valign": "vcenter",
+    }
+    DATA_FORMAT = {"pattern": 1, "border": 1, "align": "left", "valign": "vcenter"}  # + bg_color per course
+    LABEL_FORMATS = {
+        "title": {"bold": True, "font_size": 14},
+        "subtitle": {"italic": True, "font_size": 10},
+        "detail": {"italic": True, "font_size": 9},
+        "entity": {"bold": True, "font_size": 11},
+        "building": {"bold": True, "font_size": 10, "font_color": "#FFFFFF", "bg_color": "#4472C4", "pattern": 1},
+        "room": {"bold": True, "font_size": 10},
+        "section": {"bold": True, "font_size": 11, "font_color": "#FFFFFF", "bg_color": "#366092", "pattern": 1},
+        "label": {"bold": True},
+        "pass": {"font_color": "#006100", "bg_color": "#C6EFCE", "pattern": 1},
+        "fail": {"font_color": "#9C0006", "bg_color": "#FFC7CE", "pattern": 1},
+    }
+
     def __init__(self, db: Session):
         self.db = db
         self.color_map: Dict[int, str] = {}  # Map course_id to color
+        # Formats of the workbook currently being written
+        self.format_map: Dict[int, Format] = {}  # Map course_id to its data-row format
+        self._formats: Dict[str, Format] = {}
         self._init_color_map()
-    
+
     def _init_color_map(self):
         """Initialize color assignments for courses."""
-        courses = self.db.query(models.Course).all()
-        for idx, course in enumerate(courses):
-            self.color_map[course.id] = self.COLOR_PALETTE[idx % len(self.COLOR_PALETTE)]
-    
+        # Plain Core select: only the ids are needed, no ORM rows
+        course_ids = self.db.execute(select(models.Course.id).order_by(models.Course.id)).scalars().all()
+        n_colors = len(self.COLOR_PALETTE)
+        self.color_map = {course_id: self.COLOR_PALETTE[idx % n_colors] for idx, course_id in enumerate(course_ids)}
+
     def export_schedule(
         self,
         schedule_run_id: int,
@@ -65,353 +133,448 @@ class ExcelExporter:
     ) -> bytes:
         """
         Export a complete schedule to Excel with all three views.
-        
+
         Args:
             schedule_run_id: ID of the schedule run to export
             institution_name: Name of the institution (for header)
-        
+
         Returns:
             bytes: Excel file content
         """
+        output = io.BytesIO()
+        self.write_schedule(schedule_run_id, output, institution_name)
+        return output.getvalue()
+
+    def write_schedule(
+        self,
+        schedule_run_id: int,
+        output: BinaryIO,
+        institution_name: str = "Campus Scheduling System"
+    ) -> None:
+        """
+        Write a complete schedule workbook into a binary file-like object.
+
+        Lets callers stream the workbook (e.g. from a spooled temp file)
+        instead of holding an extra bytes copy of it. The workbook is written
+        in xlsxwriter's constant_memory mode, which flushes every row to a
+        temp file as soon as the next one starts, so peak memory follows the
+        loaded entries rather than the sheet sizes.
+
+        Args:
+            schedule_run_id: ID of the schedule run to export
+            output: Writable, seekable binary file object; left positioned at the end
+            institution_name: Name of the institution (for header)
+        """
         # Load schedule data
         schedule_run = self.db.query(models.ScheduleRun).filter(
             models.ScheduleRun.id == schedule_run_id
         ).first()
-        
+
         if not schedule_run:
             raise ValueError(f"Schedule run {schedule_run_id} not found")
-        
-        schedule_entries = self.db.query(models.ScheduleEntry).filter(
+
+        schedule_entries = self._load_entries(schedule_run_id)
+
+        # Create workbook (constant_memory: rows are flushed to disk in order)
+        wb = xlsxwriter.Workbook(output, {"constant_memory": True})
+        self._add_formats(wb)
+
+        # Group entries for all three views at once; buckets inherit the query's day/time order
+        entries_by_teacher, entries_by_section, entries_by_room = self._group_entries(schedule_entries)
+
+        # One timestamp for every sheet header
+        exported_at = datetime.now()
+
+        # Add sheets
+        self._add_teacher_view(wb, entries_by_teacher, institution_name, exported_at)
+        self._add_section_view(wb, entries_by_section, institution_name, exported_at)
+        self._add_room_view(wb, entries_by_room, institution_name, exported_at)
+        self._add_checklist_view(wb, schedule_run, exported_at)
+
+        wb.close()
+
+    def _load_entries(self, schedule_run_id: int) -> List[models.ScheduleEntry]:
+        """Load a run's schedule entries with everything the views and CSV rows read."""
+        # Everything the views read (and only those columns) is loaded up front in
+        # a fixed number of batched IN queries (any other lazy load raises), already
+        # in weekday/start-time order (the enum names don't sort as weekdays)
+        day_order = case(
+            *((models.Timeslot.day_of_week == models.DayOfWeek(day), idx) for day, idx in self.DAY_INDEX.items()),
+            else_=len(self.DAYS_OF_WEEK),
+        )
+        return self.db.query(models.ScheduleEntry).join(
+            models.ScheduleEntry.timeslot
+        ).options(
+            selectinload(models.ScheduleEntry.teacher).load_only(
+                models.Teacher.full_name, models.Teacher.title,
+                models.Teacher.status, models.Teacher.workload,
+            ),
+            selectinload(models.ScheduleEntry.course).load_only(models.Course.course_code),
+            selectinload(models.ScheduleEntry.section),
+            selectinload(models.ScheduleEntry.room).load_only(
+                models.Room.building_id, models.Room.room_code, models.Room.floor_no,
+                models.Room.room_type, models.Room.capacity,
+            ).selectinload(models.Room.building).load_only(models.Building.code, models.Building.name),
+            contains_eager(models.ScheduleEntry.timeslot).load_only(
+                models.Timeslot.day_of_week, models.Timeslot.start_time, models.Timeslot.end_time,
+            ),
+            raiseload("*"),
+        ).filter(
             models.ScheduleEntry.schedule_run_id == schedule_run_id
+        ).order_by(
+            day_order, models.Timeslot.start_time, models.ScheduleEntry.id
         ).all()
-        
-        # Create workbook
-        wb = Workbook()
-        wb.remove(wb.active)  # Remove default sheet
-        
-        # Add sheets
-        self._add_teacher_view(wb, schedule_entries, institution_name)
-        self._add_section_view(wb, schedule_entries, institution_name)
-        self._add_room_view(wb, schedule_entries, institution_name)
-        self._add_checklist_view(wb, schedule_run)
-        
-        # Write to bytes
-        output = io.BytesIO()
-        wb.save(output)
-        output.seek(0)
-        return output.read()
-    
-    def _add_teacher_view(
+
+    def iter_csv(self, schedule_run_id: int, rows_per_chunk: int = 500) -> Iterator[bytes]:
+        """
+        Load a run's entries and return an iterator over its CSV export.
+
+        One row per entry in day/time order, encoded in chunks of
+        rows_per_chunk rows; nothing is generated but the rows themselves.
+        The entries are loaded before this returns, so the iterator only
+        formats already-loaded objects.
+        """
+        schedule_entries = self._load_entries(schedule_run_id)
+        enum_values = self.ENUM_VALUES
+
+        def generate() -> Iterator[bytes]:
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(self.CSV_HEADERS)
+            for start in range(0, len(schedule_entries), rows_per_chunk):
+                writer.writerows(
+                    (
+                        enum_values[entry.timeslot.day_of_week],
+                        entry.timeslot.start_time,
+                        entry.timeslot.end_time,
+                        entry.course.course_code,
+                        entry.section.code,
+                        entry.teacher.full_name,
+                        entry.room.room_code,
+                        entry.room.building.name if entry.room.building else "N/A"
+                    )
+                    for entry in schedule_entries[start:start + rows_per_chunk]
+                )
+                yield buffer.getvalue().encode("utf-8")
+                buffer.seek(0)
+                buffer.truncate()
+            if buffer.tell():
+                yield buffer.getvalue().encode("utf-8")  # header of an empty run
+
+        return generate()
+
+    def _group_entries(
         self,
-        wb: Workbook,
-        schedule_entries: List[models.ScheduleEntry],
-        institution_name: str
-    ):
-        """Add Teacher View sheet - Schedule per teacher with gaps."""
-        ws = wb.create_sheet("Teacher View")
-        
-        # Get unique teachers
-        teachers = {}
+        schedule_entries: List[models.ScheduleEntry]
+    ) -> Tuple[Dict[int, List[models.ScheduleEntry]], ...]:
+        """
+        Group entries by teacher, section and room in a single pass.
+
+        Entries must arrive in day/start-time order; the buckets keep it, so
+        no per-bucket sort is needed. Each entry also gets the plain attributes
+        the views read per row: _day, _course_code, _section_code, _room_code,
+        _teacher_name, _building_name ("N/A" if no building) and
+        _building_code ("Z" if no building, so unassigned rooms sort last).
+        Returns: (entries_by_teacher, entries_by_section, entries_by_room)
+        """
+        enum_values = self.ENUM_VALUES
+        by_teacher: Dict[int, List[models.ScheduleEntry]] = defaultdict(list)
+        by_section: Dict[int, List[models.ScheduleEntry]] = defaultdict(list)
+        by_room: Dict[int, List[models.ScheduleEntry]] = defaultdict(list)
         for entry in schedule_entries:
-            if entry.teacher_id not in teachers:
-                teachers[entry.teacher_id] = entry.teacher
-        
+            room = entry.room
+            building = room.building
+            entry._day = enum_values[entry.timeslot.day_of_week]
+            entry._course_code = entry.course.course_code
+            entry._section_code = entry.section.code
+            entry._room_code = room.room_code
+            entry._teacher_name = entry.teacher.full_name
+            entry._building_name = building.name if building else "N/A"
+            entry._building_code = building.code if building else "Z"
+            by_teacher[entry.teacher_id].append(entry)
+            by_section[entry.section_id].append(entry)
+            by_room[entry.room_id].append(entry)
+
+        return by_teacher, by_section, by_room
+
+    def _add_formats(self, wb: xlsxwriter.Workbook):
+        """
+        Add the label, table header and per-course data formats to a workbook.
+
+        Data formats are made once per palette color and shared by every course
+        with that color: xlsxwriter keeps each added format for the workbook's
+        lifetime and writes it into styles.xml.
+        """
+        self._formats = {name: wb.add_format(props) for name, props in self.LABEL_FORMATS.items()}
+        self._formats["header"] = wb.add_format(self.HEADER_FORMAT)
+
+        color_formats: Dict[str, Format] = {}
+
+        def data_format(color: str) -> Format:
+            if color not in color_formats:
+                color_formats[color] = wb.add_format({**self.DATA_FORMAT, "bg_color": f"#{color}"})
+            return color_formats[color]
+
+        self._formats["data"] = data_format(self.DEFAULT_COLOR)
+        self.format_map = {course_id: data_format(color) for course_id, color in self.color_map.items()}
+
+    def _emit_rows(self, ws: Worksheet, rows: List[Tuple[Any, Sequence[Any]]]):
+        """
+        Write rows produced by a _build_*_rows method into a worksheet.
+
+        Each row is (style, values): style is a format name for label, header
+        and blank rows, or a course_id for data rows, resolved to that course's
+        color format (white if the course has none).
+        """
+        out = _RowWriter(ws)
+        append, label = out.append, out.label
+        fmt = self._formats
+        course_formats = self.format_map
+        default_format = fmt["data"]
+        for style, values in rows:
+            if not values:
+                append()
+            elif isinstance(style, int):
+                append(values, course_formats.get(style, default_format))
+            elif len(values) == 1:
+                label(values[0], fmt[style])
+            else:
+                append(values, fmt[style])
+
+    def _build_teacher_rows(
+        self,
+        entries_by_teacher: Dict[int, List[models.ScheduleEntry]],
+        institution_name: str,
+        exported_at: datetime
+    ) -> List[Tuple[Any, Sequence[Any]]]:
+        """Build the Teacher View rows (see _emit_rows for the row format)."""
+        enum_values = self.ENUM_VALUES
+
+        # Get unique teachers
+        teachers = {teacher_id: entries[0].teacher for teacher_id, entries in entries_by_teacher.items()}
+
         teachers = dict(sorted(teachers.items(), key=lambda x: x[1].full_name))
-        
-        row = 1
-        
+
         # Header
-        ws[f'A{row}'] = institution_name
-        ws[f'A{row}'].font = Font(bold=True, size=14)
-        row += 1
-        
-        ws[f'A{row}'] = f"Schedule Export - {datetime.now().strftime('%Y-%m-%d %H:%M')}"
-        ws[f'A{row}'].font = Font(italic=True, size=10)
-        row += 2
-        
+        rows = [
+            ("title", (institution_name,)),
+            ("subtitle", (f"Schedule Export - {exported_at.strftime('%Y-%m-%d %H:%M')}",)),
+            (None, ()),
+        ]
+        append = rows.append
+
         for teacher_id, teacher in teachers.items():
             # Teacher header
-            ws[f'A{row}'] = f"{teacher.full_name}"
-            ws[f'A{row}'].font = Font(bold=True, size=11)
-            row += 1
-            
-            ws[f'A{row}'] = f"Title: {teacher.title.value} | Status: {teacher.status.value} | Workload: {teacher.workload.value}"
-            ws[f'A{row}'].font = Font(italic=True, size=9)
-            row += 1
-            
+            append(("entity", (f"{teacher.full_name}",)))
+            append(("detail", (
+                f"Title: {enum_values[teacher.title]} | Status: {enum_values[teacher.status]} | "
+                f"Workload: {enum_values[teacher.workload]}",
+            )))
+
             # Table header
-            headers = ["Day", "Start", "End", "Course", "Section", "Room", "Building"]
-            for col, header in enumerate(headers, 1):
-                cell = ws.cell(row, col, header)
-                cell.font = self.HEADER_FONT
-                cell.fill = self.HEADER_FILL
-                cell.border = self.BORDER
-                cell.alignment = Alignment(horizontal="center", vertical="center")
-            
-            row += 1
-            
-            # Get teacher's schedule entries
-            teacher_entries = [e for e in schedule_entries if e.teacher_id == teacher_id]
-            teacher_entries.sort(key=lambda e: (
-                self.DAYS_OF_WEEK.index(e.timeslot.day_of_week.value),
-                e.timeslot.start_time
-            ))
-            
+            append(("header", self.TEACHER_HEADERS))
+
             # Add entries
-            for entry in teacher_entries:
-                color = self.color_map.get(entry.course_id, "FFFFFF")
-                fill = PatternFill(start_color=color, end_color=color, fill_type="solid")
-                
-                row_data = [
-                    entry.timeslot.day_of_week.value,
+            for entry in entries_by_teacher[teacher_id]:
+                append((entry.course_id, (
+                    entry._day,
                     entry.timeslot.start_time,
                     entry.timeslot.end_time,
-                    entry.course.course_code,
-                    entry.section.code,
-                    entry.room.room_code,
-                    entry.room.building.name if entry.room.building else "N/A"
-                ]
-                
-                for col, value in enumerate(row_data, 1):
-                    cell = ws.cell(row, col, value)
-                    cell.fill = fill
-                    cell.border = self.BORDER
-                    cell.alignment = Alignment(horizontal="left", vertical="center")
-                
-                row += 1
-            
-            row += 1  # Blank line between teachers
-        
-        # Adjust column widths
-        ws.column_dimensions['A'].width = 12
-        ws.column_dimensions['B'].width = 10
-        ws.column_dimensions['C'].width = 10
-        ws.column_dimensions['D'].width = 15
-        ws.column_dimensions['E'].width = 15
-        ws.column_dimensions['F'].width = 12
-        ws.column_dimensions['G'].width = 15
-    
-    def _add_section_view(
+                    entry._course_code,
+                    entry._section_code,
+                    entry._room_code,
+                    entry._building_name
+                )))
+
+            append((None, ()))  # Blank line between teachers
+
+        return rows
+
+    def _add_teacher_view(
         self,
-        wb: Workbook,
-        schedule_entries: List[models.ScheduleEntry],
-        institution_name: str
+        wb: xlsxwriter.Workbook,
+        entries_by_teacher: Dict[int, List[models.ScheduleEntry]],
+        institution_name: str,
+        exported_at: datetime
     ):
-        """Add Section View sheet - Schedule per course/section."""
-        ws = wb.create_sheet("Section View")
-        
+        """Add Teacher View sheet - Schedule per teacher with gaps."""
+        ws = wb.add_worksheet("Teacher View")
+
+        # Column widths
+        ws.set_column(0, 0, 12)
+        ws.set_column(1, 2, 10)
+        ws.set_column(3, 4, 15)
+        ws.set_column(5, 5, 12)
+        ws.set_column(6, 6, 15)
+
+        self._emit_rows(ws, self._build_teacher_rows(entries_by_teacher, institution_name, exported_at))
+
+    def _build_section_rows(
+        self,
+        entries_by_section: Dict[int, List[models.ScheduleEntry]],
+        institution_name: str,
+        exported_at: datetime
+    ) -> List[Tuple[Any, Sequence[Any]]]:
+        """Build the Section View rows (see _emit_rows for the row format)."""
         # Get unique sections
-        sections = {}
-        for entry in schedule_entries:
-            if entry.section_id not in sections:
-                sections[entry.section_id] = entry.section
-        
+        sections = {section_id: entries[0].section for section_id, entries in entries_by_section.items()}
+
         sections = dict(sorted(sections.items(), key=lambda x: x[1].code))
-        
-        row = 1
-        
+
         # Header
-        ws[f'A{row}'] = institution_name
-        ws[f'A{row}'].font = Font(bold=True, size=14)
-        row += 1
-        
-        ws[f'A{row}'] = f"Course/Section Schedule - {datetime.now().strftime('%Y-%m-%d %H:%M')}"
-        ws[f'A{row}'].font = Font(italic=True, size=10)
-        row += 2
-        
+        rows = [
+            ("title", (institution_name,)),
+            ("subtitle", (f"Course/Section Schedule - {exported_at.strftime('%Y-%m-%d %H:%M')}",)),
+            (None, ()),
+        ]
+        append = rows.append
+
         for section_id, section in sections.items():
             # Section header
-            ws[f'A{row}'] = f"{section.code}"
-            ws[f'A{row}'].font = Font(bold=True, size=11)
-            row += 1
-            
-            ws[f'A{row}'] = f"Year Level: {section.year_level} | 1st Year: {'Yes' if section.is_first_year else 'No'}"
-            ws[f'A{row}'].font = Font(italic=True, size=9)
-            row += 1
-            
+            append(("entity", (f"{section.code}",)))
+            append(("detail", (
+                f"Year Level: {section.year_level} | 1st Year: {'Yes' if section.is_first_year else 'No'}",
+            )))
+
             # Table header
-            headers = ["Day", "Start", "End", "Course", "Teacher", "Room", "Building"]
-            for col, header in enumerate(headers, 1):
-                cell = ws.cell(row, col, header)
-                cell.font = self.HEADER_FONT
-                cell.fill = self.HEADER_FILL
-                cell.border = self.BORDER
-                cell.alignment = Alignment(horizontal="center", vertical="center")
-            
-            row += 1
-            
-            # Get section's schedule entries
-            section_entries = [e for e in schedule_entries if e.section_id == section_id]
-            section_entries.sort(key=lambda e: (
-                self.DAYS_OF_WEEK.index(e.timeslot.day_of_week.value),
-                e.timeslot.start_time
-            ))
-            
+            append(("header", self.SECTION_HEADERS))
+
             # Add entries
-            for entry in section_entries:
-                color = self.color_map.get(entry.course_id, "FFFFFF")
-                fill = PatternFill(start_color=color, end_color=color, fill_type="solid")
-                
-                row_data = [
-                    entry.timeslot.day_of_week.value,
+            for entry in entries_by_section[section_id]:
+                append((entry.course_id, (
+                    entry._day,
                     entry.timeslot.start_time,
                     entry.timeslot.end_time,
-                    entry.course.course_code,
-                    entry.teacher.full_name,
-                    entry.room.room_code,
-                    entry.room.building.name if entry.room.building else "N/A"
-                ]
-                
-                for col, value in enumerate(row_data, 1):
-                    cell = ws.cell(row, col, value)
-                    cell.fill = fill
-                    cell.border = self.BORDER
-                    cell.alignment = Alignment(horizontal="left", vertical="center")
-                
-                row += 1
-            
-            row += 1  # Blank line between sections
-        
-        # Adjust column widths
-        ws.column_dimensions['A'].width = 12
-        ws.column_dimensions['B'].width = 10
-        ws.column_dimensions['C'].width = 10
-        ws.column_dimensions['D'].width = 15
-        ws.column_dimensions['E'].width = 20
-        ws.column_dimensions['F'].width = 12
-        ws.column_dimensions['G'].width = 15
-    
-    def _add_room_view(
+                    entry._course_code,
+                    entry._teacher_name,
+                    entry._room_code,
+                    entry._building_name
+                )))
+
+            append((None, ()))  # Blank line between sections
+
+        return rows
+
+    def _add_section_view(
         self,
-        wb: Workbook,
-        schedule_entries: List[models.ScheduleEntry],
-        institution_name: str
+        wb: xlsxwriter.Workbook,
+        entries_by_section: Dict[int, List[models.ScheduleEntry]],
+        institution_name: str,
+        exported_at: datetime
     ):
-        """Add Room/Building View sheet - Schedule by room and building."""
-        ws = wb.create_sheet("Room View")
-        
+        """Add Section View sheet - Schedule per course/section."""
+        ws = wb.add_worksheet("Section View")
+
+        # Column widths
+        ws.set_column(0, 0, 12)
+        ws.set_column(1, 2, 10)
+        ws.set_column(3, 3, 15)
+        ws.set_column(4, 4, 20)
+        ws.set_column(5, 5, 12)
+        ws.set_column(6, 6, 15)
+
+        self._emit_rows(ws, self._build_section_rows(entries_by_section, institution_name, exported_at))
+
+    def _build_room_rows(
+        self,
+        entries_by_room: Dict[int, List[models.ScheduleEntry]],
+        institution_name: str,
+        exported_at: datetime
+    ) -> List[Tuple[Any, Sequence[Any]]]:
+        """Build the Room View rows (see _emit_rows for the row format)."""
         # Get unique rooms
-        rooms = {}
-        for entry in schedule_entries:
-            if entry.room_id not in rooms:
-                rooms[entry.room_id] = entry.room
-        
+        rooms = {room_id: entries[0].room for room_id, entries in entries_by_room.items()}
+
         # Sort by building then room
         rooms = dict(sorted(
             rooms.items(),
             key=lambda x: (
-                x[1].building.code if x[1].building else "Z",
+                entries_by_room[x[0]][0]._building_code,
                 x[1].room_code
             )
         ))
-        
-        row = 1
-        
+
         # Header
-        ws[f'A{row}'] = institution_name
-        ws[f'A{row}'].font = Font(bold=True, size=14)
-        row += 1
-        
-        ws[f'A{row}'] = f"Room/Building Schedule - {datetime.now().strftime('%Y-%m-%d %H:%M')}"
-        ws[f'A{row}'].font = Font(italic=True, size=10)
-        row += 2
-        
+        rows = [
+            ("title", (institution_name,)),
+            ("subtitle", (f"Room/Building Schedule - {exported_at.strftime('%Y-%m-%d %H:%M')}",)),
+            (None, ()),
+        ]
+        append = rows.append
+
         current_building = None
-        
+
         for room_id, room in rooms.items():
             building_name = room.building.name if room.building else "Unassigned"
-            
+
             # Building header (only once per building)
             if current_building != building_name:
                 if current_building is not None:
-                    row += 1
-                
-                ws[f'A{row}'] = f"Building: {building_name}"
-                ws[f'A{row}'].font = Font(bold=True, size=10, color="FFFFFF")
-                ws[f'A{row}'].fill = PatternFill(start_color="4472C4", end_color="4472C4", fill_type="solid")
-                row += 1
+                    append((None, ()))
+
+                append(("building", (f"Building: {building_name}",)))
                 current_building = building_name
-            
+
             # Room header
-            ws[f'A{row}'] = f"  {room.room_code}"
-            ws[f'A{row}'].font = Font(bold=True, size=10)
-            row += 1
-            
-            ws[f'A{row}'] = f"  Floor: {room.floor_no} | Type: {room.room_type.value} | Capacity: {room.capacity}"
-            ws[f'A{row}'].font = Font(italic=True, size=9)
-            row += 1
-            
+            append(("room", (f"  {room.room_code}",)))
+            append(("detail", (
+                f"  Floor: {room.floor_no} | Type: {self.ENUM_VALUES[room.room_type]} | Capacity: {room.capacity}",
+            )))
+
             # Table header
-            headers = ["Day", "Start", "End", "Course", "Section", "Teacher"]
-            for col, header in enumerate(headers, 1):
-                cell = ws.cell(row, col, header)
-                cell.font = self.HEADER_FONT
-                cell.fill = self.HEADER_FILL
-                cell.border = self.BORDER
-                cell.alignment = Alignment(horizontal="center", vertical="center")
-            
-            row += 1
-            
-            # Get room's schedule entries
-            room_entries = [e for e in schedule_entries if e.room_id == room_id]
-            room_entries.sort(key=lambda e: (
-                self.DAYS_OF_WEEK.index(e.timeslot.day_of_week.value),
-                e.timeslot.start_time
-            ))
-            
+            append(("header", self.ROOM_HEADERS))
+
             # Add entries
-            for entry in room_entries:
-                color = self.color_map.get(entry.course_id, "FFFFFF")
-                fill = PatternFill(start_color=color, end_color=color, fill_type="solid")
-                
-                row_data = [
-                    entry.timeslot.day_of_week.value,
+            for entry in entries_by_room[room_id]:
+                append((entry.course_id, (
+                    entry._day,
                     entry.timeslot.start_time,
                     entry.timeslot.end_time,
-                    entry.course.course_code,
-                    entry.section.code,
-                    entry.teacher.full_name
-                ]
-                
-                for col, value in enumerate(row_data, 1):
-                    cell = ws.cell(row, col, value)
-                    cell.fill = fill
-                    cell.border = self.BORDER
-                    cell.alignment = Alignment(horizontal="left", vertical="center")
-                
-                row += 1
-            
-            row += 1  # Blank line between rooms
-        
-        # Adjust column widths
-        ws.column_dimensions['A'].width = 15
-        ws.column_dimensions['B'].width = 10
-        ws.column_dimensions['C'].width = 10
-        ws.column_dimensions['D'].width = 15
-        ws.column_dimensions['E'].width = 15
-        ws.column_dimensions['F'].width = 20
-    
-    def _add_checklist_view(self, wb: Workbook, schedule_run: models.ScheduleRun):
+                    entry._course_code,
+                    entry._section_code,
+                    entry._teacher_name
+                )))
+
+            append((None, ()))  # Blank line between rooms
+
+        return rows
+
+    def _add_room_view(
+        self,
+        wb: xlsxwriter.Workbook,
+        entries_by_room: Dict[int, List[models.ScheduleEntry]],
+        institution_name: str,
+        exported_at: datetime
+    ):
+        """Add Room/Building View sheet - Schedule by room and building."""
+        ws = wb.add_worksheet("Room View")
+
+        # Column widths
+        ws.set_column(0, 0, 15)
+        ws.set_column(1, 2, 10)
+        ws.set_column(3, 4, 15)
+        ws.set_column(5, 5, 20)
+
+        self._emit_rows(ws, self._build_room_rows(entries_by_room, institution_name, exported_at))
+
+    def _add_checklist_view(self, wb: xlsxwriter.Workbook, schedule_run: models.ScheduleRun, exported_at: datetime):
         """Add Checklist view - Validation of all input data."""
-        ws = wb.create_sheet("Checklist")
-        
-        row = 1
-        
+        ws = wb.add_worksheet("Checklist")
+        rows = _RowWriter(ws)
+        fmt = self._formats
+
+        # Column widths
+        ws.set_column(0, 0, 40)
+        ws.set_column(1, 1, 30)
+
         # Header
-        ws[f'A{row}'] = "Data Validation Checklist"
-        ws[f'A{row}'].font = Font(bold=True, size=14)
-        row += 1
-        
-        ws[f'A{row}'] = f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}"
-        ws[f'A{row}'].font = Font(italic=True, size=9)
-        row += 2
-        
+        rows.label("Data Validation Checklist", fmt["title"])
+        rows.label(f"Generated: {exported_at.strftime('%Y-%m-%d %H:%M:%S')}", fmt["detail"])
+        rows.append()
+
         # Summary Info
-        ws[f'A{row}'] = "Schedule Information"
-        ws[f'A{row}'].font = Font(bold=True, size=11, color="FFFFFF")
-        ws[f'A{row}'].fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-        row += 1
-        
+        rows.label("Schedule Information", fmt["section"])
+
         checklist_items = [
             ("Schedule Run ID", str(schedule_run.id)),
             ("Term ID", str(schedule_run.term_id)),
@@ -420,30 +583,29 @@ class ExcelExporter:
             ("Created By", schedule_run.created_by),
             ("Created At", schedule_run.created_at.strftime('%Y-%m-%d %H:%M:%S')),
         ]
-        
+
         for label, value in checklist_items:
-            ws[f'A{row}'] = label
-            ws[f'A{row}'].font = Font(bold=True)
-            ws[f'B{row}'] = value
-            row += 1
-        
-        row += 1
-        
-        # Data Counts
-        teachers_count = self.db.query(models.Teacher).filter(models.Teacher.active == True).count()
-        courses_count = self.db.query(models.Course).count()
-        sections_count = self.db.query(models.Section).count()
-        rooms_count = self.db.query(models.Room).filter(models.Room.active == True).count()
-        timeslots_count = self.db.query(models.Timeslot).count()
-        assignments_count = self.db.query(models.ScheduleEntry).filter(
-            models.ScheduleEntry.schedule_run_id == schedule_run.id
-        ).count()
-        
-        ws[f'A{row}'] = "Data Summary"
-        ws[f'A{row}'].font = Font(bold=True, size=11, color="FFFFFF")
-        ws[f'A{row}'].fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-        row += 1
-        
+            rows.append_cells([(label, fmt["label"]), (value, None)])
+
+        rows.append()
+
+        # Data Counts (one round trip)
+        (
+            teachers_count, courses_count, sections_count,
+            rooms_count, timeslots_count, assignments_count
+        ) = self.db.execute(select(
+            select(func.count()).select_from(models.Teacher).where(models.Teacher.active == True).scalar_subquery(),
+            select(func.count()).select_from(models.Course).scalar_subquery(),
+            select(func.count()).select_from(models.Section).scalar_subquery(),
+            select(func.count()).select_from(models.Room).where(models.Room.active == True).scalar_subquery(),
+            select(func.count()).select_from(models.Timeslot).scalar_subquery(),
+            select(func.count()).select_from(models.ScheduleEntry).where(
+                models.ScheduleEntry.schedule_run_id == schedule_run.id
+            ).scalar_subquery(),
+        )).one()
+
+        rows.label("Data Summary", fmt["section"])
+
         summary_items = [
             ("Active Teachers", str(teachers_count)),
             ("Courses", str(courses_count)),
@@ -452,97 +614,66 @@ class ExcelExporter:
             ("Available Timeslots", str(timeslots_count)),
             ("Schedule Entries", str(assignments_count)),
         ]
-        
+
         for label, value in summary_items:
-            ws[f'A{row}'] = label
-            ws[f'A{row}'].font = Font(bold=True)
-            ws[f'B{row}'] = value
-            row += 1
-        
-        row += 1
-        
+            rows.append_cells([(label, fmt["label"]), (value, None)])
+
+        rows.append()
+
         # Validation Checks
-        ws[f'A{row}'] = "Validation Checks"
-        ws[f'A{row}'].font = Font(bold=True, size=11, color="FFFFFF")
-        ws[f'A{row}'].fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-        row += 1
-        
+        rows.label("Validation Checks", fmt["section"])
+
         # Perform checks
         checks = self._perform_validation_checks(schedule_run.id)
-        
+
         for check_name, check_result in checks:
-            ws[f'A{row}'] = check_name
-            ws[f'B{row}'] = "✓ PASS" if check_result else "✗ FAIL"
-            
             if check_result:
-                ws[f'B{row}'].fill = PatternFill(start_color="C6EFCE", end_color="C6EFCE", fill_type="solid")
-                ws[f'B{row}'].font = Font(color="006100")
+                rows.append_cells([(check_name, None), ("✓ PASS", fmt["pass"])])
             else:
-                ws[f'B{row}'].fill = PatternFill(start_color="FFC7CE", end_color="FFC7CE", fill_type="solid")
-                ws[f'B{row}'].font = Font(color="9C0006")
-            
-            row += 1
-        
-        # Adjust column widths
-        ws.column_dimensions['A'].width = 40
-        ws.column_dimensions['B'].width = 30
-    
+                rows.append_cells([(check_name, None), ("✗ FAIL", fmt["fail"])])
+
     def _perform_validation_checks(self, schedule_run_id: int) -> List[Tuple[str, bool]]:
         """Perform validation checks on the schedule."""
         checks = []
         
+        # Checks 1-4 and 6: missing references and total, in one aggregate pass
+        entry = models.ScheduleEntry
+        counts = self.db.query(
+            func.count().label("total"),
+            func.sum(case((entry.teacher_id.is_(None), 1), else_=0)).label("no_teacher"),
+            func.sum(case((entry.course_id.is_(None), 1), else_=0)).label("no_course"),
+            func.sum(case((entry.room_id.is_(None), 1), else_=0)).label("no_room"),
+            func.sum(case((entry.timeslot_id.is_(None), 1), else_=0)).label("no_timeslot"),
+        ).filter(entry.schedule_run_id == schedule_run_id).one()
+        
         # Check 1: All entries have valid teachers
-        entries_without_teacher = self.db.query(models.ScheduleEntry).filter(
-            models.ScheduleEntry.schedule_run_id == schedule_run_id,
-            models.ScheduleEntry.teacher_id.is_(None)
-        ).count()
-        checks.append(("All entries assigned to teachers", entries_without_teacher == 0))
+        checks.append(("All entries assigned to teachers", not counts.no_teacher))
         
         # Check 2: All entries have valid courses
-        entries_without_course = self.db.query(models.ScheduleEntry).filter(
-            models.ScheduleEntry.schedule_run_id == schedule_run_id,
-            models.ScheduleEntry.course_id.is_(None)
-        ).count()
-        checks.append(("All entries assigned to courses", entries_without_course == 0))
+        checks.append(("All entries assigned to courses", not counts.no_course))
         
         # Check 3: All entries have valid rooms
-        entries_without_room = self.db.query(models.ScheduleEntry).filter(
-            models.ScheduleEntry.schedule_run_id == schedule_run_id,
-            models.ScheduleEntry.room_id.is_(None)
-        ).count()
-        checks.append(("All entries assigned to rooms", entries_without_room == 0))
+        checks.append(("All entries assigned to rooms", not counts.no_room))
         
         # Check 4: All entries have valid timeslots
-        entries_without_timeslot = self.db.query(models.ScheduleEntry).filter(
-            models.ScheduleEntry.schedule_run_id == schedule_run_id,
-            models.ScheduleEntry.timeslot_id.is_(None)
-        ).count()
-        checks.append(("All entries assigned to timeslots", entries_without_timeslot == 0))
-        
-        # Check 5: No teacher has > 5 teaching days per week
-        teachers = self.db.query(models.Teacher).filter(models.Teacher.active == True).all()
-        all_teachers_valid = True
-        for teacher in teachers:
-            teaching_days = self.db.query(models.ScheduleEntry.timeslot_id).filter(
-                models.ScheduleEntry.schedule_run_id == schedule_run_id,
-                models.ScheduleEntry.teacher_id == teacher.id
-            ).distinct(models.ScheduleEntry.timeslot_id).count()
-            
-            if teaching_days > 5:
-                all_teachers_valid = False
-                break
-        
-        checks.append(("Teachers teach max 5 days/week", all_teachers_valid))
+        checks.append(("All entries assigned to timeslots", not counts.no_timeslot))
+        
+        # Check 5: No active teacher has > 5 teaching days per week
+        overloaded_teacher = self.db.query(entry.teacher_id).join(
+            models.Teacher, models.Teacher.id == entry.teacher_id
+        ).filter(
+            entry.schedule_run_id == schedule_run_id,
+            models.Teacher.active == True
+        ).group_by(entry.teacher_id).having(
+            func.count(distinct(entry.timeslot_id)) > 5
+        ).first()
+        checks.append(("Teachers teach max 5 days/week", overloaded_teacher is None))
         
         # Check 6: Schedule has entries
-        total_entries = self.db.query(models.ScheduleEntry).filter(
-            models.ScheduleEntry.schedule_run_id == schedule_run_id
-        ).count()
-        checks.append(("Schedule has entries", total_entries > 0))
+        checks.append(("Schedule has entries", counts.total > 0))
         
         return checks
 
-
 def export_schedule_to_excel(
     schedule_run_id: int,
     db: Session,
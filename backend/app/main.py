@@ -1,13 +1,26 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from .database import engine
-from . import models
+from .database import ensure_schema
+from .pagination import NEXT_CURSOR_HEADER
 from .routers import master_data, scheduling, export, audit
 
 # Create database tables
-models.Base.metadata.create_all(bind=engine)
+ensure_schema()
 
-app = FastAPI(title="Campus Scheduling System", version="1.0.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Let running schedule generations finish before the process exits
+    scheduling.shutdown_scheduler_pool()
+
+app = FastAPI(
+    title="Campus Scheduling System",
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 
 # CORS middleware
 app.add_middleware(
@@ -16,6 +29,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[NEXT_CURSOR_HEADER],  # keyset pagination cursor
 )
 
 # Include routers
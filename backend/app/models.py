@@ -1,8 +1,22 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Numeric, Enum, Text, func
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Numeric, Enum, Text, Index, func
 from sqlalchemy.orm import relationship
 from .database import Base
 import enum
-from datetime import datetime
+import math
+from datetime import date, datetime, time
+from functools import lru_cache
+from typing import Optional, Tuple
+
+
+@lru_cache(maxsize=None)
+def hhmm_to_minutes(value: str) -> int:
+    """Convert an "HH:MM" string to minutes since midnight."""
+    if len(value) == 5 and value[2] == ":" and value[:2].isdigit() and value[3:].isdigit():
+        return ((ord(value[0]) - 48) * 600 + (ord(value[1]) - 48) * 60 +
+                (ord(value[3]) - 48) * 10 + (ord(value[4]) - 48))
+    # Unpadded hours ("7:30") and anything else int() can make sense of
+    hours, minutes = value.split(":")
+    return int(hours) * 60 + int(minutes)
 
 class RoomType(enum.Enum):
     STANDARD = "STANDARD"
@@ -69,10 +83,20 @@ class Room(Base):
     capacity = Column(Integer)
     active = Column(Boolean, default=True)
 
-    building = relationship("Building", back_populates="rooms")
+    building = relationship("Building", back_populates="rooms", lazy="joined")  # nested in the Room schema
     maintenance_blocks = relationship("RoomMaintenanceBlock", back_populates="room")
     schedule_entries = relationship("ScheduleEntry", back_populates="room")
 
+    __table_args__ = (
+        # Active-room loads (scheduler and constraint engine); partial, so it
+        # holds only the rows those queries return
+        Index(
+            "ix_rooms_active", "active",
+            postgresql_where=(active == True),
+            sqlite_where=(active == True),
+        ),
+    )
+
 class RoomMaintenanceBlock(Base):
     __tablename__ = "room_maintenance_blocks"
     id = Column(Integer, primary_key=True, index=True)
@@ -84,6 +108,20 @@ class RoomMaintenanceBlock(Base):
 
     room = relationship("Room", back_populates="maintenance_blocks")
 
+    def minutes_on(self, on_date: date) -> Optional[Tuple[int, int]]:
+        """
+        The block's span on on_date as [start, end) minutes since midnight.
+        
+        Multi-day blocks are clipped to the day; None if the block does not
+        touch on_date at all.
+        """
+        midnight = datetime.combine(on_date, time())
+        start_sec = (self.start_datetime - midnight).total_seconds()
+        end_sec = (self.end_datetime - midnight).total_seconds()
+        if end_sec <= 0 or start_sec >= 24 * 60 * 60:
+            return None
+        return max(0, math.floor(start_sec / 60)), min(24 * 60, math.ceil(end_sec / 60))
+
 class Teacher(Base):
     __tablename__ = "teachers"
     id = Column(Integer, primary_key=True, index=True)
@@ -140,9 +178,15 @@ class TeachingAssignment(Base):
     course_id = Column(Integer, ForeignKey("courses.id"))
     term_id = Column(Integer)  # Assuming term is an integer ID
 
-    teacher = relationship("Teacher", back_populates="teaching_assignments")
-    section = relationship("Section", back_populates="teaching_assignments")
-    course = relationship("Course", back_populates="teaching_assignments")
+    # Read for every assignment by the scheduler and solver
+    teacher = relationship("Teacher", back_populates="teaching_assignments", lazy="joined")
+    section = relationship("Section", back_populates="teaching_assignments", lazy="joined")
+    course = relationship("Course", back_populates="teaching_assignments", lazy="joined")
+
+    __table_args__ = (
+        # Per-term assignment loads and counts
+        Index("ix_teaching_assignments_term", "term_id"),
+    )
 
 class Timeslot(Base):
     __tablename__ = "timeslots"
@@ -154,6 +198,16 @@ class Timeslot(Base):
 
     schedule_entries = relationship("ScheduleEntry", back_populates="timeslot")
 
+    @property
+    def start_min(self) -> int:
+        """start_time as minutes since midnight."""
+        return hhmm_to_minutes(self.start_time)
+
+    @property
+    def end_min(self) -> int:
+        """end_time as minutes since midnight."""
+        return hhmm_to_minutes(self.end_time)
+
 class ScheduleRun(Base):
     __tablename__ = "schedule_runs"
     id = Column(Integer, primary_key=True, index=True)
@@ -161,7 +215,9 @@ class ScheduleRun(Base):
     status = Column(Enum(ScheduleRunStatus), default=ScheduleRunStatus.DRAFT)
     objective_score = Column(Numeric(precision=10, scale=2), nullable=True)
     created_by = Column(String)
-    created_at = Column(DateTime, default=func.now)
+    # Stamped by the database clock: default renders NOW() into SQLAlchemy's INSERTs
+    # (also on tables created before the server default), server_default covers the rest
+    created_at = Column(DateTime, default=func.now(), server_default=func.now(), nullable=False)
 
     schedule_entries = relationship("ScheduleEntry", back_populates="schedule_run")
 
@@ -176,6 +232,13 @@ class ScheduleEntry(Base):
     timeslot_id = Column(Integer, ForeignKey("timeslots.id"))
     is_locked = Column(Boolean, default=False)
 
+    __table_args__ = (
+        # Export / run queries (the run_id prefix also serves run-only filters)
+        Index("ix_schedule_entries_run_timeslot", "schedule_run_id", "timeslot_id"),
+        # Room occupancy probe in the constraint engine
+        Index("ix_schedule_entries_room_timeslot", "room_id", "timeslot_id"),
+    )
+
     schedule_run = relationship("ScheduleRun", back_populates="schedule_entries")
     teacher = relationship("Teacher", back_populates="schedule_entries")
     section = relationship("Section", back_populates="schedule_entries")
@@ -198,4 +261,11 @@ class AuditLog(Base):
     entity_type = Column(String)
     entity_id = Column(Integer)
     payload_json = Column(Text)
-    created_at = Column(DateTime, default=func.now)
\ No newline at end of file
+    # Stamped by the database clock: default renders NOW() into SQLAlchemy's INSERTs
+    # (also on tables created before the server default), server_default covers the rest
+    created_at = Column(DateTime, default=func.now(), server_default=func.now(), nullable=False)
+
+    __table_args__ = (
+        Index("ix_audit_logs_created_at", "created_at"),
+        Index("ix_audit_logs_entity", "entity_type", "entity_id"),
+    )
\ No newline at end of file
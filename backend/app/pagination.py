@@ -0,0 +1,61 @@
+"""
+Keyset (cursor) pagination for the list endpoints.
+
+Pages are taken in primary-key order with WHERE id > :last_id, so a page costs
+the same however deep it is (OFFSET scans and discards every skipped row).
+The cursor for the next page travels in the X-Next-Cursor response header, so
+response bodies stay plain lists.
+"""
+
+import base64
+import binascii
+from typing import Optional
+
+from fastapi import HTTPException, Response
+from sqlalchemy.orm import Query
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+MAX_SKIP = 10_000  # deeper pages should follow the cursor
+
+
+def encode_cursor(last_id: int) -> str:
+    """Encode the last id of a page as an opaque base64url cursor."""
+    return base64.urlsafe_b64encode(str(last_id).encode()).decode()
+
+
+def decode_cursor(cursor: str) -> int:
+    """Decode a cursor from encode_cursor; 400 if it is malformed."""
+    try:
+        return int(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def paginate(
+    query: Query,
+    id_column,
+    response: Response,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    limit: int = DEFAULT_PAGE_SIZE
+) -> list:
+    """
+    Return one page of a query in id order.
+
+    Fetches limit + 1 rows to learn whether another page follows, and if so
+    sets the X-Next-Cursor header. A cursor takes precedence over skip, which
+    is kept (as a plain OFFSET) for existing callers.
+    """
+    query = query.order_by(id_column)
+    if cursor is not None:
+        query = query.filter(id_column > decode_cursor(cursor))
+    elif skip:
+        query = query.offset(skip)
+
+    rows = query.limit(limit + 1).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(rows[-1].id)
+    return rows
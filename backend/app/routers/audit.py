@@ -1,23 +1,73 @@
-from fastapi import APIRouter, Depends
+from datetime import datetime
+from typing import List, Optional
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
-from ..database import get_db
+from ..database import get_readonly_db
+from ..pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, MAX_SKIP, paginate
 from .. import models, schemas
 
 router = APIRouter()
 
 @router.get("/audit-logs/", response_model=list[schemas.AuditLog])
-def read_audit_logs(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    logs = db.query(models.AuditLog).offset(skip).limit(limit).all()
+def read_audit_logs(
+    response: Response,
+    cursor: Optional[str] = None,
+    from_date: Optional[datetime] = None,
+    to_date: Optional[datetime] = None,
+    skip: int = Query(0, ge=0, le=MAX_SKIP),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_readonly_db)
+):
+    # The log only grows, so a read must be bounded by a cursor or a time range
+    if cursor is None and from_date is None and to_date is None:
+        raise HTTPException(status_code=400, detail="Provide a cursor or a from_date/to_date range")
+
+    query = db.query(models.AuditLog)
+    if from_date is not None:
+        query = query.filter(models.AuditLog.created_at >= from_date)
+    if to_date is not None:
+        query = query.filter(models.AuditLog.created_at < to_date)
+
+    # Ids are assigned in insert order, so id order is created_at order
+    # (and, unlike created_at, never NULL)
+    logs = paginate(query, models.AuditLog.id, response, cursor, skip, limit)
     return logs
 
-# Function to log actions (to be called from other places)
+def _encode_payload(payload: Optional[dict]) -> Optional[str]:
+    return orjson.dumps(payload, default=str).decode() if payload else None
+
+# Functions to log actions (to be called from other places). Neither commits:
+# the log rows go out with the caller's own transaction, in one commit.
 def log_action(db: Session, actor_id: str, action_type: str, entity_type: str, entity_id: int, payload: dict = None):
     log = models.AuditLog(
         actor_id=actor_id,
         action_type=action_type,
         entity_type=entity_type,
         entity_id=entity_id,
-        payload_json=str(payload) if payload else None
+        payload_json=_encode_payload(payload)
     )
     db.add(log)
-    db.commit()
\ No newline at end of file
+    return log
+
+def log_action_bulk(db: Session, rows: List[dict]):
+    """
+    Log many actions with one multi-row INSERT.
+
+    Each row takes log_action's keyword arguments (payload optional).
+    """
+    if not rows:
+        return
+    # Flush pending log_action rows first so ids keep following call order
+    db.flush()
+    db.execute(insert(models.AuditLog), [
+        {
+            "actor_id": row["actor_id"],
+            "action_type": row["action_type"],
+            "entity_type": row["entity_type"],
+            "entity_id": row["entity_id"],
+            "payload_json": _encode_payload(row.get("payload")),
+        }
+        for row in rows
+    ])
\ No newline at end of file
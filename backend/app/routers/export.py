@@ -1,15 +1,25 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from ..database import get_db
+from ..database import get_readonly_db
 from .. import models
 from ..excel_exporter import ExcelExporter
-from io import BytesIO
 from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+import tempfile
 
 router = APIRouter()
 
+# Exports up to this size stay in memory; larger ones spill to a temp file
+EXPORT_SPOOL_MAX_SIZE = 16 * 1024 * 1024
+EXPORT_CHUNK_SIZE = 64 * 1024
+
 @router.get("/export/{run_id}")
-def export_schedule(run_id: int, institution_name: str = "Campus Scheduling System", db: Session = Depends(get_db)):
+def export_schedule(
+    run_id: int,
+    institution_name: str = "Campus Scheduling System",
+    format: str = Query("xlsx", pattern="^(xlsx|csv)$"),
+    db: Session = Depends(get_readonly_db)
+):
     """
     Export a schedule run to Excel with three views:
     1. Teacher View - Schedule per teacher with gaps
@@ -17,25 +27,45 @@ def export_schedule(run_id: int, institution_name: str = "Campus Scheduling Syst
     3. Room View - Schedule by room and building
     4. Checklist - Validation of all input data
     
+    With format=csv, streams one flat row per entry instead (no workbook,
+    no styling), which is much cheaper for very large runs.
+    
     Args:
         run_id: Schedule run ID
         institution_name: Name of institution (for headers)
+        format: "xlsx" (default) or "csv"
     
     Returns:
-        Excel file with all views
+        Excel file with all views, or a CSV of all entries
     """
-    run = db.query(models.ScheduleRun).filter(models.ScheduleRun.id == run_id).first()
-    if not run:
+    # Existence only; the exporter loads the run itself
+    if db.query(models.ScheduleRun.id).filter(models.ScheduleRun.id == run_id).scalar() is None:
         raise HTTPException(status_code=404, detail="Schedule run not found")
     
+    timestamp = models.datetime.now().strftime('%Y%m%d_%H%M%S')
+    if format == "csv":
+        try:
+            rows = ExcelExporter(db).iter_csv(run_id)
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}")
+        return StreamingResponse(
+            rows,
+            media_type="text/csv",
+            headers={"Content-Disposition": f"attachment; filename=schedule_{run_id}_{timestamp}.csv"}
+        )
+    
+    output = tempfile.SpooledTemporaryFile(max_size=EXPORT_SPOOL_MAX_SIZE)
     try:
         exporter = ExcelExporter(db)
-        excel_bytes = exporter.export_schedule(run_id, institution_name)
+        exporter.write_schedule(run_id, output, institution_name)
+        output.seek(0)
         
         return StreamingResponse(
-            BytesIO(excel_bytes),
+            iter(lambda: output.read(EXPORT_CHUNK_SIZE), b""),
             media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={"Content-Disposition": f"attachment; filename=schedule_{run_id}_{models.datetime.now().strftime('%Y%m%d_%H%M%S')}.xlsx"}
+            headers={"Content-Disposition": f"attachment; filename=schedule_{run_id}_{timestamp}.xlsx"},
+            background=BackgroundTask(output.close)
         )
     except Exception as e:
+        output.close()
         raise HTTPException(status_code=500, detail=f"Export failed: {str(e)}")
\ No newline at end of file
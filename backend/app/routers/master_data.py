@@ -1,10 +1,41 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import insert, update
 from sqlalchemy.orm import Session
-from ..database import get_db
+from ..database import get_db, get_readonly_db
+from ..pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, MAX_SKIP, paginate
 from .. import models, schemas
 
 router = APIRouter()
 
+def _create(db: Session, model, schema, item):
+    """Insert one row with INSERT ... RETURNING, so server-side defaults come back without a refresh."""
+    created = db.execute(insert(model).values(**item.model_dump()).returning(model)).scalar_one()
+    # Serialize before the commit expires the instance (which would cost a reload)
+    result = schema.model_validate(created)
+    db.commit()
+    return result
+
+def _bulk_create(db: Session, model, items: list) -> list[int]:
+    """Insert many rows with one multi-row INSERT and one commit; returns their ids in input order."""
+    if not items:
+        return []
+    stmt = insert(model).returning(model.id, sort_by_parameter_order=True)
+    ids = db.execute(stmt, [item.model_dump() for item in items]).scalars().all()
+    db.commit()
+    return ids
+
+def _update_or_404(db: Session, model, schema, item_id: int, item, detail: str):
+    """Apply an update with one UPDATE ... RETURNING; 404 if no row matched."""
+    stmt = update(model).where(model.id == item_id).values(**item.model_dump()).returning(model)
+    updated = db.execute(stmt).scalars().first()
+    if updated is None:
+        raise HTTPException(status_code=404, detail=detail)
+    # Serialize before the commit expires the instance (which would cost a reload)
+    result = schema.model_validate(updated)
+    db.commit()
+    return result
+
 # ============================================================================
 # BUILDINGS
 # ============================================================================
@@ -12,22 +43,29 @@ router = APIRouter()
 @router.post("/buildings/", response_model=schemas.Building, tags=["Buildings"])
 def create_building(building: schemas.BuildingCreate, db: Session = Depends(get_db)):
     """Create a new building."""
-    db_building = models.Building(**building.dict())
-    db.add(db_building)
-    db.commit()
-    db.refresh(db_building)
-    return db_building
+    return _create(db, models.Building, schemas.Building, building)
+
+@router.post("/buildings/bulk", response_model=list[int], tags=["Buildings"])
+def create_buildings_bulk(buildings: list[schemas.BuildingCreate], db: Session = Depends(get_db)):
+    """Create many buildings in one statement; returns the new ids in request order."""
+    return _bulk_create(db, models.Building, buildings)
 
 @router.get("/buildings/", response_model=list[schemas.Building], tags=["Buildings"])
-def read_buildings(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get all buildings with pagination."""
-    buildings = db.query(models.Building).offset(skip).limit(limit).all()
+def read_buildings(
+    response: Response,
+    cursor: Optional[str] = None,
+    skip: int = Query(0, ge=0, le=MAX_SKIP),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_readonly_db)
+):
+    """Get all buildings with pagination (pass X-Next-Cursor back as cursor for the next page)."""
+    buildings = paginate(db.query(models.Building), models.Building.id, response, cursor, skip, limit)
     return buildings
 
 @router.get("/buildings/{building_id}", response_model=schemas.Building, tags=["Buildings"])
-def read_building(building_id: int, db: Session = Depends(get_db)):
+def read_building(building_id: int, db: Session = Depends(get_readonly_db)):
     """Get a specific building by ID."""
-    building = db.query(models.Building).filter(models.Building.id == building_id).first()
+    building = db.get(models.Building, building_id)
     if not building:
         raise HTTPException(status_code=404, detail="Building not found")
     return building
@@ -35,19 +73,12 @@ def read_building(building_id: int, db: Session = Depends(get_db)):
 @router.put("/buildings/{building_id}", response_model=schemas.Building, tags=["Buildings"])
 def update_building(building_id: int, building: schemas.BuildingCreate, db: Session = Depends(get_db)):
     """Update a building."""
-    db_building = db.query(models.Building).filter(models.Building.id == building_id).first()
-    if not db_building:
-        raise HTTPException(status_code=404, detail="Building not found")
-    for key, value in building.dict().items():
-        setattr(db_building, key, value)
-    db.commit()
-    db.refresh(db_building)
-    return db_building
+    return _update_or_404(db, models.Building, schemas.Building, building_id, building, "Building not found")
 
 @router.delete("/buildings/{building_id}", tags=["Buildings"])
 def delete_building(building_id: int, db: Session = Depends(get_db)):
     """Delete a building."""
-    db_building = db.query(models.Building).filter(models.Building.id == building_id).first()
+    db_building = db.get(models.Building, building_id)
     if not db_building:
         raise HTTPException(status_code=404, detail="Building not found")
     db.delete(db_building)
@@ -61,22 +92,29 @@ def delete_building(building_id: int, db: Session = Depends(get_db)):
 @router.post("/rooms/", response_model=schemas.Room, tags=["Rooms"])
 def create_room(room: schemas.RoomCreate, db: Session = Depends(get_db)):
     """Create a new room."""
-    db_room = models.Room(**room.dict())
-    db.add(db_room)
-    db.commit()
-    db.refresh(db_room)
-    return db_room
+    return _create(db, models.Room, schemas.Room, room)
+
+@router.post("/rooms/bulk", response_model=list[int], tags=["Rooms"])
+def create_rooms_bulk(rooms: list[schemas.RoomCreate], db: Session = Depends(get_db)):
+    """Create many rooms in one statement; returns the new ids in request order."""
+    return _bulk_create(db, models.Room, rooms)
 
 @router.get("/rooms/", response_model=list[schemas.Room], tags=["Rooms"])
-def read_rooms(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get all rooms with pagination."""
-    rooms = db.query(models.Room).offset(skip).limit(limit).all()
+def read_rooms(
+    response: Response,
+    cursor: Optional[str] = None,
+    skip: int = Query(0, ge=0, le=MAX_SKIP),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_readonly_db)
+):
+    """Get all rooms with pagination (pass X-Next-Cursor back as cursor for the next page)."""
+    rooms = paginate(db.query(models.Room), models.Room.id, response, cursor, skip, limit)
     return rooms
 
 @router.get("/rooms/{room_id}", response_model=schemas.Room, tags=["Rooms"])
-def read_room(room_id: int, db: Session = Depends(get_db)):
+def read_room(room_id: int, db: Session = Depends(get_readonly_db)):
     """Get a specific room by ID."""
-    room = db.query(models.Room).filter(models.Room.id == room_id).first()
+    room = db.get(models.Room, room_id)
     if not room:
         raise HTTPException(status_code=404, detail="Room not found")
     return room
@@ -84,19 +122,12 @@ def read_room(room_id: int, db: Session = Depends(get_db)):
 @router.put("/rooms/{room_id}", response_model=schemas.Room, tags=["Rooms"])
 def update_room(room_id: int, room: schemas.RoomCreate, db: Session = Depends(get_db)):
     """Update a room."""
-    db_room = db.query(models.Room).filter(models.Room.id == room_id).first()
-    if not db_room:
-        raise HTTPException(status_code=404, detail="Room not found")
-    for key, value in room.dict().items():
-        setattr(db_room, key, value)
-    db.commit()
-    db.refresh(db_room)
-    return db_room
+    return _update_or_404(db, models.Room, schemas.Room, room_id, room, "Room not found")
 
 @router.delete("/rooms/{room_id}", tags=["Rooms"])
 def delete_room(room_id: int, db: Session = Depends(get_db)):
     """Delete a room."""
-    db_room = db.query(models.Room).filter(models.Room.id == room_id).first()
+    db_room = db.get(models.Room, room_id)
     if not db_room:
         raise HTTPException(status_code=404, detail="Room not found")
     db.delete(db_room)
@@ -110,22 +141,29 @@ def delete_room(room_id: int, db: Session = Depends(get_db)):
 @router.post("/teachers/", response_model=schemas.Teacher, tags=["Teachers"])
 def create_teacher(teacher: schemas.TeacherCreate, db: Session = Depends(get_db)):
     """Create a new teacher."""
-    db_teacher = models.Teacher(**teacher.dict())
-    db.add(db_teacher)
-    db.commit()
-    db.refresh(db_teacher)
-    return db_teacher
+    return _create(db, models.Teacher, schemas.Teacher, teacher)
+
+@router.post("/teachers/bulk", response_model=list[int], tags=["Teachers"])
+def create_teachers_bulk(teachers: list[schemas.TeacherCreate], db: Session = Depends(get_db)):
+    """Create many teachers in one statement; returns the new ids in request order."""
+    return _bulk_create(db, models.Teacher, teachers)
 
 @router.get("/teachers/", response_model=list[schemas.Teacher], tags=["Teachers"])
-def read_teachers(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get all teachers with pagination."""
-    teachers = db.query(models.Teacher).offset(skip).limit(limit).all()
+def read_teachers(
+    response: Response,
+    cursor: Optional[str] = None,
+    skip: int = Query(0, ge=0, le=MAX_SKIP),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_readonly_db)
+):
+    """Get all teachers with pagination (pass X-Next-Cursor back as cursor for the next page)."""
+    teachers = paginate(db.query(models.Teacher), models.Teacher.id, response, cursor, skip, limit)
     return teachers
 
 @router.get("/teachers/{teacher_id}", response_model=schemas.Teacher, tags=["Teachers"])
-def read_teacher(teacher_id: int, db: Session = Depends(get_db)):
+def read_teacher(teacher_id: int, db: Session = Depends(get_readonly_db)):
     """Get a specific teacher by ID."""
-    teacher = db.query(models.Teacher).filter(models.Teacher.id == teacher_id).first()
+    teacher = db.get(models.Teacher, teacher_id)
     if not teacher:
         raise HTTPException(status_code=404, detail="Teacher not found")
     return teacher
@@ -133,19 +171,12 @@ def read_teacher(teacher_id: int, db: Session = Depends(get_db)):
 @router.put("/teachers/{teacher_id}", response_model=schemas.Teacher, tags=["Teachers"])
 def update_teacher(teacher_id: int, teacher: schemas.TeacherCreate, db: Session = Depends(get_db)):
     """Update a teacher."""
-    db_teacher = db.query(models.Teacher).filter(models.Teacher.id == teacher_id).first()
-    if not db_teacher:
-        raise HTTPException(status_code=404, detail="Teacher not found")
-    for key, value in teacher.dict().items():
-        setattr(db_teacher, key, value)
-    db.commit()
-    db.refresh(db_teacher)
-    return db_teacher
+    return _update_or_404(db, models.Teacher, schemas.Teacher, teacher_id, teacher, "Teacher not found")
 
 @router.delete("/teachers/{teacher_id}", tags=["Teachers"])
 def delete_teacher(teacher_id: int, db: Session = Depends(get_db)):
     """Delete a teacher."""
-    db_teacher = db.query(models.Teacher).filter(models.Teacher.id == teacher_id).first()
+    db_teacher = db.get(models.Teacher, teacher_id)
     if not db_teacher:
         raise HTTPException(status_code=404, detail="Teacher not found")
     db.delete(db_teacher)
@@ -159,22 +190,29 @@ def delete_teacher(teacher_id: int, db: Session = Depends(get_db)):
 @router.post("/sections/", response_model=schemas.Section, tags=["Sections"])
 def create_section(section: schemas.SectionCreate, db: Session = Depends(get_db)):
     """Create a new section."""
-    db_section = models.Section(**section.dict())
-    db.add(db_section)
-    db.commit()
-    db.refresh(db_section)
-    return db_section
+    return _create(db, models.Section, schemas.Section, section)
+
+@router.post("/sections/bulk", response_model=list[int], tags=["Sections"])
+def create_sections_bulk(sections: list[schemas.SectionCreate], db: Session = Depends(get_db)):
+    """Create many sections in one statement; returns the new ids in request order."""
+    return _bulk_create(db, models.Section, sections)
 
 @router.get("/sections/", response_model=list[schemas.Section], tags=["Sections"])
-def read_sections(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get all sections with pagination."""
-    sections = db.query(models.Section).offset(skip).limit(limit).all()
+def read_sections(
+    response: Response,
+    cursor: Optional[str] = None,
+    skip: int = Query(0, ge=0, le=MAX_SKIP),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_readonly_db)
+):
+    """Get all sections with pagination (pass X-Next-Cursor back as cursor for the next page)."""
+    sections = paginate(db.query(models.Section), models.Section.id, response, cursor, skip, limit)
     return sections
 
 @router.get("/sections/{section_id}", response_model=schemas.Section, tags=["Sections"])
-def read_section(section_id: int, db: Session = Depends(get_db)):
+def read_section(section_id: int, db: Session = Depends(get_readonly_db)):
     """Get a specific section by ID."""
-    section = db.query(models.Section).filter(models.Section.id == section_id).first()
+    section = db.get(models.Section, section_id)
     if not section:
         raise HTTPException(status_code=404, detail="Section not found")
     return section
@@ -182,19 +220,12 @@ def read_section(section_id: int, db: Session = Depends(get_db)):
 @router.put("/sections/{section_id}", response_model=schemas.Section, tags=["Sections"])
 def update_section(section_id: int, section: schemas.SectionCreate, db: Session = Depends(get_db)):
     """Update a section."""
-    db_section = db.query(models.Section).filter(models.Section.id == section_id).first()
-    if not db_section:
-        raise HTTPException(status_code=404, detail="Section not found")
-    for key, value in section.dict().items():
-        setattr(db_section, key, value)
-    db.commit()
-    db.refresh(db_section)
-    return db_section
+    return _update_or_404(db, models.Section, schemas.Section, section_id, section, "Section not found")
 
 @router.delete("/sections/{section_id}", tags=["Sections"])
 def delete_section(section_id: int, db: Session = Depends(get_db)):
     """Delete a section."""
-    db_section = db.query(models.Section).filter(models.Section.id == section_id).first()
+    db_section = db.get(models.Section, section_id)
     if not db_section:
         raise HTTPException(status_code=404, detail="Section not found")
     db.delete(db_section)
@@ -208,22 +239,29 @@ def delete_section(section_id: int, db: Session = Depends(get_db)):
 @router.post("/courses/", response_model=schemas.Course, tags=["Courses"])
 def create_course(course: schemas.CourseCreate, db: Session = Depends(get_db)):
     """Create a new course."""
-    db_course = models.Course(**course.dict())
-    db.add(db_course)
-    db.commit()
-    db.refresh(db_course)
-    return db_course
+    return _create(db, models.Course, schemas.Course, course)
+
+@router.post("/courses/bulk", response_model=list[int], tags=["Courses"])
+def create_courses_bulk(courses: list[schemas.CourseCreate], db: Session = Depends(get_db)):
+    """Create many courses in one statement; returns the new ids in request order."""
+    return _bulk_create(db, models.Course, courses)
 
 @router.get("/courses/", response_model=list[schemas.Course], tags=["Courses"])
-def read_courses(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get all courses with pagination."""
-    courses = db.query(models.Course).offset(skip).limit(limit).all()
+def read_courses(
+    response: Response,
+    cursor: Optional[str] = None,
+    skip: int = Query(0, ge=0, le=MAX_SKIP),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_readonly_db)
+):
+    """Get all courses with pagination (pass X-Next-Cursor back as cursor for the next page)."""
+    courses = paginate(db.query(models.Course), models.Course.id, response, cursor, skip, limit)
     return courses
 
 @router.get("/courses/{course_id}", response_model=schemas.Course, tags=["Courses"])
-def read_course(course_id: int, db: Session = Depends(get_db)):
+def read_course(course_id: int, db: Session = Depends(get_readonly_db)):
     """Get a specific course by ID."""
-    course = db.query(models.Course).filter(models.Course.id == course_id).first()
+    course = db.get(models.Course, course_id)
     if not course:
         raise HTTPException(status_code=404, detail="Course not found")
     return course
@@ -231,19 +269,12 @@ def read_course(course_id: int, db: Session = Depends(get_db)):
 @router.put("/courses/{course_id}", response_model=schemas.Course, tags=["Courses"])
 def update_course(course_id: int, course: schemas.CourseCreate, db: Session = Depends(get_db)):
     """Update a course."""
-    db_course = db.query(models.Course).filter(models.Course.id == course_id).first()
-    if not db_course:
-        raise HTTPException(status_code=404, detail="Course not found")
-    for key, value in course.dict().items():
-        setattr(db_course, key, value)
-    db.commit()
-    db.refresh(db_course)
-    return db_course
+    return _update_or_404(db, models.Course, schemas.Course, course_id, course, "Course not found")
 
 @router.delete("/courses/{course_id}", tags=["Courses"])
 def delete_course(course_id: int, db: Session = Depends(get_db)):
     """Delete a course."""
-    db_course = db.query(models.Course).filter(models.Course.id == course_id).first()
+    db_course = db.get(models.Course, course_id)
     if not db_course:
         raise HTTPException(status_code=404, detail="Course not found")
     db.delete(db_course)
@@ -257,22 +288,29 @@ def delete_course(course_id: int, db: Session = Depends(get_db)):
 @router.post("/timeslots/", response_model=schemas.Timeslot, tags=["Timeslots"])
 def create_timeslot(timeslot: schemas.TimeslotCreate, db: Session = Depends(get_db)):
     """Create a new timeslot."""
-    db_timeslot = models.Timeslot(**timeslot.dict())
-    db.add(db_timeslot)
-    db.commit()
-    db.refresh(db_timeslot)
-    return db_timeslot
+    return _create(db, models.Timeslot, schemas.Timeslot, timeslot)
+
+@router.post("/timeslots/bulk", response_model=list[int], tags=["Timeslots"])
+def create_timeslots_bulk(timeslots: list[schemas.TimeslotCreate], db: Session = Depends(get_db)):
+    """Create many timeslots in one statement; returns the new ids in request order."""
+    return _bulk_create(db, models.Timeslot, timeslots)
 
 @router.get("/timeslots/", response_model=list[schemas.Timeslot], tags=["Timeslots"])
-def read_timeslots(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Get all timeslots with pagination."""
-    timeslots = db.query(models.Timeslot).offset(skip).limit(limit).all()
+def read_timeslots(
+    response: Response,
+    cursor: Optional[str] = None,
+    skip: int = Query(0, ge=0, le=MAX_SKIP),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_readonly_db)
+):
+    """Get all timeslots with pagination (pass X-Next-Cursor back as cursor for the next page)."""
+    timeslots = paginate(db.query(models.Timeslot), models.Timeslot.id, response, cursor, skip, limit)
     return timeslots
 
 @router.get("/timeslots/{timeslot_id}", response_model=schemas.Timeslot, tags=["Timeslots"])
-def read_timeslot(timeslot_id: int, db: Session = Depends(get_db)):
+def read_timeslot(timeslot_id: int, db: Session = Depends(get_readonly_db)):
     """Get a specific timeslot by ID."""
-    timeslot = db.query(models.Timeslot).filter(models.Timeslot.id == timeslot_id).first()
+    timeslot = db.get(models.Timeslot, timeslot_id)
     if not timeslot:
         raise HTTPException(status_code=404, detail="Timeslot not found")
     return timeslot
@@ -280,19 +318,12 @@ def read_timeslot(timeslot_id: int, db: Session = Depends(get_db)):
 @router.put("/timeslots/{timeslot_id}", response_model=schemas.Timeslot, tags=["Timeslots"])
 def update_timeslot(timeslot_id: int, timeslot: schemas.TimeslotCreate, db: Session = Depends(get_db)):
     """Update a timeslot."""
-    db_timeslot = db.query(models.Timeslot).filter(models.Timeslot.id == timeslot_id).first()
-    if not db_timeslot:
-        raise HTTPException(status_code=404, detail="Timeslot not found")
-    for key, value in timeslot.dict().items():
-        setattr(db_timeslot, key, value)
-    db.commit()
-    db.refresh(db_timeslot)
-    return db_timeslot
+    return _update_or_404(db, models.Timeslot, schemas.Timeslot, timeslot_id, timeslot, "Timeslot not found")
 
 @router.delete("/timeslots/{timeslot_id}", tags=["Timeslots"])
 def delete_timeslot(timeslot_id: int, db: Session = Depends(get_db)):
     """Delete a timeslot."""
-    db_timeslot = db.query(models.Timeslot).filter(models.Timeslot.id == timeslot_id).first()
+    db_timeslot = db.get(models.Timeslot, timeslot_id)
     if not db_timeslot:
         raise HTTPException(status_code=404, detail="Timeslot not found")
     db.delete(db_timeslot)
@@ -1,8 +1,16 @@
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from functools import partial
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from fastapi.responses import ORJSONResponse
+from sqlalchemy import func, insert, select, update
 from sqlalchemy.orm import Session
 from pydantic import BaseModel
 from typing import Optional
-from ..database import get_db
+import multiprocessing
+import os
+from ..database import IN_MEMORY_DATABASE, SessionLocal, get_db, get_readonly_db
+from ..pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, MAX_SKIP, NEXT_CURSOR_HEADER, paginate
 from .. import models, schemas
 from ..scheduler import CampusScheduler
 import logging
@@ -10,6 +18,63 @@ import logging
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Schedule generation is CPU-bound, so it runs in worker processes instead of
+# the API process, where it would hold the GIL against request handling
+SCHEDULER_WORKERS = int(os.getenv("SCHEDULER_WORKERS", "2"))
+_scheduler_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_scheduler_pool() -> ProcessPoolExecutor:
+    """The scheduler worker pool, started on first use."""
+    global _scheduler_pool
+    if _scheduler_pool is None:
+        # spawn: workers open their own engine rather than inheriting the
+        # parent's pooled connections and threads through fork
+        _scheduler_pool = ProcessPoolExecutor(
+            max_workers=SCHEDULER_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _scheduler_pool
+
+
+def _submit_scheduler_task(*args) -> Future:
+    """
+    Submit _run_scheduler_task(*args) to the worker pool.
+    
+    A worker that dies (OOM kill, native crash) breaks its pool for good, so
+    a broken pool is replaced with a fresh one and the submit retried once.
+    """
+    global _scheduler_pool
+    try:
+        return _get_scheduler_pool().submit(_run_scheduler_task, *args)
+    except BrokenProcessPool:
+        logger.warning("Scheduler worker pool is broken; starting a new one")
+        broken, _scheduler_pool = _scheduler_pool, None
+        broken.shutdown(wait=False)
+        return _get_scheduler_pool().submit(_run_scheduler_task, *args)
+
+
+def _mark_run_failed(db: Session, run_id: int) -> None:
+    """Move a run still marked RUNNING to FAILED (its worker never finished it)."""
+    db.execute(
+        update(models.ScheduleRun)
+        .where(
+            models.ScheduleRun.id == run_id,
+            models.ScheduleRun.status == models.ScheduleRunStatus.RUNNING
+        )
+        .values(status=models.ScheduleRunStatus.FAILED)
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
+
+
+def shutdown_scheduler_pool() -> None:
+    """Wait for running generations and stop the workers (app shutdown)."""
+    global _scheduler_pool
+    if _scheduler_pool is not None:
+        _scheduler_pool.shutdown(wait=True)
+        _scheduler_pool = None
+
 
 class ScheduleGenerationRequest(BaseModel):
     """Request to generate a schedule."""
@@ -29,32 +94,37 @@ class ScheduleGenerationResponse(BaseModel):
 @router.post("/schedule-runs/", response_model=schemas.ScheduleRun)
 def create_schedule_run(schedule_run: schemas.ScheduleRunCreate, db: Session = Depends(get_db)):
     """Create a new schedule run (draft status)."""
-    from datetime import datetime
-    db_run = models.ScheduleRun(
+    # INSERT ... RETURNING brings back id and created_at without a refresh
+    stmt = insert(models.ScheduleRun).values(
         term_id=schedule_run.term_id,
         status=schedule_run.status,
         objective_score=schedule_run.objective_score,
-        created_by=schedule_run.created_by,
-        created_at=datetime.now()
-    )
-    db.add(db_run)
+        created_by=schedule_run.created_by
+    ).returning(models.ScheduleRun)
+    db_run = db.execute(stmt).scalar_one()
+    result = schemas.ScheduleRun.model_validate(db_run)
     db.commit()
-    db.refresh(db_run)
-    logger.info(f"Created schedule run {db_run.id} for term {db_run.term_id}")
-    return db_run
+    logger.info(f"Created schedule run {result.id} for term {result.term_id}")
+    return result
 
 
 @router.get("/schedule-runs/", response_model=list[schemas.ScheduleRun])
-def read_schedule_runs(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """List all schedule runs with pagination."""
-    runs = db.query(models.ScheduleRun).offset(skip).limit(limit).all()
+def read_schedule_runs(
+    response: Response,
+    cursor: Optional[str] = None,
+    skip: int = Query(0, ge=0, le=MAX_SKIP),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_readonly_db)
+):
+    """List all schedule runs with pagination (pass X-Next-Cursor back as cursor for the next page)."""
+    runs = paginate(db.query(models.ScheduleRun), models.ScheduleRun.id, response, cursor, skip, limit)
     return runs
 
 
 @router.get("/schedule-runs/{run_id}", response_model=schemas.ScheduleRun)
-def read_schedule_run(run_id: int, db: Session = Depends(get_db)):
+def read_schedule_run(run_id: int, db: Session = Depends(get_readonly_db)):
     """Get details of a specific schedule run."""
-    run = db.query(models.ScheduleRun).filter(models.ScheduleRun.id == run_id).first()
+    run = db.get(models.ScheduleRun, run_id)
     if not run:
         raise HTTPException(status_code=404, detail="Schedule run not found")
     return run
@@ -64,7 +134,6 @@ def read_schedule_run(run_id: int, db: Session = Depends(get_db)):
 def generate_schedule(
     run_id: int,
     request: ScheduleGenerationRequest,
-    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db)
 ) -> ScheduleGenerationResponse:
     """
@@ -72,7 +141,7 @@ def generate_schedule(
     
     This endpoint:
     1. Creates a new ScheduleRun
-    2. Starts the scheduling algorithm in the background
+    2. Starts the scheduling algorithm in a scheduler worker process
     3. Returns immediately with the run ID
     
     The algorithm will:
@@ -84,16 +153,31 @@ def generate_schedule(
     Args:
         run_id: The schedule run ID
         request: Generation request with term_id and prioritize_senior
-        background_tasks: FastAPI background task handler
         db: Database session
     
     Returns:
         ScheduleGenerationResponse with status and run_id
     """
+    # The worker processes open their own connections, which never see an
+    # in-memory database
+    if IN_MEMORY_DATABASE:
+        raise HTTPException(
+            status_code=503,
+            detail="Schedule generation needs a file or server database (DATABASE_URL is in-memory)"
+        )
+    
+    # Fetch the run and count the term's teaching assignments in one round trip
+    assignment_count_subquery = select(func.count(models.TeachingAssignment.id)).where(
+        models.TeachingAssignment.term_id == request.term_id
+    ).scalar_subquery()
+    row = db.query(models.ScheduleRun, assignment_count_subquery).filter(
+        models.ScheduleRun.id == run_id
+    ).first()
+    
     # Validate schedule run exists
-    run = db.query(models.ScheduleRun).filter(models.ScheduleRun.id == run_id).first()
-    if not run:
+    if not row:
         raise HTTPException(status_code=404, detail="Schedule run not found")
+    run, assignment_count = row
     
     # Check if term_id in request matches the run's term
     if run.term_id != request.term_id:
@@ -103,29 +187,35 @@ def generate_schedule(
         )
     
     # Verify there are teaching assignments for this term
-    assignment_count = db.query(models.TeachingAssignment).filter(
-        models.TeachingAssignment.term_id == request.term_id
-    ).count()
-    
     if assignment_count == 0:
         raise HTTPException(
             status_code=400,
             detail=f"No teaching assignments found for term {request.term_id}"
         )
     
-    # Update run status to RUNNING
-    run.status = models.ScheduleRunStatus.RUNNING
+    # Update run status to RUNNING with a single UPDATE (no flush of the loaded run)
+    db.execute(
+        update(models.ScheduleRun)
+        .where(models.ScheduleRun.id == run_id)
+        .values(status=models.ScheduleRunStatus.RUNNING)
+        .execution_options(synchronize_session=False)
+    )
     db.commit()
     
     logger.info(f"Starting schedule generation for run {run_id}, term {request.term_id}")
     
-    # Start the scheduler in the background
-    background_tasks.add_task(
-        _run_scheduler_task,
-        run_id,
-        request.term_id,
-        request.prioritize_senior
-    )
+    # Start the scheduler in a worker process (only primitives cross over)
+    try:
+        future = _submit_scheduler_task(
+            run_id,
+            request.term_id,
+            request.prioritize_senior
+        )
+    except (BrokenProcessPool, RuntimeError) as e:
+        logger.error(f"Could not start schedule generation for run {run_id}: {e!r}")
+        _mark_run_failed(db, run_id)
+        raise HTTPException(status_code=503, detail="Schedule generation workers are unavailable")
+    future.add_done_callback(partial(_handle_scheduler_task_done, run_id))
     
     return ScheduleGenerationResponse(
         run_id=run_id,
@@ -135,17 +225,41 @@ def generate_schedule(
     )
 
 
-def _run_scheduler_task(run_id: int, term_id: int, prioritize_senior: bool) -> None:
+def _handle_scheduler_task_done(run_id: int, future: Future) -> None:
     """
-    Background task to run the scheduler.
+    Fail a run whose worker died before it could record an outcome.
     
-    This is executed asynchronously so the HTTP endpoint can return immediately.
+    _run_scheduler_task handles its own errors, so an exception here means
+    the worker process itself was lost and the run would stay RUNNING.
+    """
+    if future.cancelled():
+        return
+    error = future.exception()
+    if error is None:
+        return
+    logger.error(f"Schedule generation worker for run {run_id} failed: {error!r}")
+    db = SessionLocal()
+    try:
+        _mark_run_failed(db, run_id)
+    except Exception as e:
+        logger.exception(f"Could not mark run {run_id} as failed: {str(e)}")
+    finally:
+        db.close()
+
+
+def _run_scheduler_task(
+    run_id: int,
+    term_id: int,
+    prioritize_senior: bool
+) -> None:
     """
-    from ..database import SessionLocal
+    Run the scheduler in a scheduler worker process.
     
+    This is executed asynchronously so the HTTP endpoint can return immediately.
+    """
     db = SessionLocal()
     try:
-        run = db.query(models.ScheduleRun).filter(models.ScheduleRun.id == run_id).first()
+        run = db.get(models.ScheduleRun, run_id)
         if not run:
             logger.error(f"Schedule run {run_id} not found")
             return
@@ -157,59 +271,86 @@ def _run_scheduler_task(run_id: int, term_id: int, prioritize_senior: bool) -> N
             logger.info(f"Schedule generation successful for run {run_id}: {message}")
         else:
             logger.error(f"Schedule generation failed for run {run_id}: {message}")
+            # The scheduler's early exits (no assignments, timeslots or rooms)
+            # return without touching the status
+            _mark_run_failed(db, run_id)
     
     except Exception as e:
         logger.exception(f"Unexpected error in schedule generation task: {str(e)}")
+        db.rollback()
+        _mark_run_failed(db, run_id)
     
     finally:
         db.close()
 
 
 @router.get("/schedule-runs/{run_id}/violations")
-def get_schedule_violations(run_id: int, db: Session = Depends(get_db)):
+def get_schedule_violations(run_id: int, db: Session = Depends(get_readonly_db)):
     """Get constraint violations report for a schedule run."""
-    from ..scheduler import CampusScheduler
-    
-    run = db.query(models.ScheduleRun).filter(models.ScheduleRun.id == run_id).first()
-    if not run:
-        raise HTTPException(status_code=404, detail="Schedule run not found")
-    
-    # Query violations from schedule entries (any entries that exist)
-    entries = db.query(models.ScheduleEntry).filter(
+    # One query: the run's report columns plus a COUNT of its entries
+    total_entries_subquery = select(func.count(models.ScheduleEntry.id)).where(
         models.ScheduleEntry.schedule_run_id == run_id
-    ).all()
+    ).scalar_subquery()
+    row = db.query(
+        models.ScheduleRun.status,
+        models.ScheduleRun.objective_score,
+        total_entries_subquery
+    ).filter(models.ScheduleRun.id == run_id).first()
+    if not row:
+        raise HTTPException(status_code=404, detail="Schedule run not found")
+    status, objective_score, total_entries = row
     
     return {
         "run_id": run_id,
-        "status": run.status.value,
-        "total_entries": len(entries),
-        "objective_score": float(run.objective_score) if run.objective_score else 0,
+        "status": status.value,
+        "total_entries": total_entries,
+        "objective_score": float(objective_score) if objective_score else 0,
         "message": "Violation report available after schedule generation"
     }
 
 
 @router.get("/schedule-entries/", response_model=list[schemas.ScheduleEntry])
-def read_schedule_entries(run_id: int = None, db: Session = Depends(get_db)):
+def read_schedule_entries(
+    response: Response,
+    run_id: int = None,
+    cursor: Optional[str] = None,
+    skip: int = Query(0, ge=0, le=MAX_SKIP),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_readonly_db)
+):
     """
-    Get schedule entries (actual assignments) for a run.
+    Get schedule entries (actual assignments) for a run, one page at a time.
     
     Args:
         run_id: Filter by specific schedule run (optional)
+        cursor: X-Next-Cursor header of the previous page (optional)
+        skip: Rows to skip when no cursor is given
+        limit: Page size
     
     Returns:
-        List of schedule entries
+        List of schedule entries; X-Next-Cursor is set when more follow
     """
-    query = db.query(models.ScheduleEntry)
+    # Plain columns straight to orjson: no ORM instances, no per-row model
+    # validation (the columns are exactly schemas.ScheduleEntry's fields)
+    entry = models.ScheduleEntry
+    query = db.query(
+        entry.id, entry.schedule_run_id, entry.teacher_id, entry.section_id,
+        entry.course_id, entry.room_id, entry.timeslot_id, entry.is_locked
+    )
     if run_id:
-        query = query.filter(models.ScheduleEntry.schedule_run_id == run_id)
-    entries = query.all()
-    return entries
+        query = query.filter(entry.schedule_run_id == run_id)
+    entries = paginate(query, entry.id, response, cursor, skip, limit)
+    # A returned Response skips response_model, so carry the cursor over
+    headers = {}
+    if NEXT_CURSOR_HEADER in response.headers:
+        headers[NEXT_CURSOR_HEADER] = response.headers[NEXT_CURSOR_HEADER]
+    return ORJSONResponse([row._asdict() for row in entries], headers=headers)
 
 
 @router.get("/schedule-entries/{entry_id}", response_model=schemas.ScheduleEntry)
-def read_schedule_entry(entry_id: int, db: Session = Depends(get_db)):
+def read_schedule_entry(entry_id: int, db: Session = Depends(get_readonly_db)):
     """Get a specific schedule entry."""
-    entry = db.query(models.ScheduleEntry).filter(models.ScheduleEntry.id == entry_id).first()
+    entry = db.get(models.ScheduleEntry, entry_id)
     if not entry:
         raise HTTPException(status_code=404, detail="Schedule entry not found")
     return entry
\ No newline at end of file
@@ -13,15 +13,15 @@ The algorithm uses a greedy approach with backtracking when hard constraints are
 import logging
 from typing import List, Dict, Tuple, Optional, Set
 from datetime import datetime, timedelta
-from sqlalchemy.orm import Session
+from sqlalchemy import insert
+from sqlalchemy.orm import Session, joinedload, load_only, selectinload
 from enum import Enum
 
 from . import models
-from .constraints import ConstraintEngine, ConstraintViolation, TimePeriod
+from .constraints import ConstraintEngine, ConstraintPrefetch, ConstraintViolation, TimePeriod
 
 logger = logging.getLogger(__name__)
 
-
 class SchedulerStatus(str, Enum):
     """Status of scheduling operation."""
     STARTED = "started"
@@ -52,18 +52,41 @@ class ScheduleAssignment:
 class CampusScheduler:
     """Main scheduling engine that generates course assignments."""
     
-    def __init__(self, db: Session):
+    # (status, workload) -> employment priority used by _sort_assignments_by_priority
+    STATUS_PRIORITY = {
+        **{(models.TeacherStatus.PERMANENT, workload): 2 for workload in (*models.Workload, None)},
+        **{(models.TeacherStatus.CONTRACT_OF_SERVICE, workload): 3 for workload in (*models.Workload, None)},
+        (models.TeacherStatus.PERMANENT, models.Workload.FULL_TIME): 0,
+        (models.TeacherStatus.CONTRACT_OF_SERVICE, models.Workload.FULL_TIME): 1,
+    }
+    
+    def __init__(
+        self,
+        db: Session,
+        slot_domain: Optional[Dict[int, List[models.Timeslot]]] = None
+    ):
         self.db = db
+        # Optional {teaching_assignment_id: [timeslots]} the caller has already
+        # narrowed each assignment to; assignments not in it try every timeslot
+        self.slot_domain = slot_domain or {}
         self.constraint_engine = ConstraintEngine(db)
         self.assignments: List[ScheduleAssignment] = []
         self.schedule_entries: List[models.ScheduleEntry] = []
         self.violations: List[ConstraintViolation] = []
+        # self.violations split by constraint_type as they are recorded
+        self._hard_violations: List[ConstraintViolation] = []
+        self._soft_violations: List[ConstraintViolation] = []
+        # {day_of_week: [(teacher_id, start_time, end_time), ...]} for self.assignments,
+        # kept in step with it as units are assigned
+        self._existing_schedule: Dict[str, List[Tuple[int, str, str]]] = {}
+        self._prefetched: Optional[ConstraintPrefetch] = None
     
     def generate_schedule(
         self,
         schedule_run: models.ScheduleRun,
         term_id: int,
-        prioritize_senior: bool = True
+        prioritize_senior: bool = True,
+        assignment_order: Optional[List[int]] = None
     ) -> Tuple[bool, str]:
         """
         Generate a complete schedule for a term.
@@ -72,6 +95,8 @@ class CampusScheduler:
             schedule_run: ScheduleRun object to save results to
             term_id: Term ID for filtering assignments
             prioritize_senior: If True, assign senior teachers first
+            assignment_order: Optional teaching assignment ids to place first,
+                in this order; the rest follow in priority order
             
         Returns:
             Tuple of (success: bool, message: str)
@@ -100,18 +125,35 @@ class CampusScheduler:
             
             logger.info(f"Loaded {len(teaching_assignments)} assignments, {len(timeslots)} timeslots, {len(rooms)} rooms")
             
+            # Built once here; _assign_teaching_unit adds each new assignment to it
+            self._existing_schedule = self._build_existing_schedule_dict()
+            self.constraint_engine.schedule_changed()
+            
+            # Comp-off, maintenance and room-occupancy lookups for the whole run;
+            # entries are only saved at the end, so they stay current throughout
+            self._prefetched = self.constraint_engine.prefetch(
+                (assignment.teacher_id for assignment in teaching_assignments),
+                (room.id for room in rooms)
+            )
+            
             # Sort assignments for prioritization
             sorted_assignments = self._sort_assignments_by_priority(
                 teaching_assignments,
                 prioritize_senior=prioritize_senior
             )
+            if assignment_order is not None:
+                # Stable, so priority order still breaks ties among the unlisted
+                position = {assignment_id: i for i, assignment_id in enumerate(assignment_order)}
+                unlisted = len(position)
+                sorted_assignments.sort(key=lambda assignment: position.get(assignment.id, unlisted))
             
             # Attempt to assign each teaching assignment
             failed_assignments = []
+            slot_domain = self.slot_domain
             for teaching_assignment in sorted_assignments:
                 success = self._assign_teaching_unit(
                     teaching_assignment,
-                    timeslots,
+                    slot_domain.get(teaching_assignment.id, timeslots),
                     rooms
                 )
                 if not success:
@@ -122,7 +164,7 @@ class CampusScheduler:
             self._save_schedule_entries(schedule_run)
             
             # Update schedule run status
-            hard_violations = [v for v in self.violations if v.constraint_type == "HARD"]
+            hard_violations = self._hard_violations
             if hard_violations:
                 schedule_run.status = models.ScheduleRunStatus.FAILED
                 msg = f"Schedule generation completed with {len(hard_violations)} hard constraint violations"
@@ -143,21 +185,45 @@ class CampusScheduler:
             return False, f"Schedule generation failed: {str(e)}"
     
     def _load_teaching_assignments(self, term_id: int) -> List[models.TeachingAssignment]:
-        """Load all teaching assignments for a term."""
-        assignments = self.db.query(models.TeachingAssignment).filter(
+        """
+        Load all teaching assignments for a term, with their teacher, course
+        and section.
+        
+        The sort and the assignment loop read all three on every row, so they
+        are loaded up front, each in one IN query, with only the columns the
+        sort and the constraint checks read.
+        """
+        ta = models.TeachingAssignment
+        assignments = self.db.query(ta).options(
+            load_only(ta.teacher_id, ta.course_id, ta.section_id),
+            selectinload(ta.teacher).load_only(
+                models.Teacher.full_name, models.Teacher.status,
+                models.Teacher.workload, models.Teacher.is_senior_old
+            ),
+            selectinload(ta.course).load_only(
+                models.Course.course_code, models.Course.course_type, models.Course.units
+            ),
+            selectinload(ta.section).load_only(
+                models.Section.code, models.Section.is_first_year
+            )
+        ).filter(
             models.TeachingAssignment.term_id == term_id
         ).all()
         return assignments
     
     def _load_timeslots(self) -> List[models.Timeslot]:
         """Load all available timeslots."""
-        timeslots = self.db.query(models.Timeslot).all()
-        return timeslots
+        return self.db.query(models.Timeslot).all()
     
     def _load_rooms(self) -> List[models.Room]:
-        """Load all active rooms."""
-        rooms = self.db.query(models.Room).filter(models.Room.active == True).all()
-        return rooms
+        """Load all active rooms with their building (many-to-one, so joined)."""
+        return self.db.query(models.Room).options(
+            load_only(
+                models.Room.building_id, models.Room.room_code,
+                models.Room.room_type, models.Room.capacity
+            ),
+            joinedload(models.Room.building)
+        ).filter(models.Room.active == True).all()
     
     def _sort_assignments_by_priority(
         self,
@@ -174,29 +240,20 @@ class CampusScheduler:
         4. Part-Time and Visiting teachers
         5. New first-year sections (lower course code priority)
         """
+        status_priorities = self.STATUS_PRIORITY
+        
         def priority_key(assignment):
+            # sorted() computes each key once; read each attribute once too
             teacher = assignment.teacher
-            section = assignment.section
             
             # Senior priority (lower number = higher priority)
             senior_priority = 0 if (prioritize_senior and teacher.is_senior_old) else 1
             
             # Employment status priority
-            if teacher.status == models.TeacherStatus.PERMANENT:
-                if teacher.workload == models.Workload.FULL_TIME:
-                    status_priority = 0
-                else:
-                    status_priority = 2
-            elif teacher.status == models.TeacherStatus.CONTRACT_OF_SERVICE:
-                if teacher.workload == models.Workload.FULL_TIME:
-                    status_priority = 1
-                else:
-                    status_priority = 3
-            else:
-                status_priority = 4
+            status_priority = status_priorities.get((teacher.status, teacher.workload), 4)
             
             # First-year section priority (first-year sections get lower priority)
-            year_priority = 0 if section.is_first_year else 1
+            year_priority = 0 if assignment.section.is_first_year else 1
             
             return (senior_priority, status_priority, year_priority)
         
@@ -211,46 +268,76 @@ class CampusScheduler:
         """
         Attempt to assign a single teaching unit to a valid timeslot and room.
         
+        The hard constraints are first evaluated over the whole timeslot x
+        room grid at once (ConstraintEngine.find_valid_timeslots), and only
+        the feasible cells are validated one by one, in grid order. Only when
+        no cell is feasible is every cell validated, so that the violations
+        explaining the failure are recorded.
+        
         Returns: True if successfully assigned, False otherwise
         """
         teacher = teaching_assignment.teacher
         course = teaching_assignment.course
         section = teaching_assignment.section
         
-        # Build a dict of existing schedule for conflict checking
-        existing_schedule = self._build_existing_schedule_dict()
+        existing_schedule = self._existing_schedule
+        
+        candidates = self.constraint_engine.find_valid_timeslots(
+            teacher, course, section,
+            available_rooms=rooms,
+            existing_schedule=existing_schedule,
+            prefetched=self._prefetched,
+            timeslots=timeslots
+        )
+        if candidates:
+            cells = [(timeslot, room) for timeslot, cell_rooms in candidates.items() for room in cell_rooms]
+        else:
+            cells = [(timeslot, room) for timeslot in timeslots for room in rooms]
         
         # Try to find a valid slot
-        for timeslot in timeslots:
-            for room in rooms:
-                is_valid, violations = self.constraint_engine.validate_timeslot_for_assignment(
+        for timeslot, room in cells:
+            is_valid, violations = self.constraint_engine.validate_timeslot_for_assignment(
+                teacher=teacher,
+                course=course,
+                section=section,
+                timeslot=timeslot,
+                room=room,
+                existing_schedule=existing_schedule,
+                prefetched=self._prefetched
+            )
+            
+            # Record violations for reporting
+            self._record_violations(violations)
+            
+            # If valid, create the assignment
+            if is_valid:
+                assignment = ScheduleAssignment(
                     teacher=teacher,
                     course=course,
                     section=section,
                     timeslot=timeslot,
-                    room=room,
-                    existing_schedule=existing_schedule
+                    room=room
+                )
+                self.assignments.append(assignment)
+                existing_schedule.setdefault(timeslot.day_of_week.value, []).append(
+                    (teacher.id, timeslot.start_time, timeslot.end_time)
                 )
-                
-                # Record violations for reporting
-                self.violations.extend(violations)
-                
-                # If valid, create the assignment
-                if is_valid:
-                    assignment = ScheduleAssignment(
-                        teacher=teacher,
-                        course=course,
-                        section=section,
-                        timeslot=timeslot,
-                        room=room
-                    )
-                    self.assignments.append(assignment)
-                    logger.debug(f"Assigned {teacher.full_name} ({course.course_code}) to {room.room_code} on {timeslot.day_of_week.value} {timeslot.start_time}")
-                    return True
+                self.constraint_engine.schedule_changed()
+                logger.debug(f"Assigned {teacher.full_name} ({course.course_code}) to {room.room_code} on {timeslot.day_of_week.value} {timeslot.start_time}")
+                return True
         
         logger.warning(f"Could not find valid slot for {teacher.full_name} -> {course.course_code} -> {section.code}")
         return False
     
+    def _record_violations(self, violations: List[ConstraintViolation]) -> None:
+        """Add violations to self.violations and to the hard/soft buckets."""
+        self.violations.extend(violations)
+        for violation in violations:
+            if violation.constraint_type == "HARD":
+                self._hard_violations.append(violation)
+            elif violation.constraint_type == "SOFT":
+                self._soft_violations.append(violation)
+    
     def _build_existing_schedule_dict(self) -> Dict:
         """
         Build a dictionary of existing assignments for quick lookup.
@@ -272,21 +359,31 @@ class CampusScheduler:
         return schedule_dict
     
     def _save_schedule_entries(self, schedule_run: models.ScheduleRun) -> None:
-        """Save all valid assignments to the database as ScheduleEntry records."""
-        for assignment in self.assignments:
-            schedule_entry = models.ScheduleEntry(
-                schedule_run_id=schedule_run.id,
-                teacher_id=assignment.teacher.id,
-                section_id=assignment.section.id,
-                course_id=assignment.course.id,
-                room_id=assignment.room.id,
-                timeslot_id=assignment.timeslot.id,
-                is_locked=False
-            )
-            self.db.add(schedule_entry)
-            self.schedule_entries.append(schedule_entry)
+        """
+        Save all valid assignments to the database as ScheduleEntry records.
         
+        Rows go out as one multi-row INSERT rather than through the unit of
+        work; self.schedule_entries is then loaded back with a single query.
+        """
+        rows = [
+            {
+                "schedule_run_id": schedule_run.id,
+                "teacher_id": assignment.teacher.id,
+                "section_id": assignment.section.id,
+                "course_id": assignment.course.id,
+                "room_id": assignment.room.id,
+                "timeslot_id": assignment.timeslot.id,
+                "is_locked": False
+            }
+            for assignment in self.assignments
+        ]
+        if rows:
+            self.db.execute(insert(models.ScheduleEntry), rows)
         self.db.commit()
+        
+        self.schedule_entries = self.db.query(models.ScheduleEntry).filter(
+            models.ScheduleEntry.schedule_run_id == schedule_run.id
+        ).order_by(models.ScheduleEntry.id).all()
         logger.info(f"Saved {len(self.schedule_entries)} schedule entries")
     
     def _calculate_objective_score(self) -> float:
@@ -303,8 +400,7 @@ class CampusScheduler:
         score = 1000.0
         
         # Penalize soft constraint violations
-        soft_violations = [v for v in self.violations if v.constraint_type == "SOFT"]
-        score -= len(soft_violations) * 10
+        score -= len(self._soft_violations) * 10
         
         # Bonus for more assignments
         score += len(self.assignments) * 5
@@ -316,8 +412,8 @@ class CampusScheduler:
     
     def get_violations_report(self) -> Dict:
         """Generate a report of all constraint violations."""
-        hard_violations = [v for v in self.violations if v.constraint_type == "HARD"]
-        soft_violations = [v for v in self.violations if v.constraint_type == "SOFT"]
+        hard_violations = self._hard_violations
+        soft_violations = self._soft_violations
         
         return {
             "hard_violations": [str(v) for v in hard_violations],
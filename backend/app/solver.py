@@ -1,183 +1,384 @@
+from google.protobuf import text_format
 from ortools.sat.python import cp_model
-from sqlalchemy.orm import Session
+from sqlalchemy import insert
+from sqlalchemy.orm import Session, lazyload, load_only, selectinload
 from . import models
+from .constraints import ConstraintEngine
 import logging
-from datetime import datetime, timedelta
+import os
+from collections import defaultdict
+from typing import Dict, List, Tuple
 
 logger = logging.getLogger(__name__)
 
-def run_solver(run_id: int, db: Session):
-    # Load data
-    run = db.query(models.ScheduleRun).filter(models.ScheduleRun.id == run_id).first()
-    if not run:
-        logger.error(f"Schedule run {run_id} not found")
-        return
-    
-    term_id = run.term_id
-    
-    # Load teaching assignments
-    assignments = db.query(models.TeachingAssignment).filter(models.TeachingAssignment.term_id == term_id).all()
-    
-    # Load timeslots
-    timeslots = db.query(models.Timeslot).all()
+# CP-SAT search settings. The portfolio runs one strategy per worker; past
+# ~16 workers the extra strategies stop paying for themselves.
+SOLVER_WORKERS = int(os.getenv("SOLVER_WORKERS", "8"))
+SOLVER_TIME_LIMIT_SECONDS = float(os.getenv("SOLVER_TIME_LIMIT_SECONDS", "600"))
+SOLVER_RELATIVE_GAP_LIMIT = 0.01  # stop within 1% of the best bound
+
+# Rooms senior teachers must be placed in (hard in the solver)
+SENIOR_ROOM_CODES = frozenset(ConstraintEngine.SENIOR_ROOMS)
+
+# Lunch start times, in minutes (the engine's early and late lunch)
+LUNCH_STARTS = frozenset(
+    models.hhmm_to_minutes(start)
+    for start in (ConstraintEngine.EARLY_START_LUNCH, ConstraintEngine.LATE_START_LUNCH)
+)
+
+# Settings tuned for the timetable structure (exactly-one / at-most-one
+# cliques plus a small objective). Presolve, symmetry detection and
+# precedence reasoning are already on by default in CP-SAT.
+SOLVER_TUNING = {
+    "linearization_level": 2,   # full LP relaxation of the clique constraints
+    "optimize_with_core": True, # core-based lower bounds for the penalty objective
+}
+# Per-deployment overrides, as SatParameters text (e.g. "symmetry_level: 4")
+SOLVER_PARAMETERS = os.getenv("SOLVER_PARAMETERS", "")
+
+def build_cp_model(
+    assignments: List[models.TeachingAssignment],
+    timeslots: List[models.Timeslot],
+    rooms: List[models.Room]
+) -> Tuple[cp_model.CpModel, Dict[Tuple[int, int, int], cp_model.IntVar]]:
+    """
+    Encode a term's hard constraints and soft objective as one CP-SAT model.
     
-    # Load rooms
-    rooms = db.query(models.Room).filter(models.Room.active == True).all()
+    This is the whole-term counterpart of ConstraintEngine.find_valid_timeslots:
+    instead of enumerating (timeslot, room) pairs per assignment, the solver
+    propagates all assignments together.
     
+    Returns the model and the {(assignment_id, room_id, timeslot_id): BoolVar} map.
+    """
     # Load teachers, sections, courses from assignments
     teachers = {a.teacher_id: a.teacher for a in assignments}
     sections = {a.section_id: a.section for a in assignments}
     courses = {a.course_id: a.course for a in assignments}
     
+    # Group index, built once instead of rescanning assignments per group
+    by_section = defaultdict(list)
+    for a in assignments:
+        by_section[a.section_id].append(a)
+    sat_slots = [t for t in timeslots if t.day_of_week == models.DayOfWeek.SAT]
+    cwats_slots = [t for t in sat_slots if t.is_cwats_slot]
+    small_room_ids = {r.id for r in rooms if r.capacity < 50}  # Assume small
+    # Plain ids, read once: the loops below run per (assignment, room,
+    # timeslot) and would otherwise go through ORM attribute access each time
+    timeslot_ids = [t.id for t in timeslots]
+    
+    # Per-assignment domains. Room type, senior-room and end-of-day rules
+    # only ever rule placements out, so applying them here means those
+    # variables are never created (rather than created and fixed to 0).
+    senior_room_ids = {r.id for r in rooms if r.room_code in SENIOR_ROOM_CODES}
+    allowed_rooms = {}
+    allowed_timeslots = {}
+    allowed_slot_ids = {}
+    allowed_rooms_by_kind = {}
+    allowed_timeslots_by_limit = {}
+    for assignment in assignments:
+        course = courses[assignment.course_id]
+        teacher = teachers[assignment.teacher_id]
+        
+        # Rooms depend only on the course type and on seniority, so each
+        # combination is filtered once
+        kind = (course.course_type, bool(teacher.is_senior_old))
+        if kind not in allowed_rooms_by_kind:
+            # Room type matching
+            candidate_rooms = [r for r in rooms if r.room_type == course.course_type or course.course_type == models.CourseType.STANDARD]
+            # Senior teacher room preference (hard for seniors)
+            if teacher.is_senior_old:
+                candidate_rooms = [r for r in candidate_rooms if r.id in senior_room_ids]
+            allowed_rooms_by_kind[kind] = candidate_rooms
+        allowed_rooms[assignment.id] = allowed_rooms_by_kind[kind]
+        
+        # End-of-day limits, in minutes (same table as the constraint engine)
+        latest_end = ConstraintEngine.TIME_LIMITS_MIN.get((teacher.status, teacher.workload))
+        if latest_end not in allowed_timeslots_by_limit:
+            # (set for membership tests, list in timeslot order for loops)
+            slot_ids = [t.id for t in timeslots if latest_end is None or t.end_min <= latest_end]
+            allowed_timeslots_by_limit[latest_end] = (set(slot_ids), slot_ids)
+        allowed_timeslots[assignment.id], allowed_slot_ids[assignment.id] = allowed_timeslots_by_limit[latest_end]
+    
     # Create model
     model = cp_model.CpModel()
     
-    # Variables: for each assignment, room, timeslot
+    # Variables: for each assignment, allowed room, allowed timeslot. Each
+    # is also filed under its assignment and its (teacher | section | room,
+    # timeslot) bucket, so the constraints below read flat prebuilt lists.
     variables = {}
+    assignment_vars = defaultdict(list)
+    teacher_slot_vars = defaultdict(list)
+    section_slot_vars = defaultdict(list)
+    room_slot_vars = defaultdict(list)
     for assignment in assignments:
-        for room in rooms:
-            for timeslot in timeslots:
-                var_name = f"assign_{assignment.id}_{room.id}_{timeslot.id}"
-                variables[(assignment.id, room.id, timeslot.id)] = model.NewBoolVar(var_name)
+        assignment_id = assignment.id
+        teacher_id = assignment.teacher_id
+        section_id = assignment.section_id
+        own_vars = assignment_vars[assignment_id]
+        slot_ids = allowed_slot_ids[assignment_id]
+        for room in allowed_rooms[assignment_id]:
+            room_id = room.id
+            for timeslot_id in slot_ids:
+                var = model.NewBoolVar(f"assign_{assignment_id}_{room_id}_{timeslot_id}")
+                variables[(assignment_id, room_id, timeslot_id)] = var
+                own_vars.append(var)
+                teacher_slot_vars[(teacher_id, timeslot_id)].append(var)
+                section_slot_vars[(section_id, timeslot_id)].append(var)
+                room_slot_vars[(room_id, timeslot_id)].append(var)
+    
+    def slot_vars(group, timeslot):
+        """Variables placing any assignment of group in timeslot."""
+        return [
+            variables[(a.id, r.id, timeslot.id)]
+            for a in group if timeslot.id in allowed_timeslots[a.id]
+            for r in allowed_rooms[a.id]
+        ]
     
     # Hard Constraints
     
+    # Uniqueness and no-overlap are posted as exactly-one / at-most-one
+    # constraints rather than linear sums: CP-SAT propagates them as clique
+    # constraints and merges overlapping ones in presolve.
+    
     # 1. Each assignment must be assigned exactly once
     for assignment in assignments:
-        model.Add(sum(variables[(assignment.id, r.id, t.id)] for r in rooms for t in timeslots) == 1)
+        model.AddExactlyOne(assignment_vars[assignment.id])
     
     # 2. No teacher overlap
     for teacher_id in teachers:
-        teacher_assignments = [a for a in assignments if a.teacher_id == teacher_id]
-        for timeslot in timeslots:
-            model.Add(sum(variables[(a.id, r.id, timeslot.id)] for a in teacher_assignments for r in rooms) <= 1)
+        for timeslot_id in timeslot_ids:
+            model.AddAtMostOne(teacher_slot_vars[(teacher_id, timeslot_id)])
     
     # 3. No section overlap
     for section_id in sections:
-        section_assignments = [a for a in assignments if a.section_id == section_id]
-        for timeslot in timeslots:
-            model.Add(sum(variables[(a.id, r.id, timeslot.id)] for a in section_assignments for r in rooms) <= 1)
+        for timeslot_id in timeslot_ids:
+            model.AddAtMostOne(section_slot_vars[(section_id, timeslot_id)])
     
     # 4. No room overlap
     for room in rooms:
-        for timeslot in timeslots:
-            model.Add(sum(variables[(a.id, room.id, timeslot.id)] for a in assignments) <= 1)
+        for timeslot_id in timeslot_ids:
+            model.AddAtMostOne(room_slot_vars[(room.id, timeslot_id)])
     
-    # 5. Room type matching
-    for assignment in assignments:
-        course = courses[assignment.course_id]
-        allowed_rooms = [r for r in rooms if r.room_type == course.course_type or course.course_type == models.CourseType.STANDARD]
-        for room in rooms:
-            if room not in allowed_rooms:
-                for timeslot in timeslots:
-                    model.Add(variables[(assignment.id, room.id, timeslot.id)] == 0)
-    
-    # 6. End-of-day limits
-    for assignment in assignments:
-        teacher = teachers[assignment.teacher_id]
-        for timeslot in timeslots:
-            end_time = datetime.strptime(timeslot.end_time, "%H:%M")
-            if teacher.status == models.TeacherStatus.PERMANENT and teacher.workload == models.Workload.FULL_TIME:
-                if end_time > datetime.strptime("15:30", "%H:%M"):
-                    for room in rooms:
-                        model.Add(variables[(assignment.id, room.id, timeslot.id)] == 0)
-            elif teacher.status == models.TeacherStatus.CONTRACT_OF_SERVICE and teacher.workload == models.Workload.FULL_TIME:
-                if end_time > datetime.strptime("17:30", "%H:%M"):
-                    for room in rooms:
-                        model.Add(variables[(assignment.id, room.id, timeslot.id)] == 0)
-    
-    # 7. Senior teacher room preference (hard for seniors)
-    senior_rooms = ["A103", "A104", "A203"]
-    for assignment in assignments:
-        teacher = teachers[assignment.teacher_id]
-        if teacher.is_senior_old:
-            allowed_rooms = [r for r in rooms if r.room_code in senior_rooms]
-            for room in rooms:
-                if room not in allowed_rooms:
-                    for timeslot in timeslots:
-                        model.Add(variables[(assignment.id, room.id, timeslot.id)] == 0)
+    # Symmetry breaking. Rooms that no rule tells apart (same type and
+    # capacity, both or neither senior rooms) are interchangeable within any
+    # timeslot, so only fill a later one when the one before it is in use.
+    room_classes = defaultdict(list)
+    for room in rooms:
+        room_classes[(room.room_type, room.capacity, room.id in senior_room_ids)].append(room)
+    for same_rooms in room_classes.values():
+        same_rooms.sort(key=lambda r: r.id)
+        for previous, room in zip(same_rooms, same_rooms[1:]):
+            for timeslot_id in timeslot_ids:
+                used = room_slot_vars[(room.id, timeslot_id)]
+                if used:
+                    model.Add(cp_model.LinearExpr.Sum(used) <= cp_model.LinearExpr.Sum(room_slot_vars[(previous.id, timeslot_id)]))
     
     # 8. CWATS for first-year sections
     for section_id in sections:
         section = sections[section_id]
         if section.is_first_year:
-            cwats_assignments = [a for a in assignments if a.section_id == section_id and courses[a.course_id].course_type == models.CourseType.CWATS]
-            cwats_slots = [t for t in timeslots if t.is_cwats_slot and t.day_of_week == models.DayOfWeek.SAT]
+            cwats_assignments = [a for a in by_section[section_id] if courses[a.course_id].course_type == models.CourseType.CWATS]
             # At least one CWATS slot assigned
             if cwats_assignments:
-                model.Add(sum(variables[(a.id, r.id, t.id)] for a in cwats_assignments for r in rooms for t in cwats_slots) >= 1)
+                model.Add(cp_model.LinearExpr.Sum([v for t in cwats_slots for v in slot_vars(cwats_assignments, t)]) >= 1)
+    
+    # Objective terms, kept as parallel variable / coefficient lists and
+    # summed once at the end
+    obj_vars = []
+    obj_coeffs = []
     
     # 9. Saturday-Weekday Swap (simplified penalty in objective)
-    sat_penalties = []
     for teacher_id in teachers:
-        teacher_assignments = [a for a in assignments if a.teacher_id == teacher_id]
-        sat_slots = [t for t in timeslots if t.day_of_week == models.DayOfWeek.SAT]
         has_sat = model.NewBoolVar(f"has_sat_{teacher_id}")
-        model.Add(has_sat == (sum(variables[(a.id, r.id, t.id)] for a in teacher_assignments for r in rooms for t in sat_slots) > 0))
+        sat_sum = cp_model.LinearExpr.Sum([v for t in sat_slots for v in teacher_slot_vars[(teacher_id, t.id)]])
+        # has_sat <=> the teacher has any Saturday class
+        model.Add(sat_sum >= 1).OnlyEnforceIf(has_sat)
+        model.Add(sat_sum == 0).OnlyEnforceIf(has_sat.Not())
         # Penalty if has_sat and no full vacant weekday (simplified)
-        sat_penalties.append(has_sat * 100)  # High penalty
+        obj_vars.append(has_sat)
+        obj_coeffs.append(100)  # High penalty
     
     # 10. Lunch logic (simplified - ensure no classes during lunch)
-    lunch_slots = [t for t in timeslots if "11:30" in t.start_time or "14:30" in t.start_time]  # Assuming lunch slots
+    lunch_slots = [t for t in timeslots if t.start_min in LUNCH_STARTS]  # Assuming lunch slots
     for teacher_id in teachers:
-        teacher_assignments = [a for a in assignments if a.teacher_id == teacher_id]
         for lunch_slot in lunch_slots:
             # If teacher has early start, block lunch
             # Simplified: penalize lunch assignments
             pass
     
     # Soft Constraints - Objective
-    objective_terms = sat_penalties
     
     # Minimize student gaps (gravity rule)
+    # Adjacent same-day timeslot pairs and their gap penalties depend only on
+    # the timeslots, so they are worked out once for all sections
+    sorted_slots = sorted(timeslots, key=lambda t: (t.day_of_week.value, t.start_time))
+    gap_pairs = []
+    for t1, t2 in zip(sorted_slots, sorted_slots[1:]):
+        if t1.day_of_week == t2.day_of_week:
+            # Wraps modulo a day like timedelta.seconds did for overlapping slots
+            gap_hours = ((t2.start_min - t1.end_min) % (24 * 60)) / 60
+            if gap_hours > 0:
+                # Penalize gaps
+                gap_penalty = int(gap_hours * 10)
+                if gap_penalty:
+                    gap_pairs.append((t1, t2, gap_penalty))
+    
     for section_id in sections:
-        section_assignments = [a for a in assignments if a.section_id == section_id]
-        # Sort timeslots by day and time
-        sorted_slots = sorted(timeslots, key=lambda t: (t.day_of_week.value, t.start_time))
-        for i in range(len(sorted_slots) - 1):
-            t1 = sorted_slots[i]
-            t2 = sorted_slots[i+1]
-            if t1.day_of_week == t2.day_of_week:
-                gap_hours = (datetime.strptime(t2.start_time, "%H:%M") - datetime.strptime(t1.end_time, "%H:%M")).seconds / 3600
-                if gap_hours > 0:
-                    # Penalize gaps
-                    gap_penalty = int(gap_hours * 10)
-                    # If both assigned, add penalty
-                    assigned_t1 = sum(variables[(a.id, r.id, t1.id)] for a in section_assignments for r in rooms)
-                    assigned_t2 = sum(variables[(a.id, r.id, t2.id)] for a in section_assignments for r in rooms)
-                    objective_terms.append(assigned_t1 * assigned_t2 * gap_penalty)
+        # A section holds at most one class per timeslot (constraint 3), so
+        # "section uses timeslot" is a BoolVar equal to the slot's sum
+        slot_used = {}
+        def section_uses(timeslot):
+            if timeslot.id not in slot_used:
+                used = model.NewBoolVar(f"used_{section_id}_{timeslot.id}")
+                model.Add(used == cp_model.LinearExpr.Sum(section_slot_vars[(section_id, timeslot.id)]))
+                slot_used[timeslot.id] = used
+            return slot_used[timeslot.id]
+        for t1, t2, gap_penalty in gap_pairs:
+            # If both assigned, add penalty: both == used_t1 AND used_t2
+            # (a linear stand-in for the product of the two sums)
+            used_t1 = section_uses(t1)
+            used_t2 = section_uses(t2)
+            both = model.NewBoolVar(f"both_{section_id}_{t1.id}_{t2.id}")
+            model.AddBoolAnd([used_t1, used_t2]).OnlyEnforceIf(both)
+            model.AddBoolOr([used_t1.Not(), used_t2.Not()]).OnlyEnforceIf(both.Not())
+            obj_vars.append(both)
+            obj_coeffs.append(gap_penalty)
     
     # 2-unit clustering (prefer small rooms for 2-unit)
-    small_rooms = [r for r in rooms if r.capacity < 50]  # Assume small
     for assignment in assignments:
         course = courses[assignment.course_id]
         if course.units == 2:
             # Bonus for small rooms
-            for room in small_rooms:
-                for timeslot in timeslots:
-                    # Negative weight for small rooms
-                    objective_terms.append(-variables[(assignment.id, room.id, timeslot.id)] * 5)
+            for room in allowed_rooms[assignment.id]:
+                if room.id in small_room_ids:
+                    for timeslot_id in allowed_slot_ids[assignment.id]:
+                        # Negative weight for small rooms
+                        obj_vars.append(variables[(assignment.id, room.id, timeslot_id)])
+                        obj_coeffs.append(-5)
     
     # Objective
-    model.Minimize(sum(objective_terms))
+    model.Minimize(cp_model.LinearExpr.WeightedSum(obj_vars, obj_coeffs))
+    
+    return model, variables
+
+
+def add_previous_solution_hints(
+    db: Session,
+    model: cp_model.CpModel,
+    variables: Dict[Tuple[int, int, int], cp_model.IntVar],
+    assignments: List[models.TeachingAssignment],
+    run: models.ScheduleRun
+) -> int:
+    """
+    Hint the model with the term's latest successful run (warm start).
+    
+    Entries don't record their assignment, so each is matched to an
+    assignment with the same teacher, section and course. Entries whose
+    placement is no longer a variable (room retired, rules changed) are
+    skipped; the solver repairs the rest if it is no longer feasible.
+    
+    Returns the number of hinted variables.
+    """
+    previous_id = db.query(models.ScheduleRun.id).filter(
+        models.ScheduleRun.term_id == run.term_id,
+        models.ScheduleRun.status == models.ScheduleRunStatus.SUCCESS,
+        models.ScheduleRun.id != run.id
+    ).order_by(models.ScheduleRun.id.desc()).limit(1).scalar()
+    if previous_id is None:
+        return 0
+    
+    unmatched = defaultdict(list)
+    for a in assignments:
+        unmatched[(a.teacher_id, a.section_id, a.course_id)].append(a.id)
+    
+    entry = models.ScheduleEntry
+    hinted = 0
+    for teacher_id, section_id, course_id, room_id, timeslot_id in db.query(
+        entry.teacher_id, entry.section_id, entry.course_id, entry.room_id, entry.timeslot_id
+    ).filter(entry.schedule_run_id == previous_id):
+        candidates = unmatched.get((teacher_id, section_id, course_id))
+        if not candidates:
+            continue
+        var = variables.get((candidates[-1], room_id, timeslot_id))
+        if var is not None:
+            candidates.pop()
+            model.AddHint(var, 1)
+            hinted += 1
+    return hinted
+
+
+def run_solver(run_id: int, db: Session):
+    # Load data
+    run = db.query(models.ScheduleRun).filter(models.ScheduleRun.id == run_id).first()
+    if not run:
+        logger.error(f"Schedule run {run_id} not found")
+        return
+    
+    term_id = run.term_id
+    
+    # Load teaching assignments, with the teacher, course and section columns
+    # the model reads, each in one IN query
+    ta = models.TeachingAssignment
+    assignments = db.query(ta).options(
+        load_only(ta.teacher_id, ta.course_id, ta.section_id),
+        selectinload(ta.teacher).load_only(
+            models.Teacher.status, models.Teacher.workload, models.Teacher.is_senior_old
+        ),
+        selectinload(ta.course).load_only(models.Course.course_type, models.Course.units),
+        selectinload(ta.section).load_only(models.Section.is_first_year)
+    ).filter(ta.term_id == term_id).all()
+    # Results are keyed by assignment id, which need not match list position
+    assign_by_id = {a.id: a for a in assignments}
+    
+    # Load timeslots
+    timeslots = db.query(models.Timeslot).all()
+    
+    # Load rooms (the model never reads the building)
+    rooms = db.query(models.Room).options(
+        load_only(models.Room.room_code, models.Room.room_type, models.Room.capacity),
+        lazyload(models.Room.building)
+    ).filter(models.Room.active == True).all()
+    
+    model, variables = build_cp_model(assignments, timeslots, rooms)
+    hinted = add_previous_solution_hints(db, model, variables, assignments, run)
+    if hinted:
+        logger.info(f"Warm-starting run {run_id} from {hinted} previous placements")
     
     # Solve
     solver = cp_model.CpSolver()
+    # Repair the hint rather than drop it if it has become infeasible
+    solver.parameters.repair_hint = bool(hinted)
+    solver.parameters.num_workers = SOLVER_WORKERS
+    solver.parameters.max_time_in_seconds = SOLVER_TIME_LIMIT_SECONDS
+    solver.parameters.relative_gap_limit = SOLVER_RELATIVE_GAP_LIMIT
+    for name, value in SOLVER_TUNING.items():
+        setattr(solver.parameters, name, value)
+    if SOLVER_PARAMETERS:
+        text_format.Merge(SOLVER_PARAMETERS, solver.parameters)
+    # Search progress goes to this module's logger rather than stdout
+    if logger.isEnabledFor(logging.DEBUG):
+        solver.parameters.log_search_progress = True
+        solver.parameters.log_to_stdout = False
+        solver.log_callback = logger.debug
     status = solver.Solve(model)
     
     if status == cp_model.OPTIMAL or status == cp_model.FEASIBLE:
-        # Save results
-        for (assign_id, room_id, ts_id), var in variables.items():
-            if solver.Value(var):
-                entry = models.ScheduleEntry(
-                    schedule_run_id=run_id,
-                    teacher_id=assignments[assign_id-1].teacher_id,
-                    section_id=assignments[assign_id-1].section_id,
-                    course_id=assignments[assign_id-1].course_id,
-                    room_id=room_id,
-                    timeslot_id=ts_id
-                )
-                db.add(entry)
+        # Save results as one multi-row INSERT rather than through the unit of work
+        rows = [
+            {
+                "schedule_run_id": run_id,
+                "teacher_id": assign_by_id[assign_id].teacher_id,
+                "section_id": assign_by_id[assign_id].section_id,
+                "course_id": assign_by_id[assign_id].course_id,
+                "room_id": room_id,
+                "timeslot_id": ts_id,
+                "is_locked": False
+            }
+            for (assign_id, room_id, ts_id), var in variables.items()
+            if solver.Value(var)
+        ]
+        if rows:
+            db.execute(insert(models.ScheduleEntry), rows)
         run.status = models.ScheduleRunStatus.SUCCESS
         run.objective_score = solver.ObjectiveValue()
     else:
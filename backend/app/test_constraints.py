@@ -18,6 +18,41 @@ def demonstrate_constraint_checks(db: Session):
     # Initialize constraint engine
     engine = ConstraintEngine(db)
     
+    # One snapshot of the master data; every scenario picks from it in memory
+    # (assumes data exists in DB)
+    all_teachers = db.query(models.Teacher).all()
+    all_rooms = db.query(models.Room).all()
+    all_courses = db.query(models.Course).all()
+    all_sections = db.query(models.Section).all()
+    all_timeslots = db.query(models.Timeslot).all()
+    active_rooms = [r for r in all_rooms if r.active]
+    
+    def first(items, predicate=lambda item: True):
+        return next((item for item in items if predicate(item)), None)
+    
+    courses_by_type = {}
+    for c in all_courses:
+        courses_by_type.setdefault(c.course_type, []).append(c)
+    teachers_by_class = {}
+    for t in all_teachers:
+        teachers_by_class.setdefault((t.status, t.workload), []).append(t)
+    
+    # Comp-off, maintenance and occupancy lookups for every teacher and room
+    prefetched = engine.prefetch(
+        [t.id for t in all_teachers], [r.id for r in all_rooms]
+    )
+    
+    # Every scenario validates against that fixed snapshot and no existing
+    # schedule, so a result depends only on the five ids and is computed once
+    validated = {}
+    def validate(teacher, course, section, timeslot, room):
+        key = (teacher.id, course.id, section.id, timeslot.id, room.id)
+        if key not in validated:
+            validated[key] = engine.validate_timeslot_for_assignment(
+                teacher, course, section, timeslot, room, prefetched=prefetched
+            )
+        return validated[key]
+    
     print("\n" + "="*80)
     print("CONSTRAINT ENGINE DEMONSTRATION")
     print("="*80)
@@ -26,25 +61,21 @@ def demonstrate_constraint_checks(db: Session):
     print("\n[SCENARIO 1] Room Type Matching Constraint")
     print("-" * 80)
     
-    # Get sample data (assumes data exists in DB)
-    lab_course = db.query(models.Course).filter(
-        models.Course.course_type == models.CourseType.LAB
-    ).first()
+    # Get sample data
+    lab_course = first(courses_by_type.get(models.CourseType.LAB, []))
+    standard_course = first(courses_by_type.get(models.CourseType.STANDARD, []))
+    standard_room = first(all_rooms, lambda r: r.room_type == models.RoomType.STANDARD)
     
-    standard_room = db.query(models.Room).filter(
-        models.Room.room_type == models.RoomType.STANDARD
-    ).first()
-    
-    teacher = db.query(models.Teacher).first()
-    section = db.query(models.Section).first()
-    timeslot = db.query(models.Timeslot).first()
+    teacher = first(all_teachers)
+    section = first(all_sections)
+    timeslot = first(all_timeslots)
     
     if lab_course and standard_room and teacher and section and timeslot:
         print(f"Testing: {teacher.full_name} teaches {lab_course.course_code} (LAB)")
         print(f"         in {standard_room.room_code} (STANDARD room)")
         print(f"         at {timeslot.start_time}-{timeslot.end_time}")
         
-        is_valid, violations = engine.validate_timeslot_for_assignment(
+        is_valid, violations = validate(
             teacher, lab_course, section, timeslot, standard_room
         )
         
@@ -56,26 +87,19 @@ def demonstrate_constraint_checks(db: Session):
     print("\n[SCENARIO 2] Time Limit Constraint (Permanent + Full-Time)")
     print("-" * 80)
     
-    permanent_ft_teacher = db.query(models.Teacher).filter(
-        models.Teacher.status == models.TeacherStatus.PERMANENT,
-        models.Teacher.workload == models.Workload.FULL_TIME
-    ).first()
+    permanent_ft_teacher = first(
+        teachers_by_class.get((models.TeacherStatus.PERMANENT, models.Workload.FULL_TIME), [])
+    )
     
-    late_timeslot = db.query(models.Timeslot).filter(
-        models.Timeslot.end_time > "16:00"  # After 3:30 PM limit
-    ).first()
+    late_timeslot = first(all_timeslots, lambda t: t.end_time > "16:00")  # After 3:30 PM limit
     
     if permanent_ft_teacher and late_timeslot:
-        standard_course = db.query(models.Course).filter(
-            models.Course.course_type == models.CourseType.STANDARD
-        ).first()
-        
         if standard_course:
             print(f"Testing: {permanent_ft_teacher.full_name} (Permanent + Full-Time)")
             print(f"         Teaching at {late_timeslot.start_time}-{late_timeslot.end_time}")
             print(f"         Time limit for this classification: 3:30 PM")
             
-            is_valid, violations = engine.validate_timeslot_for_assignment(
+            is_valid, violations = validate(
                 permanent_ft_teacher, standard_course, section, late_timeslot, standard_room
             )
             
@@ -87,17 +111,14 @@ def demonstrate_constraint_checks(db: Session):
     print("\n[SCENARIO 3] Teacher Lunch Break Constraint")
     print("-" * 80)
     
-    lunch_conflict_timeslot = db.query(models.Timeslot).filter(
-        models.Timeslot.start_time >= "11:00",
-        models.Timeslot.start_time <= "12:30"
-    ).first()
+    lunch_conflict_timeslot = first(all_timeslots, lambda t: "11:00" <= t.start_time <= "12:30")
     
     if lunch_conflict_timeslot and teacher and standard_course:
         print(f"Testing: {teacher.full_name}")
         print(f"         Teaching at {lunch_conflict_timeslot.start_time}-{lunch_conflict_timeslot.end_time}")
         print(f"         Potential lunch break conflict")
         
-        is_valid, violations = engine.validate_timeslot_for_assignment(
+        is_valid, violations = validate(
             teacher, standard_course, section, lunch_conflict_timeslot, standard_room
         )
         
@@ -109,21 +130,18 @@ def demonstrate_constraint_checks(db: Session):
     print("\n[SCENARIO 4] 1st Year CWATS Saturday Vacancy Constraint")
     print("-" * 80)
     
-    first_year_section = db.query(models.Section).filter(
-        models.Section.is_first_year == True
-    ).first()
+    first_year_section = first(all_sections, lambda s: s.is_first_year)
     
-    cwats_timeslot = db.query(models.Timeslot).filter(
-        models.Timeslot.day_of_week == models.DayOfWeek.SAT,
-        models.Timeslot.is_cwats_slot == True
-    ).first()
+    cwats_timeslot = first(
+        all_timeslots, lambda t: t.day_of_week == models.DayOfWeek.SAT and t.is_cwats_slot
+    )
     
     if first_year_section and cwats_timeslot and teacher and standard_course:
         print(f"Testing: 1st-year section {first_year_section.code}")
         print(f"         Teaching at {cwats_timeslot.start_time}-{cwats_timeslot.end_time} on Saturday")
         print(f"         CWATS slot: {cwats_timeslot.is_cwats_slot}")
         
-        is_valid, violations = engine.validate_timeslot_for_assignment(
+        is_valid, violations = validate(
             teacher, standard_course, first_year_section, cwats_timeslot, standard_room
         )
         
@@ -135,20 +153,16 @@ def demonstrate_constraint_checks(db: Session):
     print("\n[SCENARIO 5] Senior Teacher Priority (Soft Constraint)")
     print("-" * 80)
     
-    senior_teacher = db.query(models.Teacher).filter(
-        models.Teacher.is_senior_old == True
-    ).first()
+    senior_teacher = first(all_teachers, lambda t: t.is_senior_old)
     
-    non_senior_room = db.query(models.Room).filter(
-        models.Room.room_code.notin_(["A103", "A104", "A203"])
-    ).first()
+    non_senior_room = first(all_rooms, lambda r: r.room_code not in ("A103", "A104", "A203"))
     
     if senior_teacher and non_senior_room and standard_course and timeslot:
         print(f"Testing: {senior_teacher.full_name} (Senior Teacher)")
         print(f"         Assigned to room: {non_senior_room.room_code}")
         print(f"         Preferred rooms: A103, A104, A203")
         
-        is_valid, violations = engine.validate_timeslot_for_assignment(
+        is_valid, violations = validate(
             senior_teacher, standard_course, section, timeslot, non_senior_room
         )
         
@@ -176,7 +190,8 @@ def demonstrate_constraint_checks(db: Session):
         print(f"  Section: {section.code}")
         
         valid_combinations = engine.find_valid_timeslots(
-            teacher, standard_course, section
+            teacher, standard_course, section,
+            available_rooms=active_rooms, prefetched=prefetched, timeslots=all_timeslots
         )
         
         if valid_combinations:
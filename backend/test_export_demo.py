@@ -3,12 +3,14 @@ Test script demonstrating Excel export functionality
 Run: python test_export_demo.py
 """
 
+import os
 import sys
 sys.path.insert(0, '/workspaces/Scheduling/backend')
 
 from app.excel_exporter import ExcelExporter
 from app.database import SessionLocal
 from app import models
+from sqlalchemy import func
 from datetime import datetime, timedelta
 
 def demo_export():
@@ -39,10 +41,15 @@ def demo_export():
         print(f"Found {len(schedule_runs)} schedule run(s) in database:")
         print()
         
+        # Entry counts for every run in one grouped query
+        entry_counts = dict(
+            db.query(models.ScheduleEntry.schedule_run_id, func.count(models.ScheduleEntry.id))
+            .group_by(models.ScheduleEntry.schedule_run_id)
+            .all()
+        )
+        
         for run in schedule_runs:
-            entry_count = db.query(models.ScheduleEntry).filter(
-                models.ScheduleEntry.schedule_run_id == run.id
-            ).count()
+            entry_count = entry_counts.get(run.id, 0)
             
             print(f"  Run ID: {run.id}")
             print(f"  Term: {run.term_id}")
@@ -62,23 +69,21 @@ def demo_export():
         # Create exporter
         exporter = ExcelExporter(db)
         
-        # Generate Excel
-        excel_bytes = exporter.export_schedule(
-            run_id,
-            institution_name="Campus University"
-        )
-        
-        # Save to file
+        # Generate Excel straight into the file (no in-memory copy)
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"schedule_{run_id}_{timestamp}.xlsx"
         
         with open(filename, "wb") as f:
-            f.write(excel_bytes)
+            exporter.write_schedule(
+                run_id,
+                f,
+                institution_name="Campus University"
+            )
         
         print(f"✅ Export successful!")
         print()
         print(f"📁 File saved: {filename}")
-        print(f"📊 File size: {len(excel_bytes) / 1024:.1f} KB")
+        print(f"📊 File size: {os.path.getsize(filename) / 1024:.1f} KB")
         print()
         print("Sheets included:")
         print("  1. Teacher View - Schedule per teacher")
@@ -8,12 +8,15 @@ This script tests the complete scheduling workflow:
 3. Run the scheduler
 4. Verify the generated schedule
 5. Check constraint violations
+
+Set DATABASE_URL=sqlite:// to run against a throwaway in-memory database, or
+SQLITE_NO_FSYNC=1 to skip fsyncs on a throwaway SQLite file.
 """
 
 import logging
-from datetime import datetime
+from sqlalchemy import case, insert, select
 from sqlalchemy.orm import Session
-from app.database import SessionLocal, engine
+from app.database import SessionLocal, ensure_schema
 from app import models
 from app.scheduler import CampusScheduler
 from app.constraints import ConstraintEngine
@@ -24,169 +27,146 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Timeslot grid of the test data
+SESSION_HOURS = [("07:30", "10:30"), ("10:30", "13:30"), ("14:30", "17:30")]
+WEEKDAYS = [
+    models.DayOfWeek.MON,
+    models.DayOfWeek.TUE,
+    models.DayOfWeek.WED,
+    models.DayOfWeek.THU,
+    models.DayOfWeek.FRI,
+]
+
+
+def _insert_rows(db: Session, model, rows: list) -> list:
+    """Insert rows with one multi-row INSERT; returns the new instances in input order."""
+    stmt = insert(model).returning(model, sort_by_parameter_order=True)
+    return db.scalars(stmt, rows).all()
+
 
 def setup_test_data(db: Session):
     """Create test data for scheduling."""
     logger.info("Setting up test data...")
     
     # Create buildings
-    bldg_a = models.Building(code="A", name="Building A")
-    bldg_b = models.Building(code="B", name="Building B")
-    db.add(bldg_a)
-    db.add(bldg_b)
-    db.flush()
+    bldg_a, bldg_b = _insert_rows(db, models.Building, [
+        {"code": "A", "name": "Building A"},
+        {"code": "B", "name": "Building B"},
+    ])
     
     # Create rooms
-    rooms = [
-        models.Room(
-            building_id=bldg_a.id,
-            room_code="A101",
-            floor_no=1,
-            room_type=models.RoomType.STANDARD,
-            capacity=30,
-            active=True
-        ),
-        models.Room(
-            building_id=bldg_a.id,
-            room_code="A103",
-            floor_no=1,
-            room_type=models.RoomType.LAB,
-            capacity=25,
-            active=True
-        ),
-        models.Room(
-            building_id=bldg_b.id,
-            room_code="B201",
-            floor_no=2,
-            room_type=models.RoomType.SHOP,
-            capacity=20,
-            active=True
-        ),
-    ]
-    db.add_all(rooms)
-    db.flush()
+    rooms = _insert_rows(db, models.Room, [
+        {
+            "building_id": bldg_a.id,
+            "room_code": "A101",
+            "floor_no": 1,
+            "room_type": models.RoomType.STANDARD,
+            "capacity": 30,
+            "active": True
+        },
+        {
+            "building_id": bldg_a.id,
+            "room_code": "A103",
+            "floor_no": 1,
+            "room_type": models.RoomType.LAB,
+            "capacity": 25,
+            "active": True
+        },
+        {
+            "building_id": bldg_b.id,
+            "room_code": "B201",
+            "floor_no": 2,
+            "room_type": models.RoomType.SHOP,
+            "capacity": 20,
+            "active": True
+        },
+    ])
     
     # Create teachers with various classifications
-    teachers = [
-        models.Teacher(
-            employee_no="T001",
-            full_name="Dr. John Smith",
-            title=models.TeacherTitle.INSTRUCTOR_I,
-            status=models.TeacherStatus.PERMANENT,
-            workload=models.Workload.FULL_TIME,
-            is_senior_old=True,
-            active=True
-        ),
-        models.Teacher(
-            employee_no="T002",
-            full_name="Ms. Jane Doe",
-            title=models.TeacherTitle.ASST_PROF_III,
-            status=models.TeacherStatus.CONTRACT_OF_SERVICE,
-            workload=models.Workload.FULL_TIME,
-            is_senior_old=False,
-            active=True
-        ),
-        models.Teacher(
-            employee_no="T003",
-            full_name="Mr. James Wilson",
-            title=models.TeacherTitle.INSTRUCTOR_II,
-            status=models.TeacherStatus.PERMANENT,
-            workload=models.Workload.PART_TIME,
-            is_senior_old=False,
-            active=True
-        ),
-    ]
-    db.add_all(teachers)
-    db.flush()
+    teachers = _insert_rows(db, models.Teacher, [
+        {
+            "employee_no": "T001",
+            "full_name": "Dr. John Smith",
+            "title": models.TeacherTitle.INSTRUCTOR_I,
+            "status": models.TeacherStatus.PERMANENT,
+            "workload": models.Workload.FULL_TIME,
+            "is_senior_old": True,
+            "active": True
+        },
+        {
+            "employee_no": "T002",
+            "full_name": "Ms. Jane Doe",
+            "title": models.TeacherTitle.ASST_PROF_III,
+            "status": models.TeacherStatus.CONTRACT_OF_SERVICE,
+            "workload": models.Workload.FULL_TIME,
+            "is_senior_old": False,
+            "active": True
+        },
+        {
+            "employee_no": "T003",
+            "full_name": "Mr. James Wilson",
+            "title": models.TeacherTitle.INSTRUCTOR_II,
+            "status": models.TeacherStatus.PERMANENT,
+            "workload": models.Workload.PART_TIME,
+            "is_senior_old": False,
+            "active": True
+        },
+    ])
     
     # Create sections (student groups)
-    sections = [
-        models.Section(code="BS-CS-1A", year_level=1, is_first_year=True),
-        models.Section(code="BS-CS-2B", year_level=2, is_first_year=False),
-        models.Section(code="BS-CE-1C", year_level=1, is_first_year=True),
-    ]
-    db.add_all(sections)
-    db.flush()
+    sections = _insert_rows(db, models.Section, [
+        {"code": "BS-CS-1A", "year_level": 1, "is_first_year": True},
+        {"code": "BS-CS-2B", "year_level": 2, "is_first_year": False},
+        {"code": "BS-CE-1C", "year_level": 1, "is_first_year": True},
+    ])
     
     # Create courses
-    courses = [
-        models.Course(
-            course_code="CS101",
-            course_name="Introduction to Programming",
-            units=3.0,
-            course_type=models.CourseType.STANDARD,
-            default_duration_minutes=90
-        ),
-        models.Course(
-            course_code="CS201",
-            course_name="Data Structures Lab",
-            units=2.0,
-            course_type=models.CourseType.LAB,
-            default_duration_minutes=180
-        ),
-        models.Course(
-            course_code="CE101",
-            course_name="Engineering Workshop",
-            units=2.0,
-            course_type=models.CourseType.SHOP,
-            default_duration_minutes=180
-        ),
-    ]
-    db.add_all(courses)
-    db.flush()
+    courses = _insert_rows(db, models.Course, [
+        {
+            "course_code": "CS101",
+            "course_name": "Introduction to Programming",
+            "units": 3.0,
+            "course_type": models.CourseType.STANDARD,
+            "default_duration_minutes": 90
+        },
+        {
+            "course_code": "CS201",
+            "course_name": "Data Structures Lab",
+            "units": 2.0,
+            "course_type": models.CourseType.LAB,
+            "default_duration_minutes": 180
+        },
+        {
+            "course_code": "CE101",
+            "course_name": "Engineering Workshop",
+            "units": 2.0,
+            "course_type": models.CourseType.SHOP,
+            "default_duration_minutes": 180
+        },
+    ])
     
-    # Create timeslots (Morning and afternoon sessions)
-    timeslots = [
-        # Monday morning
-        models.Timeslot(day_of_week=models.DayOfWeek.MON, start_time="07:30", end_time="10:30", is_cwats_slot=False),
-        models.Timeslot(day_of_week=models.DayOfWeek.MON, start_time="10:30", end_time="13:30", is_cwats_slot=False),
-        models.Timeslot(day_of_week=models.DayOfWeek.MON, start_time="14:30", end_time="17:30", is_cwats_slot=False),
-        # Tuesday morning
-        models.Timeslot(day_of_week=models.DayOfWeek.TUE, start_time="07:30", end_time="10:30", is_cwats_slot=False),
-        models.Timeslot(day_of_week=models.DayOfWeek.TUE, start_time="10:30", end_time="13:30", is_cwats_slot=False),
-        models.Timeslot(day_of_week=models.DayOfWeek.TUE, start_time="14:30", end_time="17:30", is_cwats_slot=False),
-        # Wednesday
-        models.Timeslot(day_of_week=models.DayOfWeek.WED, start_time="07:30", end_time="10:30", is_cwats_slot=False),
-        models.Timeslot(day_of_week=models.DayOfWeek.WED, start_time="10:30", end_time="13:30", is_cwats_slot=False),
-        models.Timeslot(day_of_week=models.DayOfWeek.WED, start_time="14:30", end_time="17:30", is_cwats_slot=False),
-        # Thursday
-        models.Timeslot(day_of_week=models.DayOfWeek.THU, start_time="07:30", end_time="10:30", is_cwats_slot=False),
-        models.Timeslot(day_of_week=models.DayOfWeek.THU, start_time="10:30", end_time="13:30", is_cwats_slot=False),
-        models.Timeslot(day_of_week=models.DayOfWeek.THU, start_time="14:30", end_time="17:30", is_cwats_slot=False),
-        # Friday
-        models.Timeslot(day_of_week=models.DayOfWeek.FRI, start_time="07:30", end_time="10:30", is_cwats_slot=False),
-        models.Timeslot(day_of_week=models.DayOfWeek.FRI, start_time="10:30", end_time="13:30", is_cwats_slot=False),
-        models.Timeslot(day_of_week=models.DayOfWeek.FRI, start_time="14:30", end_time="17:30", is_cwats_slot=False),
-        # Saturday (CWATS - for first-year students only)
-        models.Timeslot(day_of_week=models.DayOfWeek.SAT, start_time="07:30", end_time="10:30", is_cwats_slot=True),
-        models.Timeslot(day_of_week=models.DayOfWeek.SAT, start_time="10:30", end_time="13:30", is_cwats_slot=True),
-    ]
-    db.add_all(timeslots)
-    db.flush()
+    # Create timeslots (morning, midday and afternoon sessions on weekdays,
+    # plus the two Saturday CWATS slots for first-year students only)
+    timeslots = _insert_rows(db, models.Timeslot, [
+        {"day_of_week": day, "start_time": start, "end_time": end, "is_cwats_slot": False}
+        for day in WEEKDAYS
+        for start, end in SESSION_HOURS
+    ] + [
+        {"day_of_week": models.DayOfWeek.SAT, "start_time": start, "end_time": end, "is_cwats_slot": True}
+        for start, end in SESSION_HOURS[:2]
+    ])
     
     # Create teaching assignments (term 1)
     term_id = 1
-    assignments = [
-        models.TeachingAssignment(
-            teacher_id=teachers[0].id,
-            section_id=sections[0].id,
-            course_id=courses[0].id,
-            term_id=term_id
-        ),
-        models.TeachingAssignment(
-            teacher_id=teachers[1].id,
-            section_id=sections[1].id,
-            course_id=courses[1].id,
-            term_id=term_id
-        ),
-        models.TeachingAssignment(
-            teacher_id=teachers[2].id,
-            section_id=sections[2].id,
-            course_id=courses[2].id,
-            term_id=term_id
-        ),
-    ]
-    db.add_all(assignments)
+    assignments = _insert_rows(db, models.TeachingAssignment, [
+        {
+            "teacher_id": teacher.id,
+            "section_id": section.id,
+            "course_id": course.id,
+            "term_id": term_id
+        }
+        for teacher, section, course in zip(teachers, sections, courses)
+    ])
     db.commit()
     
     logger.info(f"✅ Test data created: {len(teachers)} teachers, {len(sections)} sections, {len(courses)} courses, {len(timeslots)} timeslots")
@@ -197,23 +177,24 @@ def setup_test_data(db: Session):
         "courses": courses,
         "rooms": rooms,
         "timeslots": timeslots,
+        "assignments": assignments,
     }
 
 
-def test_constraint_engine(db: Session):
-    """Test the constraint engine with sample data."""
+def test_constraint_engine(db: Session, test_data: dict):
+    """Test the constraint engine with the first of each test entity."""
     logger.info("\n" + "="*80)
     logger.info("TESTING CONSTRAINT ENGINE")
     logger.info("="*80)
     
     engine_instance = ConstraintEngine(db)
     
-    # Get sample data
-    teacher = db.query(models.Teacher).first()
-    course = db.query(models.Course).first()
-    section = db.query(models.Section).first()
-    timeslot = db.query(models.Timeslot).first()
-    room = db.query(models.Room).first()
+    # Sample data straight from the fixture (no lookups)
+    teacher = test_data["teachers"][0]
+    course = test_data["courses"][0]
+    section = test_data["sections"][0]
+    timeslot = test_data["timeslots"][0]
+    room = test_data["rooms"][0]
     
     if all([teacher, course, section, timeslot, room]):
         is_valid, violations = engine_instance.validate_timeslot_for_assignment(
@@ -245,41 +226,84 @@ def test_scheduler(db: Session, test_data: dict):
     
     term_id = test_data["term_id"]
     
-    # Create a schedule run
+    # Create a schedule run (created_at comes from the column's now() default,
+    # as for runs created through the API)
     schedule_run = models.ScheduleRun(
         term_id=term_id,
         status=models.ScheduleRunStatus.DRAFT,
-        created_by="TEST",
-        created_at=datetime.now()
+        created_by="TEST"
     )
     db.add(schedule_run)
     db.commit()
     
     logger.info(f"Created schedule run {schedule_run.id} for term {term_id}")
     
+    # Narrow each assignment's timeslots up front: the Saturday CWATS slots
+    # are kept for first-year sections only, so the others never try them
+    timeslots = test_data["timeslots"]
+    weekday_timeslots = [timeslot for timeslot in timeslots if not timeslot.is_cwats_slot]
+    first_year_section_ids = {section.id for section in test_data["sections"] if section.is_first_year}
+    slot_domain = {
+        assignment.id: timeslots if assignment.section_id in first_year_section_ids else weekday_timeslots
+        for assignment in test_data["assignments"]
+    }
+    
+    # Tightest domain first: order the assignments by how few rooms, then
+    # timeslots, pass the hard constraints for them on an empty schedule
+    engine_instance = ConstraintEngine(db)
+    teachers = {teacher.id: teacher for teacher in test_data["teachers"]}
+    courses = {course.id: course for course in test_data["courses"]}
+    sections = {section.id: section for section in test_data["sections"]}
+    
+    def domain_size(assignment):
+        candidates = engine_instance.find_valid_timeslots(
+            teachers[assignment.teacher_id],
+            courses[assignment.course_id],
+            sections[assignment.section_id],
+            available_rooms=test_data["rooms"],
+            timeslots=slot_domain[assignment.id]
+        )
+        room_ids = {room.id for cell_rooms in candidates.values() for room in cell_rooms}
+        return (len(room_ids), len(candidates))
+    
+    assignment_order = [assignment.id for assignment in sorted(test_data["assignments"], key=domain_size)]
+    
     # Run the scheduler
-    scheduler = CampusScheduler(db)
-    success, message = scheduler.generate_schedule(schedule_run, term_id, prioritize_senior=True)
+    scheduler = CampusScheduler(db, slot_domain=slot_domain)
+    success, message = scheduler.generate_schedule(
+        schedule_run, term_id, prioritize_senior=True, assignment_order=assignment_order
+    )
     
     logger.info(f"Scheduler result: {success}")
     logger.info(f"Message: {message}")
     
-    # Get results
-    entries = db.query(models.ScheduleEntry).filter(
-        models.ScheduleEntry.schedule_run_id == schedule_run.id
-    ).all()
+    # The listing is INFO output only: skip its query when INFO is off
+    if logger.isEnabledFor(logging.INFO):
+        # Get results: just the printed columns, in one joined SELECT, in
+        # weekday/start-time order (the enum names don't sort as weekdays)
+        day_order = case(
+            *((models.Timeslot.day_of_week == day, idx) for idx, day in enumerate(models.DayOfWeek))
+        )
+        entries = db.execute(
+            select(
+                models.Teacher.full_name, models.Course.course_code, models.Section.code,
+                models.Room.room_code, models.Timeslot.day_of_week,
+                models.Timeslot.start_time, models.Timeslot.end_time
+            ).select_from(models.ScheduleEntry)
+            .join(models.ScheduleEntry.teacher)
+            .join(models.ScheduleEntry.course)
+            .join(models.ScheduleEntry.section)
+            .join(models.ScheduleEntry.room)
+            .join(models.ScheduleEntry.timeslot)
+            .where(models.ScheduleEntry.schedule_run_id == schedule_run.id)
+            .order_by(day_order, models.Timeslot.start_time, models.ScheduleEntry.id)
+        ).all()
     
-    logger.info(f"\n✅ Generated {len(entries)} schedule entries:")
-    for i, entry in enumerate(entries, 1):
-        teacher = entry.teacher
-        course = entry.course
-        section = entry.section
-        room = entry.room
-        timeslot = entry.timeslot
-        
-        logger.info(f"  {i}. {teacher.full_name} teaches {course.course_code}")
-        logger.info(f"     Section: {section.code}, Room: {room.room_code}")
-        logger.info(f"     Time: {timeslot.day_of_week.value} {timeslot.start_time}-{timeslot.end_time}")
+        logger.info(f"\n✅ Generated {len(entries)} schedule entries:")
+        for i, (full_name, course_code, section_code, room_code, day, start_time, end_time) in enumerate(entries, 1):
+            logger.info("  %d. %s teaches %s", i, full_name, course_code)
+            logger.info("     Section: %s, Room: %s", section_code, room_code)
+            logger.info("     Time: %s %s-%s", day.value, start_time, end_time)
     
     # Get violations report
     violations_report = scheduler.get_violations_report()
@@ -297,7 +321,7 @@ def main():
     logger.info("="*80)
     
     # Create tables
-    models.Base.metadata.create_all(bind=engine)
+    ensure_schema()
     
     db = SessionLocal()
     try:
@@ -305,7 +329,7 @@ def main():
         test_data = setup_test_data(db)
         
         # Test constraint engine
-        test_constraint_engine(db)
+        test_constraint_engine(db, test_data)
         
         # Test scheduler
         schedule_run = test_scheduler(db, test_data)
@@ -1,121 +1,259 @@
 #!/usr/bin/env python
 """
 Simple test of scheduling algorithm with compatible data.
+
+This empties the scheduling tables first; set DATABASE_URL=sqlite:// to run
+against a throwaway in-memory database instead (or SQLITE_NO_FSYNC=1 to skip
+fsyncs on a throwaway SQLite file). With --benchmark, times the
+scheduler on the same kind of data at several sizes (BENCHMARK_SIZES).
 """
 
 import logging
-from datetime import datetime
+import sys
+import time
+from sqlalchemy import case, delete, select, text
 from sqlalchemy.orm import Session
-from app.database import SessionLocal, engine
+from app.database import SessionLocal, engine, ensure_schema
 from app import models
 from app.scheduler import CampusScheduler
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Create tables
-models.Base.metadata.create_all(bind=engine)
-db = SessionLocal()
-
-try:
-    # Clear existing data
-    db.query(models.ScheduleEntry).delete()
-    db.query(models.TeachingAssignment).delete()
-    db.query(models.Timeslot).delete()
-    db.query(models.Course).delete()
-    db.query(models.Section).delete()
-    db.query(models.Teacher).delete()
-    db.query(models.Room).delete()
-    db.query(models.Building).delete()
-    db.query(models.ScheduleRun).delete()
+# Tables emptied before the run, in foreign-key-safe order
+CLEARED_MODELS = [
+    models.ScheduleEntry,
+    models.TeachingAssignment,
+    models.Timeslot,
+    models.Course,
+    models.Section,
+    models.Teacher,
+    models.Room,
+    models.Building,
+    models.ScheduleRun,
+]
+
+# Assignment counts run by --benchmark
+BENCHMARK_SIZES = [2, 10, 50]
+
+
+def clear_tables(db: Session):
+    """Empty CLEARED_MODELS' tables in one transaction."""
+    # One TRUNCATE on PostgreSQL, otherwise one plain DELETE per table
+    # (no session synchronization), children first
+    if engine.dialect.name == "postgresql":
+        table_names = ", ".join(model.__tablename__ for model in CLEARED_MODELS)
+        db.execute(text(f"TRUNCATE {table_names} RESTART IDENTITY CASCADE"))
+    else:
+        for model in CLEARED_MODELS:
+            db.execute(delete(model).execution_options(synchronize_session=False))
+    db.commit()
+
+
+def create_scaled_data(db: Session, size: int):
+    """
+    Create compatible data with `size` teachers, sections and courses, one
+    teaching assignment each, on the demo's six timeslots and enough rooms
+    (at least three) for every assignment to have a cell of its own.
+    """
+    timeslot_hours = [
+        (day, start, end)
+        for day in (models.DayOfWeek.MON, models.DayOfWeek.TUE, models.DayOfWeek.WED)
+        for start, end in (("07:30", "10:30"), ("10:30", "13:30"))
+    ]
+    room_count = max(3, -(-size // len(timeslot_hours)))
+    bldg = models.Building(code="A", name="Building A")
+    db.add_all([
+        models.Room(building=bldg, room_code=f"A{101 + n}", floor_no=1, room_type=models.RoomType.STANDARD, capacity=30)
+        for n in range(room_count)
+    ])
+    db.add_all([
+        models.Timeslot(day_of_week=day, start_time=start, end_time=end)
+        for day, start, end in timeslot_hours
+    ])
+    statuses = (models.TeacherStatus.PERMANENT, models.TeacherStatus.CONTRACT_OF_SERVICE)
+    for i in range(size):
+        year_level = i % 4 + 1
+        db.add(models.TeachingAssignment(
+            teacher=models.Teacher(
+                employee_no=f"T{i + 1:03d}", full_name=f"Teacher {i + 1}", title=models.TeacherTitle.INSTRUCTOR_I,
+                status=statuses[i % 2], workload=models.Workload.FULL_TIME, is_senior_old=False
+            ),
+            section=models.Section(code=f"BS-CS-{year_level}-{i + 1}", year_level=year_level, is_first_year=year_level == 1),
+            course=models.Course(
+                course_code=f"CS{i + 1:03d}", course_name=f"Course {i + 1}", units=3.0,
+                course_type=models.CourseType.STANDARD, default_duration_minutes=90
+            ),
+            term_id=1
+        ))
     db.commit()
+
+
+def run_scaled(size: int):
+    """
+    Load create_scaled_data at `size` and time one generate_schedule on it.
     
-    logger.info("Creating test data...")
+    Each call has its own session: clear_tables leaves the deleted rows in
+    the identity map, and SQLite hands their ids out again.
+    """
+    db = SessionLocal()
+    try:
+        clear_tables(db)
+        create_scaled_data(db, size)
+        schedule_run = models.ScheduleRun(term_id=1, status=models.ScheduleRunStatus.DRAFT, created_by="BENCHMARK")
+        db.add(schedule_run)
+        db.commit()
+        
+        scheduler = CampusScheduler(db)
+        started = time.perf_counter()
+        _, message = scheduler.generate_schedule(schedule_run, term_id=1, prioritize_senior=True)
+        elapsed = time.perf_counter() - started
+        
+        # Read while the session is open; the entries are not used afterwards
+        cells = {(entry.room_id, entry.timeslot_id) for entry in scheduler.schedule_entries}
+        return elapsed, scheduler, cells, message
+    finally:
+        db.close()
+
+
+def benchmark(sizes=BENCHMARK_SIZES):
+    """
+    Time generate_schedule on create_scaled_data at each size.
     
-    # Building & Rooms (all STANDARD)
-    bldg = models.Building(code="A", name="Building A")
-    db.add(bldg)
-    db.flush()
+    An untimed run at the smallest size goes first, so the Numba kernel's
+    cache load is not billed to it. Any hard violation fails the benchmark.
+    """
+    ensure_schema()
+    run_scaled(min(sizes))
     
-    rooms = [
-        models.Room(building_id=bldg.id, room_code="A101", floor_no=1, room_type=models.RoomType.STANDARD, capacity=30),
-        models.Room(building_id=bldg.id, room_code="A102", floor_no=1, room_type=models.RoomType.STANDARD, capacity=30),
-        models.Room(building_id=bldg.id, room_code="A103", floor_no=1, room_type=models.RoomType.STANDARD, capacity=30),
-    ]
-    db.add_all(rooms)
-    db.flush()
-    
-    # Teachers
-    teachers = [
-        models.Teacher(employee_no="T001", full_name="Teacher A", title=models.TeacherTitle.INSTRUCTOR_I,
-                      status=models.TeacherStatus.PERMANENT, workload=models.Workload.FULL_TIME, is_senior_old=False),
-        models.Teacher(employee_no="T002", full_name="Teacher B", title=models.TeacherTitle.INSTRUCTOR_II,
-                      status=models.TeacherStatus.CONTRACT_OF_SERVICE, workload=models.Workload.FULL_TIME, is_senior_old=False),
-    ]
-    db.add_all(teachers)
-    db.flush()
+    for size in sizes:
+        # The scheduler does not hold a room for its own run's earlier
+        # placements, so report how many distinct cells were really used
+        elapsed, scheduler, cells, message = run_scaled(size)
+        report = scheduler.get_violations_report()
+        logger.info(
+            "size=%d: %.3fs, %d entries in %d room-timeslot cells, hard=%d, soft=%d (%s)",
+            size, elapsed, len(scheduler.schedule_entries), len(cells),
+            report['total_hard'], report['total_soft'], message
+        )
+        if report['total_hard'] != 0:
+            raise RuntimeError(f"Benchmark size {size}: {report['total_hard']} hard constraint violations")
+
+
+def main():
+    """Reset the tables, load compatible data and run the scheduler on it."""
+    # Create tables
+    ensure_schema()
+    db = SessionLocal()
+
+    try:
+        # Clear existing data
+        clear_tables(db)
     
-    # Sections
-    sections = [
-        models.Section(code="BS-CS-1A", year_level=1, is_first_year=True),
-        models.Section(code="BS-CS-2B", year_level=2, is_first_year=False),
-    ]
-    db.add_all(sections)
-    db.flush()
-    
-    # Courses (all STANDARD)
-    courses = [
-        models.Course(course_code="CS101", course_name="Programming", units=3.0,
-                     course_type=models.CourseType.STANDARD, default_duration_minutes=90),
-        models.Course(course_code="CS102", course_name="Databases", units=3.0,
-                     course_type=models.CourseType.STANDARD, default_duration_minutes=90),
-    ]
-    db.add_all(courses)
-    db.flush()
-    
-    # Timeslots
-    timeslots = [
-        models.Timeslot(day_of_week=models.DayOfWeek.MON, start_time="07:30", end_time="10:30"),
-        models.Timeslot(day_of_week=models.DayOfWeek.MON, start_time="10:30", end_time="13:30"),
-        models.Timeslot(day_of_week=models.DayOfWeek.TUE, start_time="07:30", end_time="10:30"),
-        models.Timeslot(day_of_week=models.DayOfWeek.TUE, start_time="10:30", end_time="13:30"),
-        models.Timeslot(day_of_week=models.DayOfWeek.WED, start_time="07:30", end_time="10:30"),
-        models.Timeslot(day_of_week=models.DayOfWeek.WED, start_time="10:30", end_time="13:30"),
-    ]
-    db.add_all(timeslots)
-    db.flush()
+        logger.info("Creating test data...")
     
-    # Teaching assignments
-    assignments = [
-        models.TeachingAssignment(teacher_id=teachers[0].id, section_id=sections[0].id, course_id=courses[0].id, term_id=1),
-        models.TeachingAssignment(teacher_id=teachers[1].id, section_id=sections[1].id, course_id=courses[1].id, term_id=1),
-    ]
-    db.add_all(assignments)
-    db.commit()
+        # Building & Rooms (all STANDARD)
+        bldg = models.Building(code="A", name="Building A")
     
-    # Create schedule run
-    schedule_run = models.ScheduleRun(term_id=1, status=models.ScheduleRunStatus.DRAFT, created_by="TEST", created_at=datetime.now())
-    db.add(schedule_run)
-    db.commit()
+        rooms = [
+            models.Room(building=bldg, room_code="A101", floor_no=1, room_type=models.RoomType.STANDARD, capacity=30),
+            models.Room(building=bldg, room_code="A102", floor_no=1, room_type=models.RoomType.STANDARD, capacity=30),
+            models.Room(building=bldg, room_code="A103", floor_no=1, room_type=models.RoomType.STANDARD, capacity=30),
+        ]
+        db.add_all(rooms)
+    
+        # Teachers
+        teachers = [
+            models.Teacher(employee_no="T001", full_name="Teacher A", title=models.TeacherTitle.INSTRUCTOR_I,
+                          status=models.TeacherStatus.PERMANENT, workload=models.Workload.FULL_TIME, is_senior_old=False),
+            models.Teacher(employee_no="T002", full_name="Teacher B", title=models.TeacherTitle.INSTRUCTOR_II,
+                          status=models.TeacherStatus.CONTRACT_OF_SERVICE, workload=models.Workload.FULL_TIME, is_senior_old=False),
+        ]
+        db.add_all(teachers)
+    
+        # Sections
+        sections = [
+            models.Section(code="BS-CS-1A", year_level=1, is_first_year=True),
+            models.Section(code="BS-CS-2B", year_level=2, is_first_year=False),
+        ]
+        db.add_all(sections)
+    
+        # Courses (all STANDARD)
+        courses = [
+            models.Course(course_code="CS101", course_name="Programming", units=3.0,
+                         course_type=models.CourseType.STANDARD, default_duration_minutes=90),
+            models.Course(course_code="CS102", course_name="Databases", units=3.0,
+                         course_type=models.CourseType.STANDARD, default_duration_minutes=90),
+        ]
+        db.add_all(courses)
     
-    logger.info(f"Test data created. Running scheduler for run {schedule_run.id}...")
+        # Timeslots
+        timeslots = [
+            models.Timeslot(day_of_week=models.DayOfWeek.MON, start_time="07:30", end_time="10:30"),
+            models.Timeslot(day_of_week=models.DayOfWeek.MON, start_time="10:30", end_time="13:30"),
+            models.Timeslot(day_of_week=models.DayOfWeek.TUE, start_time="07:30", end_time="10:30"),
+            models.Timeslot(day_of_week=models.DayOfWeek.TUE, start_time="10:30", end_time="13:30"),
+            models.Timeslot(day_of_week=models.DayOfWeek.WED, start_time="07:30", end_time="10:30"),
+            models.Timeslot(day_of_week=models.DayOfWeek.WED, start_time="10:30", end_time="13:30"),
+        ]
+        db.add_all(timeslots)
     
-    # Run scheduler
-    scheduler = CampusScheduler(db)
-    success, message = scheduler.generate_schedule(schedule_run, term_id=1, prioritize_senior=True)
+        # Teaching assignments (related through the relationships, so the
+        # foreign keys are filled in by the single flush at commit)
+        assignments = [
+            models.TeachingAssignment(teacher=teachers[0], section=sections[0], course=courses[0], term_id=1),
+            models.TeachingAssignment(teacher=teachers[1], section=sections[1], course=courses[1], term_id=1),
+        ]
+        db.add_all(assignments)
+        db.commit()
     
-    logger.info(f"Success: {success}")
-    logger.info(f"Message: {message}")
+        # Create schedule run (created_at from the column's now() default)
+        schedule_run = models.ScheduleRun(term_id=1, status=models.ScheduleRunStatus.DRAFT, created_by="TEST")
+        db.add(schedule_run)
+        db.commit()
     
-    # Show results
-    entries = db.query(models.ScheduleEntry).filter(models.ScheduleEntry.schedule_run_id == schedule_run.id).all()
-    logger.info(f"\n✅ Generated {len(entries)} assignments:")
-    for entry in entries:
-        logger.info(f"  - {entry.teacher.full_name} ({entry.course.course_code}) -> {entry.room.room_code} / {entry.timeslot.day_of_week.value} {entry.timeslot.start_time}")
+        logger.info(f"Test data created. Running scheduler for run {schedule_run.id}...")
     
-    # Show violations
-    report = scheduler.get_violations_report()
-    logger.info(f"\nViolations: Hard={report['total_hard']}, Soft={report['total_soft']}, Score={report['objective_score']:.1f}")
+        # Run scheduler
+        scheduler = CampusScheduler(db)
+        success, message = scheduler.generate_schedule(schedule_run, term_id=1, prioritize_senior=True)
     
-finally:
-    db.close()
+        logger.info(f"Success: {success}")
+        logger.info(f"Message: {message}")
+    
+        # The listing is INFO output only: skip its query when INFO is off
+        if logger.isEnabledFor(logging.INFO):
+            # Show results: just the printed columns, in one joined SELECT, in
+            # weekday/start-time order (the enum names don't sort as weekdays)
+            day_order = case(
+                *((models.Timeslot.day_of_week == day, idx) for idx, day in enumerate(models.DayOfWeek))
+            )
+            entries = db.execute(
+                select(
+                    models.Teacher.full_name, models.Course.course_code, models.Room.room_code,
+                    models.Timeslot.day_of_week, models.Timeslot.start_time
+                ).select_from(models.ScheduleEntry)
+                .join(models.ScheduleEntry.teacher)
+                .join(models.ScheduleEntry.course)
+                .join(models.ScheduleEntry.room)
+                .join(models.ScheduleEntry.timeslot)
+                .where(models.ScheduleEntry.schedule_run_id == schedule_run.id)
+                .order_by(day_order, models.Timeslot.start_time, models.ScheduleEntry.id)
+            ).all()
+            logger.info(f"\n✅ Generated {len(entries)} assignments:")
+            for full_name, course_code, room_code, day, start_time in entries:
+                logger.info("  - %s (%s) -> %s / %s %s", full_name, course_code, room_code, day.value, start_time)
+        
+        # Show violations
+        report = scheduler.get_violations_report()
+        logger.info(f"\nViolations: Hard={report['total_hard']}, Soft={report['total_soft']}, Score={report['objective_score']:.1f}")
+    
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    if "--benchmark" in sys.argv[1:]:
+        benchmark()
+    else:
+        main()